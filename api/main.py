@@ -31,6 +31,8 @@ class BacktestRequest(BaseModel):
     strategy: str
     basket: list[str]
     params: dict = {}
+    start: int | None = None  # epoch ms, inclusive
+    end: int | None = None  # epoch ms, exclusive
 
 
 @app.get("/strategies")
@@ -60,7 +62,10 @@ def get_assets():
 
 @app.post("/backtest")
 def run_backtest_api(req: BacktestRequest):
-    df = load_data()
+    if req.start is not None and req.end is not None and req.end <= req.start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    # Only the basket's partitions and the requested time range are read
+    df = load_data(symbols=req.basket, start=req.start, end=req.end)
     if df is None:
         raise HTTPException(status_code=404, detail="No data found")
 
@@ -80,21 +85,15 @@ def run_backtest_api(req: BacktestRequest):
     else:
         raise HTTPException(status_code=400, detail="Unknown strategy")
 
-    # 2. Filter Data by Basket
-
-    # Check if 'symbol' column exists
-    if "symbol" not in df.columns:
-        pass
-
+    # 2. Split the basket's ticks by symbol
     for symbol in req.basket:
         # Filter for specific symbol
         symbol_df = df.filter(pl.col("symbol") == symbol)
-        records = symbol_df.to_dicts()
 
-        if not records:
+        if symbol_df.is_empty():
             continue
 
-        metrics = run_strategy(strat, records, processor=processor_needed)
+        metrics = run_strategy(strat, symbol_df, processor=processor_needed)
         metrics["symbol"] = symbol
 
         results.append(metrics)
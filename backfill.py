@@ -0,0 +1,72 @@
+"""
+Momontum Candle Backfill
+========================
+Materializes OHLC candles (candles/<interval>/...) from recorded tick files with
+Polars, so bar-level backtests never have to scan raw ticks.
+
+The harvester builds candles while it runs; this fills in days recorded before
+that (or rebuilds them with --overwrite). With --features (or --feature SPEC) it
+materializes registry features (features/tick/...) instead.
+
+Usage:
+    python backfill.py                              # every closed day without candles
+    python backfill.py --interval 1min --symbol BTC/USDT
+    python backfill.py --start 2024-01-01 --overwrite
+    python backfill.py --features                   # config.FEATURES
+    python backfill.py --feature ema_50 --feature vol_200
+"""
+
+import argparse
+import logging
+from datetime import date
+
+import config
+from momontum.data.candles import DEFAULT_INTERVALS, backfill_candles
+from momontum.features import backfill_features
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("Backfill")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Backfill candles or features from recorded ticks."
+    )
+    parser.add_argument("--root", default=config.DATA_DIR)
+    parser.add_argument("--interval", action="append", dest="intervals")
+    parser.add_argument("--symbol", action="append", dest="symbols")
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat)
+    parser.add_argument("--include-today", action="store_true")
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument("--feature", action="append", dest="features")
+    parser.add_argument("--features", action="store_true", dest="all_features")
+    args = parser.parse_args()
+
+    if args.features or args.all_features:
+        rows = backfill_features(
+            args.root,
+            args.features or config.FEATURES,
+            symbols=args.symbols,
+            start=args.start,
+            end=args.end,
+            include_today=args.include_today,
+            overwrite=args.overwrite,
+        )
+        logger.info(f"✅ Wrote {rows} feature rows")
+        return
+
+    rows = backfill_candles(
+        args.root,
+        args.intervals or config.CANDLE_INTERVALS or DEFAULT_INTERVALS,
+        symbols=args.symbols,
+        start=args.start,
+        end=args.end,
+        include_today=args.include_today,
+        overwrite=args.overwrite,
+    )
+    logger.info(f"✅ Wrote {rows} candles")
+
+
+if __name__ == "__main__":
+    main()
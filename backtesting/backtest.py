@@ -1,4 +1,3 @@
-import glob
 import logging
 import os
 import sys
@@ -8,9 +7,11 @@ import polars as pl
 # Add parent directory to path so we can import internal modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import config
+from backtesting.engine import LONG, simulate
+from momontum.data.access import BACKTEST_COLUMNS, load_ticks
 from processor import DataProcessor
-from strategy import MomontumStrategy, Signal
+from strategies.base import float_column
+from strategies.momentum import MomentumStrategy
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
@@ -18,16 +19,13 @@ logger = logging.getLogger("Backtester")
 
 
 def load_data():
-    """Loads and sorts all parquet data."""
-    files = glob.glob(os.path.join(config.DATA_DIR, "*.parquet"))
-    if not files:
+    """Loads the backtest columns of every tick, sorted by timestamp."""
+    df = load_ticks(columns=BACKTEST_COLUMNS)
+    if df is None:
         logger.error("No data found in data_lake")
         return None
 
-    logger.info(f"Loading {len(files)} files...")
-    # Polars is fast
-    df = pl.read_parquet(os.path.join(config.DATA_DIR, "*.parquet"))
-    df = df.sort("timestamp")
+    logger.info(f"Loaded {len(df)} ticks")
     return df
 
 
@@ -39,59 +37,28 @@ def run_backtest():
     logger.info(f"Running backtest on {len(df)} ticks...")
 
     processor = DataProcessor()
-    strategy = MomontumStrategy(threshold=1.0)  # Lower threshold for testing?
-
-    trades = []
-    position = None  # None, 'LONG', 'SHORT'
-    entry_price = 0
-    pnl = 0
-
-    # Iterate through ticks (using to_dicts for simplicity, though slower than pure polars ops)
-    # For River (online learning), we MUST iterate row by row.
-    records = df.to_dicts()
-
-    for i, record in enumerate(records):
-        # 1. Process
-        prediction = processor.process(record)
-
-        # 2. Strategy
-        signal = strategy.check_signal(record, prediction)
-
-        # 3. Execution Simulation
-        _mid_price = (record["bid"] + record["ask"]) / 2
-
-        if position is None:
-            if signal == Signal.BUY:
-                position = "LONG"
-                entry_price = record["ask"]  # Buy at Ask
-                logger.info(f"[{i}] OPEN LONG @ {entry_price}")
-            elif signal == Signal.SELL:
-                position = "SHORT"
-                entry_price = record["bid"]  # Sell at Bid
-                logger.info(f"[{i}] OPEN SHORT @ {entry_price}")
-
-        elif position == "LONG":
-            # Simple Exit Logic: If signal flips or Stop Loss / Take Profit
-            # For now: Exit if we get a SELL signal
-            if signal == Signal.SELL:
-                exit_price = record["bid"]
-                trade_pnl = exit_price - entry_price
-                pnl += trade_pnl
-                logger.info(f"[{i}] CLOSE LONG @ {exit_price} | PnL: {trade_pnl:.2f}")
-                position = None
-                trades.append(trade_pnl)
-
-        elif position == "SHORT":
-            if signal == Signal.BUY:
-                exit_price = record["ask"]
-                trade_pnl = entry_price - exit_price  # Short PnL
-                pnl += trade_pnl
-                logger.info(f"[{i}] CLOSE SHORT @ {exit_price} | PnL: {trade_pnl:.2f}")
-                position = None
-                trades.append(trade_pnl)
-
-    logger.info(f"Backtest Complete. Total PnL: {pnl:.2f} USDT")
-    logger.info(f"Total Trades: {len(trades)}")
+    strategy = MomentumStrategy(threshold=1.0)  # Lower threshold for testing?
+
+    # 1. Process: the online model's tick-by-tick recursion, run over whole columns
+    batch = processor.process_batch(df)
+    df = df.with_columns(
+        pl.Series("predicted_price", batch["predicted_price"]),
+        pl.Series("predicted_change", batch["predicted_change"]),
+    )
+
+    # 2. Strategy
+    signals = strategy.generate_signals(df)
+
+    # 3. Execution Simulation: buy at ask, sell at bid, exit on the opposite signal
+    result = simulate(signals, float_column(df, "bid"), float_column(df, "ask"))
+    for entry, exit_, side, entry_price, exit_price, trade_pnl in result.to_frame().iter_rows():
+        name = "LONG" if side == LONG else "SHORT"
+        logger.info(f"[{entry}] OPEN {name} @ {entry_price}")
+        if exit_ >= 0:
+            logger.info(f"[{exit_}] CLOSE {name} @ {exit_price} | PnL: {trade_pnl:.2f}")
+
+    logger.info(f"Backtest Complete. Total PnL: {result.total_pnl:.2f} USDT")
+    logger.info(f"Total Trades: {result.closed}")
 
 
 if __name__ == "__main__":
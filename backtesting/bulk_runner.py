@@ -1,17 +1,54 @@
-import glob
+"""
+Momontum Bulk Backtester
+========================
+Runs every strategy over every recorded symbol and prints a PnL table.
+
+Jobs run on a process pool: each symbol's ticks are written once to an
+uncompressed Arrow IPC file (in /dev/shm when available) that workers
+memory-map, so no tick data is pickled. The strategies trading on the
+processor's predictions share one job per symbol, which computes the
+prediction stream once (or loads it from the prediction cache, see
+backtesting/predictions.py); every other (symbol, strategy) pair is a job of
+its own. Jobs are scheduled largest first and results are reported as they
+complete.
+
+With --batch-size, symbols larger than memory are streamed instead: each job
+reads its symbol's day partitions in timestamp order, a batch at a time
+(`momontum.data.access.iter_symbol_ticks`), and carries the processor, the
+strategies' signal state and open positions from one batch to the next. The
+results are identical to the in-memory run; peak memory is set by the batch
+size (one day per symbol for partitions that are not in timestamp order).
+Streamed predictions are not cached, and legacy flat files are not read.
+
+Usage:
+    python backtesting/bulk_runner.py               # one worker per core
+    python backtesting/bulk_runner.py --workers 1   # in-process, sequential
+    python backtesting/bulk_runner.py --no-cache    # recompute predictions
+    python backtesting/bulk_runner.py --batch-size 100000   # stream from the lake
+"""
+
+import argparse
 import logging
+import multiprocessing
 import os
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import polars as pl
+import pyarrow as pa
 from prettytable import PrettyTable
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import config
+from backtesting.engine import Simulation, simulate
+from backtesting.predictions import PREDICTION_COLUMNS, PredictionCache, default_cache_dir, predict
+from momontum.data.access import BACKTEST_COLUMNS, iter_symbol_ticks, list_symbols, load_ticks
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, list_partition_files
 from processor import DataProcessor
-from strategies.base import Signal
+from strategies.base import float_column
 from strategies.mean_reversion import MeanReversionStrategy
 from strategies.momentum import MomentumStrategy
 
@@ -20,62 +57,83 @@ logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger("BulkRunner")
 
 
-def load_data():
-    files = glob.glob(os.path.join(config.DATA_DIR, "*.parquet"))
-    if not files:
+def load_data(symbols=None, start=None, end=None, columns=BACKTEST_COLUMNS):
+    """
+    Ticks sorted by timestamp, read lazily with partition and row-group pruning
+    (`momontum.data.access.scan_ticks`): only the requested symbols, time range
+    (epoch ms, end exclusive) and columns are loaded.
+    """
+    df = load_ticks(symbols=symbols, start=start, end=end, columns=columns)
+    if df is None:
         logger.error("No data found.")
-        return None
-    df = pl.read_parquet(os.path.join(config.DATA_DIR, "*.parquet"))
-    return df.sort("timestamp")
-
-
-def run_strategy(strategy, records, processor=None):
-    """Runs a single strategy over the records and returns metrics."""
-    position = None
-    entry_price = 0
-    pnl = 0
-    trades = 0
-
-    # Reset processor for each run if it has state
-    # (Our specific processor implementation in this repo is stateful)
-    local_processor = DataProcessor() if processor else None
-
-    for record in records:
-        prediction = None
-        if local_processor:
-            prediction = local_processor.process(record)
-
-        signal = strategy.on_tick(record, prediction)
-
-        # Execution (Simulated)
-        mid_price = (
-            (record["bid"] + record["ask"]) / 2
-            if record["bid"] and record["ask"]
-            else record["last"]
-        )
-        if not mid_price:
-            continue
-
-        if position is None:
-            if signal == Signal.BUY:
-                position = "LONG"
-                entry_price = record["ask"]
-                trades += 1
-            elif signal == Signal.SELL:
-                position = "SHORT"
-                entry_price = record["bid"]
-                trades += 1
-
-        elif position == "LONG":
-            if signal == Signal.SELL:
-                pnl += record["bid"] - entry_price
-                position = None
-
-        elif position == "SHORT":
-            if signal == Signal.BUY:
-                pnl += entry_price - record["ask"]
-                position = None
+    return df
+
 
+def ensure_symbols(df):
+    """Tags ticks without a symbol (legacy data) as one "LEGACY" asset."""
+    if "symbol" not in df.columns:
+        logger.warning("Old data detected (no symbol column). Treating as single asset.")
+        return df.with_columns(pl.lit("LEGACY").alias("symbol"))
+    if df["symbol"].null_count():
+        logger.warning("Mixed legacy data detected (null symbols). Treating them as one asset.")
+        return df.with_columns(pl.col("symbol").fill_null("LEGACY"))
+    return df
+
+
+def _with_predictions(frame, cache=None):
+    """Adds the processor's predicted_price / predicted_change columns (`process_batch`)."""
+    # Fresh processor for each stream (it is stateful)
+    return frame.with_columns(predict(frame, cache).get_columns())
+
+
+def evaluate(strategy, frame):
+    """
+    Trades of a single strategy over one symbol's ticks (a Polars frame, with the
+    prediction columns when the strategy uses them) as a `BacktestResult`.
+    """
+    # One int8 code per tick: vectorized for strategies implementing generate_signals
+    signals = strategy.generate_signals(frame)
+    # Ticks without a price (no quote and no last trade) are skipped, as if HOLD
+    signals[~_priced(frame)] = 0
+    return simulate(signals, float_column(frame, "bid"), float_column(frame, "ask"))
+
+
+def stream_strategies(strategies, batches):
+    """
+    `evaluate` of every strategy over one symbol's ticks arriving as consecutive
+    Polars frames in timestamp order, with the same results as over the whole
+    frame. One processor (when a strategy uses predictions), each strategy's
+    signal stream and each open position carry over from one batch to the next.
+    """
+    processor = DataProcessor() if any(uses_predictions(s) for s in strategies) else None
+    streams = [strategy.signal_stream() for strategy in strategies]
+    simulations = [Simulation() for _ in strategies]
+    for batch in batches:
+        if processor is not None:
+            predicted = processor.process_batch(batch)
+            batch = batch.with_columns(
+                pl.Series(name, predicted[name]) for name in PREDICTION_COLUMNS
+            )
+        priced = _priced(batch)
+        bid, ask = float_column(batch, "bid"), float_column(batch, "ask")
+        for stream, simulation in zip(streams, simulations, strict=True):
+            signals = stream.update(batch)
+            signals[~priced] = 0
+            simulation.update(signals, bid, ask)
+    return [simulation.result() for simulation in simulations]
+
+
+def run_strategy(strategy, ticks, processor=None):
+    """Runs a single strategy over one symbol's ticks (Polars frame or records) and returns metrics."""
+    frame = ticks if isinstance(ticks, pl.DataFrame) else pl.DataFrame(ticks)
+    if processor:
+        frame = _with_predictions(frame)
+    return summarize(strategy, evaluate(strategy, frame))
+
+
+def summarize(strategy, result):
+    """Report metrics of a strategy's `BacktestResult`."""
+    pnl, trades = result.total_pnl, result.trades
     return {
         "Strategy": strategy.name,
         "Total PnL": f"{pnl:.2f}",
@@ -84,18 +142,166 @@ def run_strategy(strategy, records, processor=None):
     }
 
 
-def main():
-    df = load_data()
-    if df is None:
+def _priced(frame):
+    """Rows with a usable price: the mid of a two-sided quote, else the last trade."""
+    bid, ask, last = pl.col("bid"), pl.col("ask"), pl.col("last")
+    quoted = bid.is_not_null() & (bid != 0) & ask.is_not_null() & (ask != 0)
+    priced = pl.when(quoted).then((bid + ask) / 2 != 0).otherwise(last.is_not_null() & (last != 0))
+    return frame.select(priced).to_series().to_numpy()
+
+
+# Relative cost per tick of a job: process_batch dominates strategies using predictions
+PREDICTION_COST = 8
+# Memory-backed directory for the shared tick files (page cache elsewhere)
+SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def uses_predictions(strategy):
+    """Whether the strategy trades on the ML processor's predictions."""
+    return isinstance(strategy, MomentumStrategy)
+
+
+def export_symbols(df, directory):
+    """
+    Writes each symbol's ticks to `<directory>/<n>.arrow` (uncompressed Arrow IPC).
+    Returns [(symbol, path, rows)].
+    """
+    exported = []
+    for i, (key, symbol_df) in enumerate(df.partition_by("symbol", as_dict=True).items()):
+        path = os.path.join(directory, f"{i}.arrow")
+        table = symbol_df.to_arrow()
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        exported.append((key[0], path, symbol_df.height))
+    return exported
+
+
+def map_ticks(path):
+    """Ticks of an `export_symbols` file, memory-mapped rather than read into memory."""
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    return pl.from_arrow(table)
+
+
+def job_groups(strategies):
+    """
+    {strategy indices: relative cost per tick} of the strategies run together.
+    The strategies using predictions share one group; every other strategy is a
+    group of its own.
+    """
+    predicted = tuple(i for i, strat in enumerate(strategies) if uses_predictions(strat))
+    groups = [predicted] if predicted else []
+    groups += [(i,) for i in range(len(strategies)) if i not in predicted]
+    return {group: (PREDICTION_COST if group == predicted else 0) + len(group) for group in groups}
+
+
+def plan_jobs(exported, strategies):
+    """
+    (symbol, path, strategy indices) jobs ordered by estimated cost, largest first:
+    one job per symbol and `job_groups` group.
+    """
+    costs = job_groups(strategies)
+    jobs = [(symbol, path, group) for symbol, path, _ in exported for group in costs]
+    rows = {path: n for _, path, n in exported}
+    return sorted(jobs, key=lambda job: rows[job[1]] * costs[job[2]], reverse=True)
+
+
+def _run_job(path, strategies, cache_dir=None):
+    frame = map_ticks(path)
+    if any(uses_predictions(strategy) for strategy in strategies):
+        frame = _with_predictions(frame, PredictionCache(cache_dir) if cache_dir else None)
+    return [evaluate(strategy, frame) for strategy in strategies]
+
+
+def _stream_job(symbol, strategies, batch_size, root=None, start=None, end=None):
+    batches = iter_symbol_ticks(
+        symbol, root, start=start, end=end, columns=BACKTEST_COLUMNS, batch_size=batch_size
+    )
+    return stream_strategies(strategies, batches)
+
+
+def _run_jobs(jobs, workers):
+    """
+    Runs (function, args, symbol, strategy indices) jobs, each returning one result
+    per index, and yields (strategy index, symbol, result) as they complete.
+    """
+    if workers == 1:
+        for function, args, symbol, indices in jobs:
+            for i, result in zip(indices, function(*args), strict=True):
+                yield i, symbol, result
         return
+    # spawn, not fork: Polars/Arrow thread pools are not fork-safe.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # Queued in order; strategies (a few fields) are pickled, the ticks are not
+        futures = {
+            pool.submit(function, *args): (symbol, indices)
+            for function, args, symbol, indices in jobs
+        }
+        for future in as_completed(futures):
+            symbol, indices = futures[future]
+            for i, result in zip(indices, future.result(), strict=True):
+                yield i, symbol, result
+
+
+def run_parallel(df, strategies, workers=None, cache_dir=None):
+    """
+    Runs every strategy on every symbol of *df* and yields
+    (strategy index, symbol, BacktestResult) as jobs complete.
+    workers: pool size (default: one per core); 1 runs the jobs in this process.
+    cache_dir: prediction cache directory (None computes every stream).
+    """
+    workers = workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory(prefix="momontum-bulk-", dir=SHARED_DIR) as directory:
+        jobs = [
+            (_run_job, (path, [strategies[i] for i in indices], cache_dir), symbol, indices)
+            for symbol, path, indices in plan_jobs(export_symbols(df, directory), strategies)
+        ]
+        yield from _run_jobs(jobs, workers)
+
+
+def run_streaming(symbols, strategies, batch_size, workers=None, root=None, start=None, end=None):
+    """
+    `run_parallel` streaming each symbol from the tick lake under *root* (default:
+    config.DATA_DIR) in batches of *batch_size* ticks instead of loading it.
+    Jobs are ordered by the size of the symbol's partition files, largest first.
+    """
+    workers = workers or os.cpu_count() or 1
+    root = config.DATA_DIR if root is None else root
+    sizes = {
+        symbol: sum(
+            path.stat().st_size
+            for path in list_partition_files(root, TICKS_DATASET, TICK_TIMEFRAME, symbols=[symbol])
+        )
+        for symbol in symbols
+    }
+    costs = job_groups(strategies)
+    plan = sorted(
+        ((symbol, group) for symbol in symbols for group in costs),
+        key=lambda job: sizes[job[0]] * costs[job[1]],
+        reverse=True,
+    )
+    jobs = [
+        (
+            _stream_job,
+            (symbol, [strategies[i] for i in indices], batch_size, root, start, end),
+            symbol,
+            indices,
+        )
+        for symbol, indices in plan
+    ]
+    yield from _run_jobs(jobs, workers)
 
-    # Ensure symbol column exists (handle legacy data)
-    if "symbol" not in df.columns:
-        logger.warning("Old data detected (no symbol column). Treating as single asset.")
-        df = df.with_columns(pl.lit("LEGACY").alias("symbol"))
 
-    symbols = df["symbol"].unique().to_list()
-    logger.info(f"Loaded {len(df)} ticks across {len(symbols)} assets: {symbols}")
+def main():
+    parser = argparse.ArgumentParser(description="Backtest every strategy on every symbol.")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: cores)")
+    parser.add_argument("--no-cache", action="store_true", help="recompute prediction streams")
+    parser.add_argument(
+        "--batch-size", type=int, default=None, help="stream ticks in batches of N rows"
+    )
+    args = parser.parse_args()
+    if args.batch_size is not None and args.batch_size <= 0:
+        parser.error("--batch-size must be positive")
 
     # Define Strategies to Test
     strategies = [
@@ -104,30 +310,49 @@ def main():
         MeanReversionStrategy(window=20, std_dev_mult=2.0),
     ]
 
-    results = []
+    if args.batch_size:
+        symbols = list_symbols()
+        if not symbols:
+            logger.error("No partitioned data found.")
+            return
+        logger.info(
+            f"Streaming {len(symbols)} assets in batches of {args.batch_size} ticks: {symbols}"
+        )
+        runs = run_streaming(symbols, strategies, args.batch_size, workers=args.workers)
+    else:
+        df = load_data()
+        if df is None:
+            return
 
-    logger.info("🚀 Starting Bulk Backtest...")
+        # Ensure symbol column exists (handle legacy data)
+        df = ensure_symbols(df)
 
-    for symbol in symbols:
-        symbol_df = df.filter(pl.col("symbol") == symbol)
-        symbol_records = symbol_df.to_dicts()
+        symbols = df["symbol"].unique().to_list()
+        logger.info(f"Loaded {len(df)} ticks across {len(symbols)} assets: {symbols}")
+        cache_dir = None if args.no_cache else default_cache_dir()
+        runs = run_parallel(df, strategies, workers=args.workers, cache_dir=cache_dir)
 
-        logger.info(f"\n--- Testing on {symbol} ({len(symbol_records)} ticks) ---")
+    results = []
 
-        for strat in strategies:
-            # Determine if strategy needs ML Processor
-            processor = True if isinstance(strat, MomentumStrategy) else False
+    logger.info("🚀 Starting Bulk Backtest...")
 
-            # Run
-            metrics = run_strategy(strat, symbol_records, processor=processor)
-            metrics["Symbol"] = symbol  # Tag result
-            results.append(metrics)
+    for i, symbol, result in runs:
+        metrics = summarize(strategies[i], result)
+        metrics["Symbol"] = symbol  # Tag result
+        logger.info(
+            f"--- {metrics['Symbol']} | {metrics['Strategy']}: "
+            f"PnL {metrics['Total PnL']} over {metrics['Trades']} trades"
+        )
+        results.append((i, metrics))
+    # Completion order -> report order
+    order = {name: i for i, name in enumerate(symbols)}
+    results.sort(key=lambda job: (order[job[1]["Symbol"]], job[0]))
 
     # Display Report
     table = PrettyTable()
     table.field_names = ["Symbol", "Strategy", "Total PnL", "Trades"]
 
-    for res in results:
+    for _, res in results:
         table.add_row([res["Symbol"], res["Strategy"], res["Total PnL"], res["Trades"]])
 
     print("\n")
@@ -0,0 +1,242 @@
+"""Vectorized position state machine for backtests.
+
+Turns a signal column (int8 codes of `strategies.base.SIGNAL_CODES`) into
+trades with the same rules as the original per-tick loop, kept here as
+`simulate_loop`:
+
+- Flat: BUY opens a long at the ask, SELL opens a short at the bid.
+- Long: SELL closes at the bid (back to flat, no reversal on the same tick);
+  BUY is ignored. Short: BUY closes at the ask; SELL is ignored.
+- PnL is `exit - entry` for longs and `entry - exit` for shorts. A position
+  still open at the end is a trade without exit or PnL.
+
+`simulate` derives the same trades without a Python loop. HOLD rows never
+change the state, so only the nonzero signals matter. Group them into runs
+of equal sign; runs alternate in sign, so a run starts either flat or holding
+the opposite side of its sign:
+
+- starting flat, the first signal opens a position, the rest are ignored;
+  the next run starts holding;
+- starting holding, the first signal closes; a second one reopens on the
+  run's side, so the next run starts holding again, otherwise flat.
+
+The first run starts flat, and every run after one of two or more signals
+starts holding. Between those anchors, runs of a single signal alternate
+between flat and holding, which leaves one cumulative maximum and a parity
+check for the whole state sequence.
+
+`Simulation` runs `simulate` over consecutive batches of a signal column,
+carrying the open position from one batch into the next, for backtests that
+stream their ticks.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import polars as pl
+
+from strategies.base import SIGNAL_BUY, SIGNAL_SELL
+
+LONG = 1
+SHORT = -1
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    """Trades in entry order; the last one may still be open (exit_index -1, NaN exit)."""
+
+    entry_index: np.ndarray  # row of the entry signal
+    exit_index: np.ndarray  # row of the exit signal, -1 while open
+    side: np.ndarray  # LONG / SHORT (int8)
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    pnl: np.ndarray  # NaN while open
+
+    @property
+    def trades(self) -> int:
+        return len(self.entry_index)
+
+    @property
+    def closed(self) -> int:
+        return int(np.count_nonzero(self.exit_index >= 0))
+
+    @property
+    def total_pnl(self) -> float:
+        """Sum of closed trade PnL, added up in exit order like the loop does."""
+        closed = self.pnl[: self.closed]
+        return float(np.cumsum(closed)[-1]) if len(closed) else 0.0
+
+    def to_frame(self) -> pl.DataFrame:
+        return pl.DataFrame(
+            {
+                "entry_index": self.entry_index,
+                "exit_index": self.exit_index,
+                "side": self.side,
+                "entry_price": self.entry_price,
+                "exit_price": self.exit_price,
+                "pnl": self.pnl,
+            }
+        )
+
+
+def _result(entries, exits, sides, entry_prices, exit_prices, pnl) -> BacktestResult:
+    return BacktestResult(
+        entry_index=np.asarray(entries, dtype=np.int64),
+        exit_index=np.asarray(exits, dtype=np.int64),
+        side=np.asarray(sides, dtype=np.int8),
+        entry_price=np.asarray(entry_prices, dtype=np.float64),
+        exit_price=np.asarray(exit_prices, dtype=np.float64),
+        pnl=np.asarray(pnl, dtype=np.float64),
+    )
+
+
+def simulate(signals, bid, ask) -> BacktestResult:
+    """Trades of a signal column, filled at *bid* / *ask* of the signal's row."""
+
+    signals = np.asarray(signals, dtype=np.int8)
+    bid = np.asarray(bid, dtype=np.float64)
+    ask = np.asarray(ask, dtype=np.float64)
+    if not (len(signals) == len(bid) == len(ask)):
+        raise ValueError("signals, bid and ask must have the same length")
+
+    events = np.flatnonzero(signals)  # rows with BUY or SELL
+    if not len(events):
+        return _result([], [], [], [], [], [])
+    signs = signals[events]
+
+    # Runs of equal signs and whether each one starts holding a position
+    starts = np.flatnonzero(np.r_[True, signs[1:] != signs[:-1]])
+    lengths = np.diff(np.r_[starts, len(signs)])
+    runs = np.arange(len(starts))
+    anchors = np.r_[False, lengths[:-1] >= 2]  # starts holding, whatever came before
+    last_anchor = np.maximum.accumulate(np.where(anchors, runs, 0))
+    holding = (last_anchor > 0) ^ ((runs - last_anchor) % 2 == 1)
+
+    opens = np.sort(
+        np.r_[starts[~holding], starts[holding & (lengths >= 2)] + 1]
+    )  # positions in `events`
+    closes = starts[holding]
+    entries, exits = events[opens], events[closes]
+
+    # BUY fills at the ask, SELL at the bid, whether it opens or closes
+    fill = np.where(signals == SIGNAL_BUY, ask, bid)
+    sides = signals[entries]
+    entry_prices = fill[entries]
+    n_open = len(entries) - len(exits)  # 0 or 1
+    exit_prices = np.r_[fill[exits], np.full(n_open, np.nan)]
+    pnl = np.where(sides == LONG, exit_prices - entry_prices, entry_prices - exit_prices)
+    return _result(
+        entries,
+        np.r_[exits, np.full(n_open, -1)],
+        sides,
+        entry_prices,
+        exit_prices,
+        pnl,
+    )
+
+
+class Simulation:
+    """`simulate` over a signal column arriving in batches; same trades as one call."""
+
+    def __init__(self):
+        self.rows = 0  # rows seen so far: offset of the next batch
+        self._closed: list[BacktestResult] = []
+        self._open: tuple[int, int, float] | None = None  # entry index, side, entry price
+
+    def update(self, signals, bid, ask) -> None:
+        signals = np.asarray(signals, dtype=np.int8)
+        bid = np.asarray(bid, dtype=np.float64)
+        ask = np.asarray(ask, dtype=np.float64)
+        n = len(signals)
+        carried = self._open
+        if carried is not None:
+            # A virtual first row reopens the carried position at its entry price
+            _, side, price = carried
+            signals = np.r_[np.int8(side), signals]
+            bid, ask = np.r_[price, bid], np.r_[price, ask]
+        batch = simulate(signals, bid, ask)
+        shift = self.rows - (carried is not None)
+        entries = batch.entry_index + shift
+        exits = np.where(batch.exit_index >= 0, batch.exit_index + shift, -1)
+        if carried is not None:
+            entries[0] = carried[0]
+        self.rows += n
+
+        closed = batch.closed
+        self._open = None
+        if closed < batch.trades:
+            self._open = (int(entries[-1]), int(batch.side[-1]), float(batch.entry_price[-1]))
+        self._closed.append(
+            _result(
+                entries[:closed],
+                exits[:closed],
+                batch.side[:closed],
+                batch.entry_price[:closed],
+                batch.exit_price[:closed],
+                batch.pnl[:closed],
+            )
+        )
+
+    def result(self) -> BacktestResult:
+        """Trades so far; a position still open is the last trade."""
+
+        parts = self._closed
+        if self._open is not None:
+            entry, side, price = self._open
+            parts = [*parts, _result([entry], [-1], [side], [price], [np.nan], [np.nan])]
+        if not parts:
+            return _result([], [], [], [], [], [])
+        return _result(
+            *(
+                np.concatenate([getattr(part, field) for part in parts])
+                for field in (
+                    "entry_index",
+                    "exit_index",
+                    "side",
+                    "entry_price",
+                    "exit_price",
+                    "pnl",
+                )
+            )
+        )
+
+
+def simulate_loop(signals, bid, ask) -> BacktestResult:
+    """Reference implementation of `simulate`: the original tick-by-tick loop."""
+
+    position = None
+    entry_price = 0.0
+    entries, exits, sides, entry_prices, exit_prices, pnl = [], [], [], [], [], []
+    for i, (signal, b, a) in enumerate(zip(signals, bid, ask, strict=True)):
+        if position is None:
+            if signal == SIGNAL_BUY:
+                position = LONG
+                entry_price = a
+            elif signal == SIGNAL_SELL:
+                position = SHORT
+                entry_price = b
+            else:
+                continue
+            entries.append(i)
+            sides.append(position)
+            entry_prices.append(entry_price)
+
+        elif position == LONG and signal == SIGNAL_SELL:
+            exits.append(i)
+            exit_prices.append(b)
+            pnl.append(b - entry_price)
+            position = None
+
+        elif position == SHORT and signal == SIGNAL_BUY:
+            exits.append(i)
+            exit_prices.append(a)
+            pnl.append(entry_price - a)
+            position = None
+
+    if position is not None:
+        exits.append(-1)
+        exit_prices.append(np.nan)
+        pnl.append(np.nan)
+    return _result(entries, exits, sides, entry_prices, exit_prices, pnl)
@@ -0,0 +1,134 @@
+"""Cached prediction streams for backtests.
+
+A processor's predictions depend on its configuration and on the ticks it
+learns from, not on the parameters of the strategies trading on them. Each
+stream is computed once by a fresh `DataProcessor` and kept on disk:
+
+- Key: SHA-256 of the processor config (`processor_config`: engine, learning
+  rate, model features) and of a fingerprint of the columns the processor
+  reads (`fingerprint`). Changing either computes a new stream.
+- Stored as `<directory>/<key>.arrow` (uncompressed Arrow IPC) with the
+  `predicted_price` / `predicted_change` columns, memory-mapped on load.
+- Written to a temp file in the same directory and renamed, so concurrent
+  workers or sweeps never read a partial file. An unreadable file is
+  recomputed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+
+import config
+from processor import LEARNING_RATE, DataProcessor
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+PREDICTION_COLUMNS = ("predicted_price", "predicted_change")
+INPUT_COLUMNS = ("bid", "ask", "bidVolume", "askVolume", "spread")
+
+
+def default_cache_dir() -> str:
+    return config.PREDICTION_CACHE_DIR or os.path.join(config.DATA_DIR, "_cache", "predictions")
+
+
+def processor_config(processor: DataProcessor) -> dict[str, Any]:
+    """Everything besides the ticks that the processor's predictions depend on."""
+
+    return {
+        "version": CACHE_VERSION,
+        "engine": processor.engine,
+        "depth_levels": processor.depth_levels,
+        "features": processor.feature_names,
+        "learning_rate": LEARNING_RATE,
+    }
+
+
+def fingerprint(frame: pl.DataFrame, columns: list[str]) -> str:
+    """BLAKE2 digest of the row count and the float64 values of *columns* (nulls as NaN)."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(frame.height).encode())
+    for name in columns:
+        values = np.ascontiguousarray(frame[name].cast(pl.Float64).to_numpy(), dtype=np.float64)
+        digest.update(name.encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Prediction streams keyed by processor config and data fingerprint."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def key(self, processor: DataProcessor, frame: pl.DataFrame) -> str:
+        # Registry features present as columns are used instead of being computed
+        features = [name for name in processor.feature_set.names if name in frame.columns]
+        payload = {
+            "processor": processor_config(processor),
+            "data": fingerprint(frame, [*INPUT_COLUMNS, *features]),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.arrow"
+
+    def load(self, key: str) -> pl.DataFrame | None:
+        path = self.path(key)
+        if not path.exists():
+            return None
+        try:
+            table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"🗃️ Ignoring unreadable prediction cache {path}: {e}")
+            return None
+        frame = pl.from_arrow(table)
+        assert isinstance(frame, pl.DataFrame)
+        return frame
+
+    def store(self, key: str, predictions: pl.DataFrame) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=self.directory)
+        try:
+            table = predictions.to_arrow()
+            with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+def predict(frame: pl.DataFrame, cache: PredictionCache | None = None, **processor_kwargs):
+    """
+    The `predicted_price` / `predicted_change` columns of a fresh
+    `DataProcessor(**processor_kwargs)` run over *frame* (one symbol's ticks),
+    from *cache* when it holds them.
+    """
+
+    processor = DataProcessor(**processor_kwargs)
+    key = None
+    if cache is not None:
+        key = cache.key(processor, frame)
+        cached = cache.load(key)
+        if cached is not None and cached.height == frame.height:
+            logger.debug(f"🗃️ Prediction cache hit {key[:12]}")
+            return cached
+
+    batch = processor.process_batch(frame)
+    predictions = pl.DataFrame({name: batch[name] for name in PREDICTION_COLUMNS})
+    if cache is not None and key is not None:
+        cache.store(key, predictions)
+    return predictions
@@ -0,0 +1,139 @@
+"""
+Momontum Parameter Sweep
+========================
+Backtests every combination of a parameter grid per strategy on every
+recorded symbol and prints the best combinations.
+
+The processor's predictions do not depend on strategy parameters (a momentum
+threshold only changes which predictions are traded), so each symbol's
+prediction stream is computed once for all the combinations trading on it
+and cached on disk (backtesting/predictions.py): later sweeps over the same
+data skip the model entirely. Every combination is then a vectorized signal
+pass plus the vectorized position engine, run on the bulk runner's process
+pool.
+
+Usage:
+    python backtesting/sweep.py                     # default grids, one worker per core
+    python backtesting/sweep.py --top 20            # 20 best combinations per symbol
+    python backtesting/sweep.py --workers 1 --no-cache
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import sys
+
+import polars as pl
+from prettytable import PrettyTable
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting.bulk_runner import ensure_symbols, load_data, run_parallel
+from backtesting.predictions import default_cache_dir
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.momentum import MomentumStrategy
+
+# Setup Logging
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("Sweep")
+
+# {strategy class: {constructor argument: values}}
+GRIDS = {
+    MomentumStrategy: {"threshold": [0.5, 1.0, 2.0, 5.0, 10.0]},
+    MeanReversionStrategy: {"window": [20, 50, 100, 200], "std_dev_mult": [1.5, 2.0, 2.5, 3.0]},
+}
+
+SCHEMA = {
+    "symbol": pl.Utf8,
+    "strategy": pl.Utf8,
+    "params": pl.Utf8,
+    "trades": pl.Int64,
+    "closed": pl.Int64,
+    "total_pnl": pl.Float64,
+    "avg_pnl": pl.Float64,
+}
+
+
+def expand_grid(grid):
+    """Every combination of a {parameter: values} grid as keyword dicts, in grid order."""
+    names = list(grid)
+    return [dict(zip(names, values, strict=True)) for values in itertools.product(*grid.values())]
+
+
+def build_strategies(grids):
+    """One strategy per combination of each class's grid, with its keyword arguments."""
+    strategies, params = [], []
+    for cls, grid in grids.items():
+        for kwargs in expand_grid(grid):
+            strategies.append(cls(**kwargs))
+            params.append(kwargs)
+    return strategies, params
+
+
+def run_sweep(df, grids, workers=None, cache_dir=None):
+    """
+    Backtests every grid combination on every symbol of *df* (see `run_parallel`).
+    Returns one row per (symbol, combination), best total PnL first within each
+    symbol.
+    """
+    strategies, params = build_strategies(grids)
+    rows = []
+    for i, symbol, result in run_parallel(df, strategies, workers=workers, cache_dir=cache_dir):
+        pnl, trades = result.total_pnl, result.trades
+        rows.append(
+            {
+                "symbol": symbol,
+                "strategy": strategies[i].name,
+                "params": ", ".join(f"{name}={value}" for name, value in params[i].items()),
+                "trades": trades,
+                "closed": result.closed,
+                "total_pnl": pnl,
+                "avg_pnl": pnl / trades if trades > 0 else 0.0,
+                "combination": i,  # Completion order -> grid order among ties
+            }
+        )
+    frame = pl.DataFrame(rows, schema={**SCHEMA, "combination": pl.Int64})
+    return frame.sort(["symbol", "total_pnl", "combination"], descending=[False, True, False]).drop(
+        "combination"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep strategy parameter grids.")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: cores)")
+    parser.add_argument("--no-cache", action="store_true", help="recompute prediction streams")
+    parser.add_argument("--top", type=int, default=10, help="combinations shown per symbol")
+    args = parser.parse_args()
+
+    df = load_data()
+    if df is None:
+        return
+    df = ensure_symbols(df)
+
+    combinations = sum(len(expand_grid(grid)) for grid in GRIDS.values())
+    logger.info(f"🚀 Sweeping {combinations} combinations over {df['symbol'].n_unique()} assets...")
+    cache_dir = None if args.no_cache else default_cache_dir()
+    results = run_sweep(df, GRIDS, workers=args.workers, cache_dir=cache_dir)
+
+    table = PrettyTable()
+    table.field_names = ["Symbol", "Strategy", "Params", "Total PnL", "Trades", "Avg PnL"]
+    for row in results.group_by("symbol", maintain_order=True).head(args.top).iter_rows(named=True):
+        table.add_row(
+            [
+                row["symbol"],
+                row["strategy"],
+                row["params"],
+                f"{row['total_pnl']:.2f}",
+                row["trades"],
+                f"{row['avg_pnl']:.2f}",
+            ]
+        )
+
+    print("\n")
+    print(table)
+
+
+if __name__ == "__main__":
+    main()
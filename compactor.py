@@ -0,0 +1,68 @@
+"""
+Momontum Data Lake Compactor
+============================
+Merges small Parquet part files into one large file per symbol and day.
+
+Usage:
+    python compactor.py                      # migrate legacy files + compact closed days
+    python compactor.py --workers 4          # compact partitions in parallel
+    python compactor.py --include-today      # also compact the current UTC day
+"""
+
+import argparse
+import logging
+import os
+
+import config
+from data_lake.asset_manager import AssetManager
+from momontum.data.compaction import CompactionOptions, compact, migrate_legacy
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("Compactor")
+
+
+def known_symbols() -> dict[str, str]:
+    """Maps slash-less tokens (BTCUSDT) to canonical symbols (BTC/USDT) for legacy files."""
+    symbols: set[str] = set()
+    for name in ("BTC", "ETH", "TOP_3", "TOP_10", "MEME_BASKET", "DEFI_BLUECHIPS"):
+        symbols.update(AssetManager.get_basket(name))
+    return {s.replace("/", ""): s for s in symbols}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact the Momontum data lake.")
+    parser.add_argument("--root", default=config.DATA_DIR)
+    parser.add_argument("--dataset", default=TICKS_DATASET)
+    parser.add_argument("--timeframe", default=TICK_TIMEFRAME)
+    parser.add_argument("--time-column", default="timestamp")
+    parser.add_argument("--symbol", action="append", dest="symbols")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--row-group-size", type=int, default=CompactionOptions.row_group_size)
+    parser.add_argument("--include-today", action="store_true")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_legacy and args.dataset == TICKS_DATASET:
+        migrate_legacy(args.root, symbol_map=known_symbols())
+
+    results = compact(
+        args.root,
+        args.dataset,
+        args.timeframe,
+        symbols=args.symbols,
+        include_today=args.include_today,
+        options=CompactionOptions(time_column=args.time_column, row_group_size=args.row_group_size),
+        workers=args.workers,
+    )
+
+    files_in = sum(r.inputs for r in results)
+    rows_removed = sum(r.rows_in - r.rows_out for r in results)
+    logger.info(
+        f"✅ Compacted {len(results)} partitions ({files_in} files, "
+        f"{rows_removed} duplicate rows removed)"
+    )
+
+
+if __name__ == "__main__":
+    main()
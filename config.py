@@ -9,10 +9,86 @@ load_dotenv()
 TARGET_BASKET = "BTC"
 TIMEFRAME = "1m"
 EXCHANGE_ID = "binanceusdm"  # Binance Futures
+ORDERBOOK_MULTIPLEX = False  # One order book stream for the whole basket
+RECONNECT_MIN_DELAY = 1.0  # multiplexed stream reconnect backoff (doubles up to max)
+RECONNECT_MAX_DELAY = 30.0
 
 # Data Settings
 DATA_DIR = "./data_lake"
 BUFFER_SIZE = 50  # Flush every 50 ticks (Low for testing, increase for prod)
+MAX_BUFFER_MEMORY_MB = 256  # RAM cap for tick buffers across the whole basket
+WRITER_QUEUE_SIZE = 64  # Max flushed batches waiting for the background writer
+
+# Trades dataset (trades/trade/...): one watch_trades stream per symbol
+TRADES_ENABLED = True
+TRADE_BUFFER_SIZE = 500  # Flush every N trades
+
+# L2 depth dataset (depth/l<N>/...): 0 disables; Binance streams 5, 10 or 20 levels
+DEPTH_LEVELS = 0
+DEPTH_MODE = "snapshot"  # "snapshot" (all levels per row) or "diff" (changed levels only)
+DEPTH_KEYFRAME_INTERVAL = 100  # diff mode: full snapshot row every N rows
+
+# Candles dataset (candles/<interval>/...): OHLC of the mid price, built while harvesting.
+# Empty disables; older tick files can be backfilled with `python backfill.py`.
+CANDLE_INTERVALS = ("1s", "1min", "5min", "1h")
+CANDLE_FLUSH_SECONDS = 60.0  # write closed candles at least this often
+CANDLE_CLOSE_GRACE_SECONDS = 2.0  # close a quiet bucket this long after its end
+
+# Processing stage (model, strategy, trader) behind per-symbol queues; recording is lossless.
+# "none": process every update (ingestion waits once PROCESSING_QUEUE_SIZE updates are pending)
+# "latest": process only the newest pending update, skip stale ones
+PROCESSING_CONFLATION = "none"
+PROCESSING_QUEUE_SIZE = 10_000
+
+# Online model engine (processor.py): "river" (River pipeline, the default) or "numpy" (opt-in:
+# same scaler + SGD regression on float vectors, about twice as fast, predictions equal to float
+# rounding; DataProcessor.process_batch runs it over whole columns)
+PROCESSOR_ENGINE = "river"
+# One vectorized model step for every symbol with a pending update instead of one
+# DataProcessor per symbol; pays off for large baskets (dozens of symbols)
+BASKET_PROCESSING = False
+# Extra model inputs from the feature registry (momontum/features.py), e.g. ("ema_20", "vol_100");
+# computed incrementally per tick, or taken from the features dataset in batch runs
+MODEL_FEATURES: tuple[str, ...] = ()
+# Features dataset (features/tick/...) materialized by `python backfill.py --features`
+FEATURES = ("ema_20", "vol_100", "ofi_10", "microprice", "zscore_100")
+
+# Processor checkpoints (<dir>/<symbol>.ckpt) for warm restarts: saved periodically and at
+# shutdown, loaded at startup. None: <DATA_DIR>/_checkpoints
+CHECKPOINT_ENABLED = True
+CHECKPOINT_DIR: str | None = None
+CHECKPOINT_INTERVAL_SECONDS = 60.0
+# Symbols without a checkpoint replay their last N recorded ticks at startup (0 disables)
+CHECKPOINT_FAST_FORWARD_TICKS = 20_000
+
+# Backtest prediction streams (backtesting/predictions.py), cached per processor config and
+# symbol data so strategy parameter sweeps train the model once. None: <DATA_DIR>/_cache/predictions
+PREDICTION_CACHE_DIR: str | None = None
+
+# Rolling Parquet files: rotate the open part file when any limit is hit (None disables)
+ROTATE_MAX_ROWS = 1_000_000
+ROTATE_MAX_BYTES = 128 * 1024 * 1024
+ROTATE_MAX_SECONDS = 3600
+
+# Write-ahead tick journal (crash recovery for ticks not yet in a closed Parquet file)
+JOURNAL_ENABLED = True
+JOURNAL_DIR = os.path.join(DATA_DIR, "_journal")
+JOURNAL_FSYNC_INTERVAL = 1.0  # seconds between batched msync calls
+
+# Sharded harvester (supervisor.py): N worker processes feeding one writer
+HARVEST_WORKERS = 4
+WORKER_HEARTBEAT_SECONDS = 5.0  # worker -> supervisor status interval
+WORKER_STALL_SECONDS = 60.0  # kill (and restart) a worker silent for this long
+WORKER_RESTART_MIN_DELAY = 1.0  # restart backoff doubles up to the max delay
+WORKER_RESTART_MAX_DELAY = 60.0
+WORKER_SHUTDOWN_SECONDS = 30.0  # time a worker waits for its final durability acks
+
+# Prometheus metrics endpoint (http://HOST:PORT/metrics); None disables.
+# Sharded workers (supervisor.py) listen on PORT + 1 + shard id.
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+METRICS_LOOP_LAG_INTERVAL = 0.5  # seconds between event loop lag samples
+CLOCK_OFFSET_WINDOW_SECONDS = 60.0  # sliding window of the exchange clock offset estimate
 
 # Alerting
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN", "")
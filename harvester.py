@@ -5,24 +5,77 @@ Production-grade async engine for streaming crypto market data.
 
 Features:
 - Connects to Binance Futures via WebSocket (using ccxt.pro)
-- Streams Tickers (Price) and Trades (Volume)
-- Buffers data in memory and dumps to Parquet every minute
+- Streams Tickers (Price) and Trades (Volume); the latest trade fills `last` in ticks
+- Buffers data in memory and appends it to rolling Parquet files
+- Parquet flushes run on a background writer thread (bounded queue, backpressure)
+- Write-ahead tick journal (mmap) replayed on startup after a crash
 - Telegram Alert skeleton for crash notifications
 - Multi-Asset Support via AssetManager
+- OHLC candles at several intervals, aggregated incrementally from the ticks
+- Optional L2 depth dataset (all N levels as fixed-size arrays, or diff-encoded)
+- Optional multiplexed order book stream for the whole basket (one reconnect
+  instead of one per symbol)
+- Recording and decision-making run as separate tasks joined by per-symbol
+  queues; processing can conflate to the newest book when it lags
+- Optional basket processing: one task runs the model for every symbol with a
+  pending update in a single vectorized step (large baskets)
+- Processor checkpoints saved periodically and at shutdown, loaded at startup
+  (or the model is fast-forwarded over recent ticks) so restarts start warm
+- Prometheus metrics at /metrics: ticks and trades per symbol, exchange-to-local
+  latency, clock offset, event loop lag, flush duration, buffer occupancy
+- Sink mode: flushed batches go to a supervisor process instead of local files
+  (see supervisor.py for the multi-process sharded harvester)
 """
 
 import asyncio
+import functools
 import logging
+import math
 import os
+import signal
+import threading
+import time
 from datetime import datetime
-from typing import Any
 
 import ccxt.pro as ccxt
-import pandas as pd
+import pyarrow as pa
 
 import config
 from data_lake.asset_manager import AssetManager
-from processor import DataProcessor
+from momontum.checkpoint import (
+    checkpoint_path,
+    dump_checkpoint,
+    load_checkpoint,
+    recent_ticks,
+    write_checkpoint,
+)
+from momontum.data.buffers import TickBuffer, TradeBuffer, capacity_for_budget
+from momontum.data.candles import CANDLE_TIME_COLUMN, CandleAggregator
+from momontum.data.depth import DepthBuffer, DepthDiffBuffer, depth_timeframe, make_depth_buffer
+from momontum.data.ipc import QueueTickSink
+from momontum.data.journal import TickJournal, journal_path, replay_journals
+from momontum.data.layout import (
+    CANDLES_DATASET,
+    DEPTH_DATASET,
+    TICK_TIMEFRAME,
+    TICKS_DATASET,
+    TRADE_TIMEFRAME,
+    TRADES_DATASET,
+)
+from momontum.data.rotation import RollingParquetWriter, RotationPolicy
+from momontum.data.writer import BackgroundWriter
+from momontum.metrics import (
+    LATENCY_MS_BUCKETS,
+    ClockOffsetEstimator,
+    CounterValue,
+    HistogramValue,
+    MetricsRegistry,
+    MetricsServer,
+    measure_loop_lag,
+)
+from momontum.queues import ConflatingQueue
+from momontum.schemas import TICKS_SCHEMA_V1, TRADES_SCHEMA_V1
+from processor import BasketProcessor, DataProcessor
 from strategies.base import Signal
 from strategies.momentum import MomentumStrategy
 from trader import Trader
@@ -39,41 +92,254 @@ class DataHarvester:
     """
 
     def __init__(
-        self, basket_name: str = config.TARGET_BASKET, exchange_id: str = config.EXCHANGE_ID
+        self,
+        basket_name: str = config.TARGET_BASKET,
+        exchange_id: str = config.EXCHANGE_ID,
+        *,
+        symbols: list[str] | None = None,
+        exchange=None,
+        sink: QueueTickSink | None = None,
+        multiplex: bool | None = None,
+        metrics_port: int | None = None,
+        basket_processing: bool | None = None,
     ):
+        """
+        symbols:   harvest only these symbols instead of the whole basket (one shard)
+        exchange:  ccxt.pro-compatible client to use instead of creating one
+                   (e.g. momontum.exchange.fake.FakeExchange for tests)
+        sink:      send flushed batches here instead of writing Parquet locally;
+                   the receiving process owns the files and journal replay
+        multiplex: one order book stream for the whole basket instead of one
+                   per symbol (default: config.ORDERBOOK_MULTIPLEX)
+        metrics_port: port of the /metrics endpoint (default: config.METRICS_PORT;
+                   0 picks a free port)
+        basket_processing: one BasketProcessor for all symbols instead of one
+                   DataProcessor per symbol (default: config.BASKET_PROCESSING)
+        """
         self.basket_name = basket_name
-        self.symbols = AssetManager.get_basket(basket_name)
+        self.symbols = symbols if symbols is not None else AssetManager.get_basket(basket_name)
         self.exchange_id = exchange_id
+        self.sink = sink
 
         logger.info(
             f"🧺 Initializing Harvester for Basket: {basket_name} ({len(self.symbols)} assets)"
         )
 
-        self.exchange = getattr(ccxt, exchange_id)(
-            {
-                "enableRateLimit": True,
-                "options": {
-                    "defaultType": "future",
-                },
-            }
+        if exchange is None:
+            exchange = getattr(ccxt, exchange_id)(
+                {
+                    "enableRateLimit": True,
+                    "options": {
+                        "defaultType": "future",
+                    },
+                }
+            )
+        self.exchange = exchange
+        if multiplex is None:
+            multiplex = config.ORDERBOOK_MULTIPLEX
+        # Fall back to per-symbol streams if the exchange cannot multiplex
+        self.multiplex = bool(multiplex) and bool(
+            getattr(exchange, "has", {}).get("watchOrderBookForSymbols")
         )
 
-        # Buffers: { 'BTC/USDT': [records], 'ETH/USDT': [records] }
-        self.buffers: dict[str, list[dict[str, Any]]] = {s: [] for s in self.symbols}
-        self.is_running = True
+        self.trades_enabled = config.TRADES_ENABLED and bool(
+            getattr(self.exchange, "has", {}).get("watchTrades")
+        )
 
-        # Create storage directory
-        if not os.path.exists(config.DATA_DIR):
-            os.makedirs(config.DATA_DIR)
-            logger.info(f"📁 Created data directory: {config.DATA_DIR}")
+        # Buffers: { 'BTC/USDT': TickBuffer, ... } - preallocated columnar arrays.
+        # Capacity is capped so the whole basket stays within MAX_BUFFER_MEMORY_MB
+        # (split evenly between tick and trade buffers).
+        n_buffers = len(self.symbols) * (2 if self.trades_enabled else 1)
+        budget = config.MAX_BUFFER_MEMORY_MB * 1024 * 1024
+        capacity = capacity_for_budget(
+            TICKS_SCHEMA_V1,
+            n_buffers=n_buffers,
+            budget_bytes=budget,
+            max_capacity=config.BUFFER_SIZE,
+            constants={"symbol": ""},
+        )
+        self.buffers: dict[str, TickBuffer] = {s: TickBuffer(s, capacity) for s in self.symbols}
+
+        # Trades: { 'BTC/USDT': TradeBuffer, ... } (empty if disabled)
+        self.trade_buffers: dict[str, TradeBuffer] = {}
+        if self.trades_enabled:
+            trade_capacity = capacity_for_budget(
+                TRADES_SCHEMA_V1,
+                n_buffers=n_buffers,
+                budget_bytes=budget,
+                max_capacity=config.TRADE_BUFFER_SIZE,
+                constants={"symbol": ""},
+            )
+            self.trade_buffers = {s: TradeBuffer(s, trade_capacity) for s in self.symbols}
+
+        # Optional L2 depth: { 'BTC/USDT': DepthBuffer | DepthDiffBuffer } (empty if disabled)
+        self.depth_levels = config.DEPTH_LEVELS
+        self.depth_timeframe = depth_timeframe(self.depth_levels, config.DEPTH_MODE)
+        self.depth_buffers: dict[str, DepthBuffer | DepthDiffBuffer] = {}
+        if self.depth_levels > 0:
+            self.depth_buffers = {
+                s: make_depth_buffer(
+                    s,
+                    self.depth_levels,
+                    config.BUFFER_SIZE,
+                    config.DEPTH_MODE,
+                    keyframe_interval=config.DEPTH_KEYFRAME_INTERVAL,
+                )
+                for s in self.symbols
+            }
+        self.book_limit = max(5, self.depth_levels)
+
+        # Candles: { 'BTC/USDT': CandleAggregator } (empty if disabled)
+        self.candles: dict[str, CandleAggregator] = {
+            s: CandleAggregator(s, config.CANDLE_INTERVALS)
+            for s in self.symbols
+            if config.CANDLE_INTERVALS
+        }
+
+        # Writer stage: Parquet compression + disk I/O run off the event loop
+        self.writer = BackgroundWriter(max_queue=config.WRITER_QUEUE_SIZE)
+        self.tick_writer: RollingParquetWriter | None = None
+        self.depth_writer: RollingParquetWriter | None = None
+        self.trade_writer: RollingParquetWriter | None = None
+        self.candle_writers: dict[str, RollingParquetWriter] = {}
+        self.is_running = True
 
-        # Initialize Brains & Strategies (One per symbol to maintain state)
-        self.processors = {s: DataProcessor() for s in self.symbols}
+        if sink is None:
+            # Canonical layout: ticks/tick/<symbol>/YYYY/MM/DD/part-NNNN.parquet
+            # One open file per symbol/day, each flush appended as a row group.
+            self.tick_writer = make_rolling_writer()
+
+            # Create storage directory
+            if not os.path.exists(config.DATA_DIR):
+                os.makedirs(config.DATA_DIR)
+                logger.info(f"📁 Created data directory: {config.DATA_DIR}")
+
+            # Finalize files left open by a previous (crashed) run, then replay
+            # journaled ticks that never made it into a closed file
+            recovered, _ = self.tick_writer.recover()
+            if config.JOURNAL_ENABLED:
+                replay_journals(config.JOURNAL_DIR, self.tick_writer, recovered)
+            self.tick_writer.on_durable = self._on_ticks_durable
+            if self.depth_buffers:
+                self.depth_writer = make_rolling_writer(DEPTH_DATASET, self.depth_timeframe)
+                self.depth_writer.recover()
+            if self.trade_buffers:
+                self.trade_writer = make_rolling_writer(TRADES_DATASET, TRADE_TIMEFRAME)
+                self.trade_writer.recover()
+            for interval in config.CANDLE_INTERVALS if self.candles else ():
+                self.candle_writers[interval] = make_rolling_writer(CANDLES_DATASET, interval)
+                self.candle_writers[interval].recover()
+
+        # In sink mode the journals may still hold ticks from a worker that died;
+        # harvest() resends them and the supervisor drops rows it already has.
+        self.journals: dict[str, TickJournal] = {}
+        if config.JOURNAL_ENABLED:
+            self.journals = {
+                s: TickJournal(journal_path(config.JOURNAL_DIR, s), s) for s in self.symbols
+            }
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+
+        # Initialize Brains & Strategies (One per symbol to maintain state,
+        # or one basket processor holding every symbol's state as array rows)
+        if basket_processing is None:
+            basket_processing = config.BASKET_PROCESSING
+        self.basket: BasketProcessor | None = None
+        self.processors: dict[str, DataProcessor] = {}
+        if basket_processing:
+            self.basket = BasketProcessor(self.symbols, depth_levels=self.depth_levels)
+        else:
+            self.processors = {
+                s: DataProcessor(depth_levels=self.depth_levels) for s in self.symbols
+            }
+        # Warm start from the last checkpoints (None: checkpoints disabled)
+        self.checkpoint_dir: str | None = None
+        if config.CHECKPOINT_ENABLED:
+            self.checkpoint_dir = config.CHECKPOINT_DIR or os.path.join(
+                config.DATA_DIR, "_checkpoints"
+            )
+            self.restore_processors()
         self.strategies = {s: MomentumStrategy(threshold=5.0) for s in self.symbols}
+        # Ingestion -> processing hand-off (recording never waits on the brain)
+        self.processing_ready = asyncio.Event()
+        self.queues: dict[str, ConflatingQueue[dict]] = {
+            s: ConflatingQueue(
+                config.PROCESSING_CONFLATION,
+                config.PROCESSING_QUEUE_SIZE,
+                ready=self.processing_ready if basket_processing else None,
+            )
+            for s in self.symbols
+        }
 
         # Shared Trader (Execution Layer)
         self.trader = Trader(self.exchange, dry_run=True)
 
+        self.metrics_port = config.METRICS_PORT if metrics_port is None else metrics_port
+        self._init_metrics()
+
+    def _init_metrics(self) -> None:
+        """Registers the harvester metrics; per-symbol series are bound once here."""
+        self.metrics = MetricsRegistry()
+        ticks = self.metrics.counter("ticks_total", "Order book updates received", ["symbol"])
+        trades = self.metrics.counter("trades_total", "Public trades received", ["symbol"])
+        latency = self.metrics.histogram(
+            "exchange_latency_ms",
+            "Local receive time minus exchange timestamp (includes clock offset)",
+            ["symbol"],
+            buckets=LATENCY_MS_BUCKETS,
+        )
+        self.tick_counters: dict[str, CounterValue] = {s: ticks.labels(s) for s in self.symbols}
+        self.trade_counters: dict[str, CounterValue] = {s: trades.labels(s) for s in self.symbols}
+        self.latency: dict[str, HistogramValue] = {s: latency.labels(s) for s in self.symbols}
+
+        self.clock = ClockOffsetEstimator(config.CLOCK_OFFSET_WINDOW_SECONDS)
+        self.metrics.callback_gauge(
+            "clock_offset_ms",
+            f"Minimum exchange-to-local delay over the last {self.clock.window_seconds:g}s",
+            lambda: self.clock.offset_ms,
+        )
+        self.loop_lag = self.metrics.histogram(
+            "event_loop_lag_seconds", "Extra delay of a scheduled event loop wakeup"
+        )
+        flush = self.metrics.histogram("flush_seconds", "Parquet write duration per batch")
+        self.writer.on_flush = lambda seconds, rows: flush.observe(seconds)
+        self.metrics.callback_gauge(
+            "writer_queue_depth",
+            "Batches waiting for the writer",
+            lambda: self.writer.stats.queue_depth,
+        )
+        self.metrics.callback_gauge(
+            "buffer_fill_ratio",
+            "Tick buffer occupancy (rows / capacity)",
+            lambda: {(s,): len(b) / b.capacity for s, b in self.buffers.items()},
+            ["symbol"],
+        )
+        self.metrics.callback_gauge(
+            "buffer_memory_bytes", "Bytes held by all in-memory buffers", self.buffer_memory
+        )
+        self.metrics.callback_gauge(
+            "processing_queue_depth",
+            "Recorded updates waiting for processing",
+            lambda: {(s,): len(q) for s, q in self.queues.items()},
+            ["symbol"],
+        )
+        self.metrics.callback_counter(
+            "processing_skipped_total",
+            "Updates recorded but not processed (conflated to a newer book)",
+            lambda: {(s,): n for s, n in self.skipped_counts.items()},
+            ["symbol"],
+        )
+
+    @property
+    def tick_counts(self) -> dict[str, int]:
+        """Order book updates received per symbol."""
+        return {s: int(counter.value) for s, counter in self.tick_counters.items()}
+
+    @property
+    def skipped_counts(self) -> dict[str, int]:
+        """Recorded updates that processing skipped (superseded by a newer book)."""
+        return {s: queue.skipped for s, queue in self.queues.items()}
+
     async def send_telegram_alert(self, message: str) -> None:
         """Sends critical alerts to your phone."""
         if config.TELEGRAM_TOKEN and config.TELEGRAM_CHAT_ID:
@@ -81,25 +347,362 @@ class DataHarvester:
         else:
             logger.error(f"ALERT (No Telegram Configured): {message}")
 
+    def _on_ticks_durable(self, symbol: str, seq: int) -> None:
+        """Writer callback: ticks up to *seq* are in a closed file, drop them from the journal."""
+        journal = self.journals.get(symbol)
+        if journal is None:
+            return
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            # Called from the writer thread; journals are only touched on the loop.
+            self._loop.call_soon_threadsafe(journal.truncate_through, seq)
+        else:
+            journal.truncate_through(seq)
+
+    async def sync_journals(self) -> None:
+        """Batched fsync of all journals, off the event loop."""
+        loop = asyncio.get_running_loop()
+        while self.is_running:
+            await asyncio.sleep(config.JOURNAL_FSYNC_INTERVAL)
+            for journal in self.journals.values():
+                await loop.run_in_executor(None, journal.sync)
+
+    def buffer_memory(self) -> int:
+        """Approximate bytes held by all tick, trade, depth and candle buffers."""
+        ticks = sum(buffer.nbytes for buffer in self.buffers.values())
+        trades = sum(buffer.nbytes for buffer in self.trade_buffers.values())
+        depth = sum(buffer.nbytes for buffer in self.depth_buffers.values())
+        return ticks + trades + depth + sum(c.nbytes for c in self.candles.values())
+
     async def save_buffer(self, symbol: str) -> None:
         """Flushes strictly the buffer for the given symbol."""
-        buffer = self.buffers.get(symbol, [])
-        if not buffer:
+        buffer = self.buffers.get(symbol)
+        if buffer is None or not len(buffer):
             return
 
-        df = pd.DataFrame(buffer)
+        batch = buffer.to_record_batch()
+        buffer.clear()  # Batch owns a copy, so the arrays can be reused right away
 
-        # Generate filename: binanceusdm_BTCUSDT_2023-10-27_10-00.parquet
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_symbol = symbol.replace("/", "")
-        filename = f"{self.exchange_id}_{safe_symbol}_{timestamp}.parquet"
-        filepath = os.path.join(config.DATA_DIR, filename)
+        # Tag the batch with the journal position it covers, so the journal can
+        # be truncated once these rows are in a closed file
+        journal = self.journals.get(symbol)
+        watermark = journal.last_seq if journal is not None else None
 
-        # Save using PyArrow engine
-        df.to_parquet(filepath, engine="pyarrow", compression="snappy")
+        if self.sink is not None:
+            # Supervisor owns the files (waits here if its writer falls behind)
+            await self.sink.submit(batch, watermark)
+        else:
+            # Partitioned write on the writer thread (waits here if it falls behind)
+            assert self.tick_writer is not None
+            await self.writer.submit(
+                functools.partial(self.tick_writer.write_batch, watermark=watermark), batch
+            )
+
+        logger.info(f"💾 {symbol}: Queued {batch.num_rows} records for {TICKS_DATASET}/")
+
+    async def save_depth(self, symbol: str) -> None:
+        """Flushes the L2 depth buffer for the given symbol."""
+        buffer = self.depth_buffers.get(symbol)
+        if buffer is None or not len(buffer):
+            return
 
-        logger.info(f"💾 {symbol}: Flushed {len(df)} records to {filename}")
-        self.buffers[symbol] = []  # Clear specific buffer
+        batch = buffer.to_record_batch()
+        buffer.clear()
+
+        if self.sink is not None:
+            await self.sink.submit(batch, dataset=DEPTH_DATASET, timeframe=self.depth_timeframe)
+        else:
+            assert self.depth_writer is not None
+            await self.writer.submit(self.depth_writer.write_batch, batch)
+
+    async def save_trades(self, symbol: str) -> None:
+        """Flushes the trade buffer for the given symbol."""
+        buffer = self.trade_buffers.get(symbol)
+        if buffer is None or not len(buffer):
+            return
+
+        batch = buffer.to_record_batch()
+        buffer.clear()
+
+        if self.sink is not None:
+            await self.sink.submit(batch, dataset=TRADES_DATASET, timeframe=TRADE_TIMEFRAME)
+        else:
+            assert self.trade_writer is not None
+            await self.writer.submit(self.trade_writer.write_batch, batch)
+
+    async def save_candles(self, symbol: str) -> None:
+        """Flushes the closed candles of the given symbol (open buckets stay in memory)."""
+        candles = self.candles.get(symbol)
+        if candles is None:
+            return
+
+        for interval, batch in candles.drain():
+            if self.sink is not None:
+                await self.sink.submit(batch, dataset=CANDLES_DATASET, timeframe=interval)
+            else:
+                await self.writer.submit(self.candle_writers[interval].write_batch, batch)
+
+    async def close_candles(self) -> None:
+        """Closes candle buckets on time boundaries even when no tick arrives, and flushes."""
+        grace_ms = config.CANDLE_CLOSE_GRACE_SECONDS * 1000
+        next_flush = time.monotonic() + config.CANDLE_FLUSH_SECONDS
+        while self.is_running:
+            await asyncio.sleep(1.0)
+            # Exchange time: bucket ends are exchange timestamps, not local ones
+            offset = self.clock.offset_ms  # NaN until the first tick
+            now_ms = time.time() * 1000 - (0.0 if math.isnan(offset) else offset)
+            for candles in self.candles.values():
+                candles.close_expired(now_ms - grace_ms)
+            if time.monotonic() >= next_flush:
+                next_flush = time.monotonic() + config.CANDLE_FLUSH_SECONDS
+                for symbol in self.candles:
+                    await self.save_candles(symbol)
+
+    async def resend_journals(self) -> None:
+        """Sink mode: send ticks left in the journals by a previous (dead) worker."""
+        assert self.sink is not None
+        for symbol, journal in self.journals.items():
+            batch = journal.read()
+            if batch.num_rows:
+                logger.warning(f"♻️ {symbol}: resending {batch.num_rows} journaled ticks")
+                await self.sink.submit(batch, journal.last_seq)
+
+    async def on_order_book(self, symbol: str, orderbook: dict) -> None:
+        """Ingestion for one order book update: buffer, journal, depth, then queue for processing."""
+        buffer = self.buffers[symbol]
+
+        bid = orderbook["bids"][0][0] if orderbook["bids"] else None
+        ask = orderbook["asks"][0][0] if orderbook["asks"] else None
+        bid_vol = orderbook["bids"][0][1] if orderbook["bids"] else None
+        ask_vol = orderbook["asks"][0][1] if orderbook["asks"] else None
+
+        timestamp = orderbook["timestamp"]
+        dt = orderbook["datetime"]
+        spread = ask - bid if ask and bid else None
+        spread_pct = ((ask - bid) / bid * 100) if ask and bid else None
+        local_ts = datetime.now().timestamp()
+        last = buffer.last  # kept current by harvest_trades
+
+        self.tick_counters[symbol].inc()
+        if timestamp is not None:
+            self.latency[symbol].observe(self.clock.update(timestamp, local_ts))
+
+        # RECORD: columnar append (column order of TICKS_SCHEMA_V1)
+        buffer.append(
+            timestamp,
+            dt,
+            bid,
+            ask,
+            bid_vol,
+            ask_vol,
+            last,
+            spread,
+            spread_pct,
+            local_ts,
+        )
+
+        # JOURNAL: crash-safe copy (mmap write, no syscall)
+        journal = self.journals.get(symbol)
+        if journal is not None:
+            journal.append(
+                timestamp,
+                bid,
+                ask,
+                bid_vol,
+                ask_vol,
+                last,
+                spread,
+                spread_pct,
+                local_ts,
+            )
+
+        # Flush to disk every N ticks (or when the RAM-capped buffer fills)
+        if buffer.is_full:
+            await self.save_buffer(symbol)
+
+        # DEPTH: all N levels of both sides (optional)
+        depth = self.depth_buffers.get(symbol)
+        if depth is not None:
+            depth.append(timestamp, local_ts, orderbook["bids"], orderbook["asks"])
+            if depth.is_full:
+                await self.save_depth(symbol)
+
+        # CANDLES: O(1) OHLC update per interval (mid price)
+        candles = self.candles.get(symbol)
+        if candles is not None and timestamp is not None and bid and ask:
+            candles.update(timestamp, (bid + ask) / 2)
+            if candles.needs_flush:
+                await self.save_candles(symbol)
+
+        # Flatten the data structure
+        record = {
+            "symbol": symbol,  # Add symbol to record
+            "timestamp": timestamp,
+            "datetime": dt,
+            "bid": bid,
+            "ask": ask,
+            "bidVolume": bid_vol,
+            "askVolume": ask_vol,
+            "last": last,
+            "spread": spread,
+            "spread_pct": spread_pct,
+            "local_timestamp": local_ts,
+        }
+        if self.depth_levels:
+            # Top levels for depth features, copied: ccxt updates its books in place
+            record["bids"] = [level[:2] for level in orderbook["bids"][: self.depth_levels]]
+            record["asks"] = [level[:2] for level in orderbook["asks"][: self.depth_levels]]
+
+        # Hand off to the processing task (waits only if it is far behind and not conflating)
+        await self.queues[symbol].put(record)
+
+    async def process_record(self, symbol: str, record: dict) -> None:
+        """Decision pipeline for one recorded update: brain, strategy, trade."""
+        # PROCESS: Feed to The Brain
+        processor = self.processors[symbol]
+        prediction = processor.process(record)
+        await self.act(symbol, record, prediction)
+
+    async def process_records(self, updates: list[tuple[str, dict]]) -> None:
+        """Decision pipeline for pending updates of several symbols (basket processing)."""
+        assert self.basket is not None
+        predictions = self.basket.process_many(updates)
+        for (symbol, record), prediction in zip(updates, predictions, strict=True):
+            try:
+                await self.act(symbol, record, prediction)
+            except Exception as e:
+                logger.error(f"[{symbol}] Processing Error: {e}")
+
+    async def act(self, symbol: str, record: dict, prediction: dict | None) -> None:
+        """Strategy and execution for one update's prediction."""
+        if prediction:
+            # Log less frequently for multi-asset to avoid spam
+            # logger.info(f"[{symbol}] 🔮 Pred: {prediction['predicted_price']:.2f}")
+
+            # SIGNAL GENERATION
+            strategy = self.strategies[symbol]
+            signal = strategy.on_tick(record, prediction)
+
+            if signal != Signal.HOLD:
+                bid, ask = record["bid"], record["ask"]
+                mid_price = (bid + ask) / 2 if bid and ask else 0
+                # EXECUTION with Symbol
+                await self.trader.execute_trade(symbol, signal, current_price=mid_price)
+
+    async def process_symbol(self, symbol: str) -> None:
+        """Async task consuming the recorded updates of a single symbol."""
+        queue = self.queues[symbol]
+        while self.is_running:
+            record = await queue.get()
+            try:
+                await self.process_record(symbol, record)
+            except Exception as e:
+                logger.error(f"[{symbol}] Processing Error: {e}")
+
+    async def process_basket(self) -> None:
+        """Async task consuming the recorded updates of every symbol, a round at a time.
+
+        Each round takes the oldest pending update of every symbol that has one
+        and runs the model for all of them in one step; the more symbols lag, the
+        larger (and cheaper per update) the step.
+        """
+        ready = self.processing_ready
+        while self.is_running:
+            await ready.wait()
+            ready.clear()
+            while updates := [(s, q.get_nowait()) for s, q in self.queues.items() if len(q)]:
+                try:
+                    await self.process_records(updates)
+                except Exception as e:
+                    logger.error(f"Basket Processing Error: {e}")
+
+    @property
+    def processor_kind(self) -> str:
+        return "BasketProcessor" if self.basket is not None else "DataProcessor"
+
+    def get_processor_state(self, symbol: str) -> dict:
+        if self.basket is not None:
+            return self.basket.get_state(symbol)
+        return self.processors[symbol].get_state()
+
+    def set_processor_state(self, symbol: str, state: dict) -> None:
+        if self.basket is not None:
+            self.basket.set_state(symbol, state)
+        else:
+            self.processors[symbol].set_state(state)
+
+    def restore_processors(self) -> None:
+        """Load each symbol's checkpoint; fast-forward the others over recent ticks."""
+        assert self.checkpoint_dir is not None
+        cold = []
+        for symbol in self.symbols:
+            path = checkpoint_path(self.checkpoint_dir, symbol)
+            state = load_checkpoint(path, self.processor_kind)
+            if state is None:
+                cold.append(symbol)
+                continue
+            try:
+                self.set_processor_state(symbol, state)
+            except ValueError as e:
+                logger.warning(f"💾 [{symbol}] Ignoring checkpoint {path}: {e}")
+                cold.append(symbol)
+        restored = len(self.symbols) - len(cold)
+        if restored:
+            logger.info(f"💾 Restored processor state for {restored}/{len(self.symbols)} symbols")
+        if cold and config.CHECKPOINT_FAST_FORWARD_TICKS > 0:
+            self.fast_forward(cold, config.CHECKPOINT_FAST_FORWARD_TICKS)
+
+    def fast_forward(self, symbols: list[str], n: int) -> int:
+        """Run the processors of *symbols* over their last *n* recorded ticks.
+
+        Only the model state moves: no strategy or trade sees these ticks.
+        Returns the number of ticks replayed.
+        """
+        tables = {s: recent_ticks(config.DATA_DIR, s, n) for s in symbols}
+        ticks = {s: t for s, t in tables.items() if t is not None}
+        if self.basket is not None:
+            if ticks:
+                records = pa.concat_tables(list(ticks.values())).sort_by("timestamp").to_pylist()
+                # Rounds of a few updates per symbol keep process_many's batching cheap
+                step = 4 * len(ticks)
+                for start in range(0, len(records), step):
+                    self.basket.process_many(
+                        [(r["symbol"], r) for r in records[start : start + step]]
+                    )
+        else:
+            for symbol, table in ticks.items():
+                processor = self.processors[symbol]
+                if processor.depth_levels:
+                    for record in table.to_pylist():
+                        processor.process(record)
+                else:
+                    processor.process_batch(table)
+        replayed = sum(t.num_rows for t in ticks.values())
+        if replayed:
+            logger.info(f"⏩ Fast-forwarded {len(ticks)} processor(s) over {replayed} recent ticks")
+        return replayed
+
+    async def save_checkpoints(self) -> None:
+        """Snapshot every processor on the loop, then write the files off it."""
+        assert self.checkpoint_dir is not None
+        kind = self.processor_kind
+        payloads = {
+            checkpoint_path(self.checkpoint_dir, s): dump_checkpoint(
+                kind, self.get_processor_state(s)
+            )
+            for s in self.symbols
+        }
+        loop = asyncio.get_running_loop()
+        for path, data in payloads.items():
+            try:
+                await loop.run_in_executor(None, write_checkpoint, path, data)
+            except OSError as e:
+                logger.error(f"💾 Checkpoint write failed for {path}: {e}")
+
+    async def checkpoint_processors(self) -> None:
+        """Periodic processor checkpoints."""
+        while self.is_running:
+            await asyncio.sleep(config.CHECKPOINT_INTERVAL_SECONDS)
+            await self.save_checkpoints()
 
     async def harvest_symbol(self, symbol: str) -> None:
         """Async task to harvest a single symbol."""
@@ -109,50 +712,8 @@ class DataHarvester:
             while self.is_running:
                 try:
                     # Fetch Order Book (L1) - Real-time BBO
-                    orderbook = await self.exchange.watch_order_book(symbol, limit=5)
-
-                    bid = orderbook["bids"][0][0] if orderbook["bids"] else None
-                    ask = orderbook["asks"][0][0] if orderbook["asks"] else None
-                    bid_vol = orderbook["bids"][0][1] if orderbook["bids"] else None
-                    ask_vol = orderbook["asks"][0][1] if orderbook["asks"] else None
-
-                    # Flatten the data structure
-                    record = {
-                        "symbol": symbol,  # Add symbol to record
-                        "timestamp": orderbook["timestamp"],
-                        "datetime": orderbook["datetime"],
-                        "bid": bid,
-                        "ask": ask,
-                        "bidVolume": bid_vol,
-                        "askVolume": ask_vol,
-                        "last": None,
-                        "spread": ask - bid if ask and bid else None,
-                        "spread_pct": ((ask - bid) / bid * 100) if ask and bid else None,
-                        "local_timestamp": datetime.now().timestamp(),
-                    }
-
-                    self.buffers[symbol].append(record)
-
-                    # PROCESS: Feed to The Brain
-                    processor = self.processors[symbol]
-                    prediction = processor.process(record)
-
-                    if prediction:
-                        # Log less frequently for multi-asset to avoid spam
-                        # logger.info(f"[{symbol}] 🔮 Pred: {prediction['predicted_price']:.2f}")
-
-                        # SIGNAL GENERATION
-                        strategy = self.strategies[symbol]
-                        signal = strategy.on_tick(record, prediction)
-
-                        if signal != Signal.HOLD:
-                            mid_price = (bid + ask) / 2 if bid and ask else 0
-                            # EXECUTION with Symbol
-                            await self.trader.execute_trade(symbol, signal, current_price=mid_price)
-
-                    # Flush to disk every N ticks
-                    if len(self.buffers[symbol]) >= config.BUFFER_SIZE:
-                        await self.save_buffer(symbol)
+                    orderbook = await self.exchange.watch_order_book(symbol, limit=self.book_limit)
+                    await self.on_order_book(symbol, orderbook)
 
                 except ccxt.NetworkError as e:
                     logger.warning(f"[{symbol}] Network Error: {e}. Reconnecting...")
@@ -163,6 +724,79 @@ class DataHarvester:
         except Exception as e:
             logger.error(f"[{symbol}] Failed to start harvest loop: {e}")
 
+    async def harvest_trades(self, symbol: str) -> None:
+        """Async task streaming public trades of a single symbol."""
+        logger.info(f"🚜 Started trade stream for {symbol}...")
+        buffer = self.trade_buffers[symbol]
+        ticks = self.buffers[symbol]
+
+        while self.is_running:
+            try:
+                trades = await self.exchange.watch_trades(symbol)
+                local_ts = datetime.now().timestamp()
+                self.trade_counters[symbol].inc(len(trades))
+                for trade in trades:
+                    if buffer.is_full:
+                        await self.save_trades(symbol)
+                    buffer.append(
+                        trade["timestamp"],
+                        trade["datetime"],
+                        trade["id"],
+                        trade["side"],
+                        trade["price"],
+                        trade["amount"],
+                        trade["cost"],
+                        local_ts,
+                    )
+                if trades:
+                    ticks.last = trades[-1]["price"]
+                if buffer.is_full:
+                    await self.save_trades(symbol)
+
+            except ccxt.NetworkError as e:
+                logger.warning(f"[{symbol}] Trades Network Error: {e}. Reconnecting...")
+                await asyncio.sleep(5)
+            except Exception as e:
+                logger.error(f"[{symbol}] Trades Loop Error: {e}")
+                await asyncio.sleep(5)
+
+    async def harvest_multiplexed(self) -> None:
+        """Single task for the whole basket over one multiplexed order book stream.
+
+        Updates are dispatched to the per-symbol pipeline (`on_order_book`). A
+        dropped stream reconnects once for the basket, with exponential backoff,
+        instead of every symbol retrying on its own.
+        """
+        logger.info(f"🚜 Started multiplexed harvesting of {len(self.symbols)} symbols...")
+        known = set(self.symbols)
+        failures = 0
+
+        while self.is_running:
+            try:
+                orderbook = await self.exchange.watch_order_book_for_symbols(
+                    self.symbols, limit=self.book_limit
+                )
+            except ccxt.NetworkError as e:
+                delay = min(config.RECONNECT_MIN_DELAY * 2**failures, config.RECONNECT_MAX_DELAY)
+                failures += 1
+                logger.warning(f"[basket] Network Error: {e}. Reconnecting in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+            except Exception as e:
+                logger.error(f"[basket] Critical Stream Error: {e}")
+                await asyncio.sleep(config.RECONNECT_MAX_DELAY)
+                continue
+            failures = 0
+
+            symbol = orderbook.get("symbol")
+            if symbol not in known:
+                continue
+            try:
+                await self.on_order_book(symbol, orderbook)
+            except Exception as e:
+                # One symbol's pipeline failing must not stall the rest of the basket
+                logger.error(f"[{symbol}] Critical Loop Error: {e}")
+
     async def harvest(self) -> None:
         """The Main Event Loop - Spawns tasks for all symbols."""
         logger.info(
@@ -170,9 +804,35 @@ class DataHarvester:
         )
 
         await self.exchange.load_markets()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        fsync_task = asyncio.create_task(self.sync_journals()) if self.journals else None
+        metrics_server, lag_task = await self.start_metrics()
+        ack_task = None
+        if self.sink is not None:
+            if self.journals:
+                ack_task = asyncio.create_task(self.sink.listen(self._on_ticks_durable))
+            await self.resend_journals()
+        else:
+            self.writer.start()
 
-        # Create a task for each symbol
-        tasks = [asyncio.create_task(self.harvest_symbol(symbol)) for symbol in self.symbols]
+        if self.multiplex:
+            # One stream for the whole basket
+            tasks = [asyncio.create_task(self.harvest_multiplexed())]
+        else:
+            # Create a task for each symbol
+            tasks = [asyncio.create_task(self.harvest_symbol(symbol)) for symbol in self.symbols]
+        # Decision-making runs next to ingestion, one task per symbol (or basket)
+        if self.basket is not None:
+            tasks.append(asyncio.create_task(self.process_basket()))
+        else:
+            tasks += [asyncio.create_task(self.process_symbol(symbol)) for symbol in self.symbols]
+        if self.candles:
+            tasks.append(asyncio.create_task(self.close_candles()))
+        if self.checkpoint_dir is not None:
+            tasks.append(asyncio.create_task(self.checkpoint_processors()))
+        # Trade streams run next to the order book streams
+        tasks += [asyncio.create_task(self.harvest_trades(symbol)) for symbol in self.trade_buffers]
 
         try:
             await asyncio.gather(*tasks)
@@ -183,19 +843,95 @@ class DataHarvester:
             # Save all remaining buffers
             for symbol in self.symbols:
                 await self.save_buffer(symbol)
+                await self.save_depth(symbol)
+                await self.save_trades(symbol)
+                await self.save_candles(symbol)
+            if self.checkpoint_dir is not None:
+                await self.save_checkpoints()
+            if self.sink is not None:
+                await self.sink.close()
+                if ack_task is not None:
+                    # Final durability acks arrive once the supervisor has closed its files
+                    try:
+                        await asyncio.wait_for(ack_task, timeout=config.WORKER_SHUTDOWN_SECONDS)
+                    except TimeoutError:
+                        logger.warning("⏳ No shutdown ack from supervisor, keeping journals")
+            else:
+                await self.writer.close()  # Drain queued flushes before exiting
+                assert self.tick_writer is not None
+                self.tick_writer.close()  # Write footers of the open part files
+                if self.depth_writer is not None:
+                    self.depth_writer.close()
+                if self.trade_writer is not None:
+                    self.trade_writer.close()
+                for candle_writer in self.candle_writers.values():
+                    candle_writer.close()
+            if fsync_task is not None:
+                fsync_task.cancel()
+            if lag_task is not None:
+                lag_task.cancel()
+            if metrics_server is not None:
+                await metrics_server.close()
+            for journal in self.journals.values():
+                journal.close()
+            logger.info(f"✍️ Writer stats: {self.writer.stats.snapshot()}")
             logger.info("🛑 Harvester stopped. All data saved.")
 
+    async def start_metrics(self) -> tuple[MetricsServer | None, asyncio.Task | None]:
+        """Serve /metrics and sample event loop lag (no-op if metrics are disabled)."""
+        if self.metrics_port is None:
+            return None, None
+        server = MetricsServer(self.metrics, config.METRICS_HOST, self.metrics_port)
+        try:
+            await server.start()
+        except OSError as e:
+            # Metrics are best effort: never stop harvesting because the port is taken
+            logger.warning(f"📈 Metrics endpoint unavailable on port {self.metrics_port}: {e}")
+            return None, None
+        self.metrics_port = server.port
+        lag_task = asyncio.create_task(
+            measure_loop_lag(
+                self.loop_lag,
+                interval=config.METRICS_LOOP_LAG_INTERVAL,
+                is_running=lambda: self.is_running,
+            )
+        )
+        return server, lag_task
+
     def stop(self) -> None:
         """Gracefully stop the harvester."""
         self.is_running = False
 
 
+def make_rolling_writer(
+    dataset: str = TICKS_DATASET, timeframe: str = TICK_TIMEFRAME
+) -> RollingParquetWriter:
+    """Rolling writer configured from config.py (shared with supervisor.py)."""
+    return RollingParquetWriter(
+        config.DATA_DIR,
+        dataset,
+        timeframe,
+        time_column=CANDLE_TIME_COLUMN if dataset == CANDLES_DATASET else "timestamp",
+        policy=RotationPolicy(
+            max_rows=config.ROTATE_MAX_ROWS,
+            max_bytes=config.ROTATE_MAX_BYTES,
+            max_age_seconds=config.ROTATE_MAX_SECONDS,
+        ),
+    )
+
+
 async def main():
     """Entry point for the harvester."""
     harvester = DataHarvester()
+
+    # SIGTERM cancels the main task so harvest()'s finally block closes files cleanly
+    main_task = asyncio.current_task()
+    if main_task is not None:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+
     try:
         await harvester.harvest()
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         logger.info("🛑 Stopping Harvester...")
         harvester.stop()
 
@@ -0,0 +1,239 @@
+"""
+Momontum Load Test
+==================
+Measures the throughput of the full harvester path (harvest -> process ->
+strategy -> trader -> Parquet) without touching the network, by replaying
+recorded or synthetic ticks through `ReplayExchange`.
+
+Reports sustained ticks/s, delivery lag (exchange timestamp -> harvester),
+per-stage latency, updates dropped because ingestion fell behind and updates
+skipped by a conflating processing stage.
+
+Stages: ingest (record + hand-off), queued (wait for the processing task),
+decide (model + strategy + trader), and model / strategy / trader on their own.
+
+Usage:
+    python loadtest.py --symbols 20 --ticks 5000             # synthetic, as fast as possible
+    python loadtest.py --symbols 50 --speed 10               # 10x real time, count drops
+    python loadtest.py --source ./data_lake --speed 1        # replay the data lake
+    python loadtest.py --conflation latest                   # skip stale books in processing
+    python loadtest.py --symbols 50 --basket                 # one model step per round
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import config
+from harvester import DataHarvester
+from momontum.exchange.replay import ReplayExchange
+from momontum.metrics import LATENCY_MS_BUCKETS, HistogramValue
+from momontum.queues import CONFLATION_POLICIES
+
+logger = logging.getLogger("LoadTest")
+
+STAGES = ("ingest", "queued", "decide", "model", "strategy", "trader")
+STAGE_BUCKETS_MS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 100)
+
+
+@dataclass
+class StageLatency:
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+
+    @classmethod
+    def from_histogram(cls, histogram: HistogramValue) -> "StageLatency":
+        mean = histogram.sum / histogram.count if histogram.count else float("nan")
+        return cls(histogram.count, mean, histogram.quantile(0.5), histogram.quantile(0.99))
+
+
+@dataclass
+class LoadTestReport:
+    symbols: int
+    delivered: int  # updates handed out by the exchange
+    processed: int  # updates recorded by on_order_book
+    dropped: int  # updates superseded while ingestion was behind
+    skipped: int  # recorded updates the processing stage conflated away
+    seconds: float
+    delivery: StageLatency
+    stages: dict[str, StageLatency]
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.processed / self.seconds if self.seconds > 0 else float("nan")
+
+    def format(self) -> str:
+        lines = [
+            f"symbols     {self.symbols}",
+            f"processed   {self.processed} ticks in {self.seconds:.2f}s "
+            f"({self.ticks_per_second:,.0f} ticks/s)",
+            f"dropped     {self.dropped} ({self.dropped / max(1, self.dropped + self.delivered):.2%})",
+            f"skipped     {self.skipped} ({self.skipped / max(1, self.processed):.2%} not processed)",
+            "",
+            f"{'stage':<10} {'count':>9} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}",
+        ]
+        for name, stage in [("delivery", self.delivery), *self.stages.items()]:
+            lines.append(
+                f"{name:<10} {stage.count:>9} {stage.mean_ms:>9.3f} "
+                f"{stage.p50_ms:>9.3f} {stage.p99_ms:>9.3f}"
+            )
+        return "\n".join(lines)
+
+
+def _timed(fn, histogram: HistogramValue):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            histogram.observe((time.perf_counter() - started) * 1000.0)
+
+    return wrapper
+
+
+def _timed_async(fn, histogram: HistogramValue):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            histogram.observe((time.perf_counter() - started) * 1000.0)
+
+    return wrapper
+
+
+def instrument(harvester: DataHarvester) -> dict[str, HistogramValue]:
+    """Times each pipeline stage into `momontum_stage_ms{stage=...}` of the harvester metrics."""
+    stage_ms = harvester.metrics.histogram(
+        "stage_ms", "Pipeline stage duration (ms)", ["stage"], buckets=STAGE_BUCKETS_MS
+    )
+    stages = {name: stage_ms.labels(name) for name in STAGES}
+
+    # on_order_book records the update (including awaited flushes) and queues it
+    harvester.on_order_book = _timed_async(harvester.on_order_book, stages["ingest"])  # type: ignore[method-assign]
+
+    process_record = _timed_async(harvester.process_record, stages["decide"])
+    queued = stages["queued"]
+
+    async def decide(symbol: str, record: dict) -> None:
+        queued.observe((datetime.now().timestamp() - record["local_timestamp"]) * 1000.0)
+        await process_record(symbol, record)
+
+    harvester.process_record = decide  # type: ignore[method-assign]
+    for processor in harvester.processors.values():
+        processor.process = _timed(processor.process, stages["model"])  # type: ignore[method-assign]
+
+    if harvester.basket is not None:
+        # Basket processing: one timing per round of updates
+        process_records = _timed_async(harvester.process_records, stages["decide"])
+
+        async def decide_basket(updates: list[tuple[str, dict]]) -> None:
+            now = datetime.now().timestamp()
+            for _, record in updates:
+                queued.observe((now - record["local_timestamp"]) * 1000.0)
+            await process_records(updates)
+
+        harvester.process_records = decide_basket  # type: ignore[method-assign]
+        basket = harvester.basket
+        basket.process_many = _timed(basket.process_many, stages["model"])  # type: ignore[method-assign]
+    for strategy in harvester.strategies.values():
+        strategy.on_tick = _timed(strategy.on_tick, stages["strategy"])  # type: ignore[method-assign]
+    harvester.trader.execute_trade = _timed_async(harvester.trader.execute_trade, stages["trader"])  # type: ignore[method-assign]
+    return stages
+
+
+async def run_loadtest(
+    harvester: DataHarvester, exchange: ReplayExchange, *, timeout: float | None = None
+) -> LoadTestReport:
+    """Runs *harvester* until *exchange* has replayed everything (or *timeout* seconds)."""
+    stages = instrument(harvester)
+    task = asyncio.create_task(harvester.harvest())
+    try:
+        await asyncio.wait_for(exchange.finished.wait(), timeout)
+    except TimeoutError:
+        logger.warning(f"⏳ Replay not finished after {timeout}s, reporting partial results")
+    finally:
+        finished_at = exchange.finished_at or exchange.clock()
+        harvester.stop()
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    delivery = HistogramValue(tuple(float(b) for b in LATENCY_MS_BUCKETS))
+    for histogram in harvester.latency.values():
+        delivery.counts = [a + b for a, b in zip(delivery.counts, histogram.counts, strict=True)]
+        delivery.sum += histogram.sum
+        delivery.count += histogram.count
+
+    return LoadTestReport(
+        symbols=len(harvester.symbols),
+        delivered=exchange.stats.updates,
+        processed=sum(harvester.tick_counts.values()),
+        dropped=exchange.stats.dropped,
+        skipped=sum(harvester.skipped_counts.values()),
+        seconds=finished_at - (exchange.started_at or finished_at),
+        delivery=StageLatency.from_histogram(delivery),
+        stages={name: StageLatency.from_histogram(h) for name, h in stages.items()},
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the harvester pipeline offline.")
+    parser.add_argument("--source", help="replay ticks from this data lake instead of synthetic")
+    parser.add_argument("--symbols", type=int, default=10, help="synthetic symbols")
+    parser.add_argument("--ticks", type=int, default=2000, help="synthetic ticks per symbol")
+    parser.add_argument("--interval-ms", type=int, default=100, help="synthetic tick spacing")
+    parser.add_argument("--speed", type=float, default=0, help="x real time (0 = unpaced)")
+    parser.add_argument("--multiplex", action="store_true", help="one stream for all symbols")
+    parser.add_argument("--conflation", choices=CONFLATION_POLICIES, default=None)
+    parser.add_argument("--basket", action="store_true", help="basket processing")
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--data-dir", help="keep the written Parquet files here")
+    parser.add_argument("--metrics-port", type=int, default=None)
+    args = parser.parse_args()
+
+    speed = args.speed or None
+    if args.source:
+        exchange = ReplayExchange.from_parquet(args.source, speed=speed)
+    else:
+        symbols = [f"SYM{i}/USDT" for i in range(args.symbols)]
+        exchange = ReplayExchange.synthetic(
+            symbols, args.ticks, interval_ms=args.interval_ms, speed=speed
+        )
+
+    with tempfile.TemporaryDirectory(prefix="momontum-loadtest-") as tmp:
+        config.DATA_DIR = args.data_dir or tmp
+        config.JOURNAL_DIR = os.path.join(config.DATA_DIR, "_journal")
+        config.METRICS_PORT = args.metrics_port
+        config.CHECKPOINT_ENABLED = False  # cold models, no checkpoint files in --data-dir
+        if args.conflation:
+            config.PROCESSING_CONFLATION = args.conflation
+        harvester = DataHarvester(
+            "LOADTEST",
+            exchange.id,
+            symbols=exchange.symbols,
+            exchange=exchange,
+            multiplex=args.multiplex,
+            basket_processing=args.basket or None,
+        )
+        print(f"🧪 Replaying {len(exchange)} ticks for {len(exchange.symbols)} symbols...")
+        report = await run_loadtest(harvester, exchange, timeout=args.timeout)
+
+    print(report.format())
+
+
+if __name__ == "__main__":
+    # harvester.py configures INFO logging on import; per-flush logs would dominate the run
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""Processor checkpoints for warm restarts.
+
+A checkpoint is the pickled state of one symbol's processor (model, scaler
+statistics, previous features and mid price, feature streams), so a restarted
+harvester predicts from the first tick instead of relearning for thousands of
+them. Files are per symbol, so shards of the sharded harvester never share one.
+
+- Versioned: the file holds a header pickle `{"version", "kind", "saved_at"}`
+  of plain values, then the state pickle. The state pickles class instances
+  (model, feature updaters, `RollingMoments`), so `CHECKPOINT_VERSION` is
+  bumped whenever one of those classes changes its attributes or goes away.
+  The header is checked before the state is unpickled: checkpoints of another
+  version or processor kind (`DataProcessor`, `BasketProcessor`) are ignored
+  on load, as are version 1 files (header and state in one pickle) whose
+  classes no longer exist.
+- Atomic: written to a hidden temp file in the same directory, fsynced, then
+  renamed over the previous checkpoint. A crash leaves the old file intact.
+- Non-blocking: `dump_checkpoint` snapshots the state on the event loop (a
+  consistent copy between two updates), `write_checkpoint` does the file I/O
+  and can run in an executor.
+
+When a symbol has no checkpoint, `recent_ticks` returns its latest recorded
+ticks so the processor can be fast-forwarded over them instead.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, list_partition_files, symbol_to_path
+
+logger = logging.getLogger(__name__)
+
+# Layout of the pickled processor state; bump when a pickled class changes.
+# 2: header and state pickled separately; vol/zscore updaters hold RollingMoments
+CHECKPOINT_VERSION = 2
+
+
+class _StaleClass(Exception):
+    """A pickled class that no longer exists in this version."""
+
+
+class _Unpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> Any:
+        try:
+            return super().find_class(module, name)
+        except (ImportError, AttributeError) as e:
+            raise _StaleClass(f"{module}.{name}") from e
+
+
+def checkpoint_path(directory: str | Path, symbol: str) -> Path:
+    return Path(directory) / f"{symbol_to_path(symbol)}.ckpt"
+
+
+def dump_checkpoint(kind: str, state: dict[str, Any]) -> bytes:
+    """Serialize *state* (from a processor's `get_state`) after a version header."""
+
+    header = {"version": CHECKPOINT_VERSION, "kind": kind, "saved_at": time.time()}
+    return pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL) + pickle.dumps(
+        state, protocol=pickle.HIGHEST_PROTOCOL
+    )
+
+
+def write_checkpoint(path: str | Path, data: bytes) -> None:
+    """Atomically replace the checkpoint at *path* with *data*."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def load_checkpoint(path: str | Path, kind: str) -> dict[str, Any] | None:
+    """The saved state at *path*, or None if it is missing, unreadable or incompatible."""
+
+    path = Path(path)
+    try:
+        with open(path, "rb") as f:
+            stream = io.BytesIO(f.read())
+        header = _Unpickler(stream).load()
+        if not isinstance(header, dict) or header.get("version") != CHECKPOINT_VERSION:
+            version = header.get("version") if isinstance(header, dict) else None
+            logger.warning(f"💾 Ignoring checkpoint {path} with version {version!r}")
+            return None
+        if header.get("kind") != kind:
+            logger.warning(f"💾 Ignoring {header.get('kind')} checkpoint {path}, expected {kind}")
+            return None
+        return _Unpickler(stream).load()
+    except FileNotFoundError:
+        return None
+    except _StaleClass as e:
+        logger.warning(f"💾 Ignoring checkpoint {path} from an older version: {e} no longer exists")
+        return None
+    except Exception as e:
+        logger.warning(f"💾 Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def recent_ticks(root: str | Path, symbol: str, n: int) -> pa.Table | None:
+    """The last *n* recorded ticks of *symbol* in time order (None if there are none).
+
+    Only the newest part files needed to cover *n* rows are read.
+    """
+
+    files = list_partition_files(root, TICKS_DATASET, TICK_TIMEFRAME, symbols=[symbol])
+    chosen: list[Path] = []
+    rows = 0
+    for path in reversed(files):
+        if rows >= n:
+            break
+        rows += pq.ParquetFile(path).metadata.num_rows
+        chosen.append(path)
+    if not rows or n <= 0:
+        return None
+    tables = [pq.read_table(p).replace_schema_metadata(None) for p in reversed(chosen)]
+    table = pa.concat_tables(tables, promote_options="permissive").sort_by("timestamp")
+    return table.slice(max(0, table.num_rows - n))
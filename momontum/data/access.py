@@ -0,0 +1,249 @@
+"""Lazy, pruned reads of the tick lake for backtests and the API.
+
+`scan_ticks` returns a Polars LazyFrame that only touches what a query needs:
+
+- Partitions: symbol and UTC day directories are chosen from the layout
+  (`list_partition_files`) before any Parquet file is opened.
+- Row groups: the symbol and time filters are pushed down to `pl.scan_parquet`,
+  which skips row groups whose min/max statistics rule them out (compacted
+  partitions are sorted by timestamp, so a time range reads few of them).
+- Columns: only the requested columns are decoded.
+- Legacy flat files (see `list_legacy_files`) have no partition directories
+  to prune. They are scanned one by one with the same filters, and files
+  without a `symbol` column are skipped when symbols are requested.
+
+`iter_ticks` runs the same query on Polars' streaming engine and yields
+DataFrames of at most `batch_size` rows, so memory scales with the batch
+rather than with the lake. `load_ticks` collects the query sorted by timestamp.
+
+`iter_symbol_ticks` streams one symbol in timestamp order, day partition by
+day partition, for backtests that cannot hold a symbol's ticks in memory.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+import polars as pl
+
+import config
+from momontum.data.layout import (
+    MS_PER_DAY,
+    TICK_TIMEFRAME,
+    TICKS_DATASET,
+    iter_partition_dirs,
+    list_legacy_files,
+    list_partition_files,
+    part_index,
+)
+from momontum.schemas import TICKS_SCHEMA_V1
+
+logger = logging.getLogger(__name__)
+
+# Columns read by the backtest runners: processor inputs, fills and strategy prices
+BACKTEST_COLUMNS = ("symbol", "timestamp", "bid", "ask", "bidVolume", "askVolume", "last", "spread")
+
+DEFAULT_BATCH_ROWS = 100_000
+
+
+def to_ms(value: int | datetime | None) -> int | None:
+    """Epoch milliseconds of *value* (an int is taken as ms already; naive datetimes are UTC)."""
+
+    if value is None or isinstance(value, int):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return int(value.timestamp() * 1000)
+
+
+def _day(ms: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=ms // MS_PER_DAY)
+
+
+def _filtered(
+    scan: pl.LazyFrame,
+    schema: Sequence[str],
+    symbols: list[str] | None,
+    start: int | None,
+    end: int | None,
+    columns: Sequence[str] | None,
+) -> pl.LazyFrame | None:
+    """*scan* filtered and projected; None if it cannot hold rows of *symbols*."""
+
+    if symbols is not None:
+        if "symbol" not in schema:
+            return None
+        scan = scan.filter(pl.col("symbol").is_in(symbols))
+    if start is not None:
+        scan = scan.filter(pl.col("timestamp") >= start)
+    if end is not None:
+        scan = scan.filter(pl.col("timestamp") < end)
+    if columns is not None:
+        # Columns a source lacks come back as nulls from the diagonal concat
+        scan = scan.select([name for name in columns if name in schema])
+    return scan
+
+
+def scan_ticks(
+    root: str | Path | None = None,
+    *,
+    symbols: Iterable[str] | None = None,
+    start: int | datetime | None = None,
+    end: int | datetime | None = None,
+    columns: Sequence[str] | None = None,
+    legacy: bool = True,
+) -> pl.LazyFrame | None:
+    """Lazy ticks of *symbols* with `start <= timestamp < end` (epoch ms or datetimes).
+
+    *root* defaults to `config.DATA_DIR`. Rows come in storage order: partitions
+    by symbol, day and part number, then legacy files. None if the lake holds no
+    tick files at all; an empty query still returns a LazyFrame.
+    """
+
+    root = config.DATA_DIR if root is None else root
+    symbols = None if symbols is None else list(symbols)
+    start_ms, end_ms = to_ms(start), to_ms(end)
+    if start_ms is not None and end_ms is not None and end_ms <= start_ms:
+        raise ValueError("end must be after start")
+
+    files = list_partition_files(
+        root,
+        TICKS_DATASET,
+        TICK_TIMEFRAME,
+        symbols=symbols,
+        start=None if start_ms is None else _day(start_ms),
+        end=None if end_ms is None else _day(end_ms - 1),
+    )
+    legacy_files = list_legacy_files(root) if legacy else []
+    if (
+        not files
+        and not legacy_files
+        and not list_partition_files(root, TICKS_DATASET, TICK_TIMEFRAME)
+    ):
+        return None
+
+    scans: list[pl.LazyFrame] = []
+    for source in ([files] if files else []) + [[path] for path in legacy_files]:
+        scan = pl.scan_parquet(source)
+        schema = scan.collect_schema().names()  # footer of the first file only
+        filtered = _filtered(scan, schema, symbols, start_ms, end_ms, columns)
+        if filtered is not None:
+            scans.append(filtered)
+    if not scans:
+        # Everything pruned: no rows, with the tick schema
+        empty = pl.LazyFrame(schema=pl.Schema(TICKS_SCHEMA_V1))
+        return empty if columns is None else empty.select(columns)
+    return scans[0] if len(scans) == 1 else pl.concat(scans, how="diagonal_relaxed")
+
+
+def load_ticks(root: str | Path | None = None, **query) -> pl.DataFrame | None:
+    """`scan_ticks(root, **query)` collected and sorted by timestamp (None if there is no data)."""
+
+    scan = scan_ticks(root, **query)
+    if scan is None:
+        return None
+    return scan.sort("timestamp", maintain_order=True).collect()
+
+
+def iter_ticks(
+    root: str | Path | None = None,
+    *,
+    batch_size: int = DEFAULT_BATCH_ROWS,
+    **query,
+) -> Iterator[pl.DataFrame]:
+    """`scan_ticks(root, **query)` as DataFrames of at most *batch_size* rows, in storage order."""
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    scan = scan_ticks(root, **query)
+    if scan is None:
+        return
+    for batch in scan.collect_batches(chunk_size=batch_size):
+        if batch.height:
+            yield batch
+
+
+def list_symbols(root: str | Path | None = None) -> list[str]:
+    """Symbols with partitioned ticks, read from the first part file of each symbol directory."""
+
+    root = config.DATA_DIR if root is None else root
+    symbols: list[str] = []
+    seen: set[str] = set()
+    for symbol_dir, _, day_dir in iter_partition_dirs(root, TICKS_DATASET, TICK_TIMEFRAME):
+        parts = {part_index(path): path for path in day_dir.iterdir()}
+        parts.pop(None, None)
+        if symbol_dir in seen or not parts:
+            continue
+        seen.add(symbol_dir)
+        first = parts[min(i for i in parts if i is not None)]
+        head = pl.scan_parquet(first).select("symbol").head(1).collect()
+        if head.height and head["symbol"][0] is not None:
+            symbols.append(head["symbol"][0])
+    return symbols
+
+
+def iter_symbol_ticks(
+    symbol: str,
+    root: str | Path | None = None,
+    *,
+    start: int | datetime | None = None,
+    end: int | datetime | None = None,
+    columns: Sequence[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_ROWS,
+) -> Iterator[pl.DataFrame]:
+    """Partitioned ticks of *symbol* in timestamp order, as DataFrames of at most *batch_size* rows.
+
+    Partitions are UTC days, so sorting each day sorts the whole range: the
+    rows and their order are those of `load_ticks(symbols=[symbol],
+    legacy=False, ...)`. A day whose rows are already in timestamp order
+    (compacted, or recorded by a single harvester) is streamed batch by batch
+    after one pass over its timestamp column; any other day is sorted in
+    memory, one day at a time. Legacy flat files are not read.
+    """
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    root = config.DATA_DIR if root is None else root
+    start_ms, end_ms = to_ms(start), to_ms(end)
+    if start_ms is not None and end_ms is not None and end_ms <= start_ms:
+        raise ValueError("end must be after start")
+    if list_legacy_files(root):
+        logger.warning("⚠️ Legacy tick files are not streamed; run compactor.py to partition them.")
+
+    days = iter_partition_dirs(
+        root,
+        TICKS_DATASET,
+        TICK_TIMEFRAME,
+        symbols=[symbol],
+        start=None if start_ms is None else _day(start_ms),
+        end=None if end_ms is None else _day(end_ms - 1),
+    )
+    for _, day, _ in days:
+        files = list_partition_files(
+            root, TICKS_DATASET, TICK_TIMEFRAME, symbols=[symbol], start=day, end=day
+        )
+        if not files:
+            continue
+        scan = pl.scan_parquet(files)
+        schema = scan.collect_schema().names()
+        day_scan = _filtered(scan, schema, [symbol], start_ms, end_ms, None)
+        if day_scan is None:
+            continue
+        timestamps = day_scan.select("timestamp").collect().to_series()
+        if timestamps.is_empty():
+            continue
+        ordered = timestamps.is_sorted() and not timestamps.null_count()
+        if not ordered:
+            day_scan = day_scan.sort("timestamp", maintain_order=True)
+        if columns is not None:
+            day_scan = day_scan.select([name for name in columns if name in schema])
+        if ordered:
+            batches: Iterable[pl.DataFrame] = day_scan.collect_batches(chunk_size=batch_size)
+        else:
+            batches = day_scan.collect().iter_slices(batch_size)
+        for batch in batches:
+            if batch.height:
+                yield batch
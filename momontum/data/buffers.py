@@ -0,0 +1,203 @@
+"""Columnar, schema-typed row buffers.
+
+The harvester used to keep one Python dict per tick and convert the list to a
+pandas DataFrame on every flush. These buffers instead preallocate one typed
+NumPy array per schema column and hand back a `pyarrow.RecordBatch` directly.
+
+Design notes:
+- capacity is fixed at construction, so memory use is known up front and can be
+  budgeted across a whole basket (see `capacity_for_budget`)
+- float columns store missing values as NaN and are emitted as Arrow nulls
+- integer columns track nulls in a lazily-allocated validity mask
+- string columns use preallocated object arrays (pointer per row)
+- columns that are constant for a buffer (e.g. `symbol`) are not stored per row
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+import numpy as np
+import pyarrow as pa
+
+from momontum.schemas import TICKS_SCHEMA_V1, TRADES_SCHEMA_V1
+
+# Rough per-row cost of a Python str held by an object column (header + payload).
+STRING_NBYTES_ESTIMATE = 64
+
+
+class BufferFullError(BufferError):
+    """Raised when appending to a buffer that has reached its capacity."""
+
+
+def _numpy_dtype(arrow_type: pa.DataType) -> np.dtype:
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return np.dtype(object)
+    return np.dtype(arrow_type.to_pandas_dtype())
+
+
+def row_nbytes(schema: pa.Schema, *, constants: Mapping[str, Any] | None = None) -> int:
+    """Estimated bytes per buffered row for *schema* (excluding constant columns)."""
+
+    total = 0
+    for field in schema:
+        if constants and field.name in constants:
+            continue
+        dtype = _numpy_dtype(field.type)
+        total += dtype.itemsize
+        if dtype == np.dtype(object):
+            total += STRING_NBYTES_ESTIMATE
+    return total
+
+
+def capacity_for_budget(
+    schema: pa.Schema,
+    *,
+    n_buffers: int,
+    budget_bytes: int,
+    max_capacity: int,
+    constants: Mapping[str, Any] | None = None,
+) -> int:
+    """Largest per-buffer capacity (<= *max_capacity*) keeping *n_buffers* within budget."""
+
+    if n_buffers <= 0:
+        return max_capacity
+    per_buffer = budget_bytes // n_buffers
+    capacity = per_buffer // max(row_nbytes(schema, constants=constants), 1)
+    return int(max(1, min(max_capacity, capacity)))
+
+
+class ColumnarBuffer:
+    """Fixed-capacity row buffer with one preallocated array per schema column."""
+
+    def __init__(
+        self,
+        schema: pa.Schema,
+        capacity: int,
+        *,
+        constants: Mapping[str, Any] | None = None,
+    ):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+
+        self.schema = schema
+        self.capacity = capacity
+        self.constants = dict(constants or {})
+
+        unknown = set(self.constants) - set(schema.names)
+        if unknown:
+            raise ValueError(f"constants for unknown columns: {sorted(unknown)}")
+
+        # Stored (non-constant) columns, in schema order. `append` takes values in this order.
+        self.columns: list[str] = [n for n in schema.names if n not in self.constants]
+        self._arrays: list[np.ndarray] = [
+            np.empty(capacity, dtype=_numpy_dtype(schema.field(n).type)) for n in self.columns
+        ]
+        self._is_int = [a.dtype.kind in "iu" for a in self._arrays]
+        self._int_masks: dict[int, np.ndarray] = {}
+        self._n_string_cols = sum(1 for a in self._arrays if a.dtype == np.dtype(object))
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def is_full(self) -> bool:
+        return self._size >= self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by this buffer (preallocated arrays + live strings)."""
+
+        fixed = sum(a.nbytes for a in self._arrays)
+        masks = sum(m.nbytes for m in self._int_masks.values())
+        return fixed + masks + self._size * self._n_string_cols * STRING_NBYTES_ESTIMATE
+
+    def append(self, *values: Any) -> None:
+        """Append one row; *values* follow `self.columns` order."""
+
+        i = self._size
+        if i >= self.capacity:
+            raise BufferFullError(f"buffer full ({self.capacity} rows)")
+
+        for j, (array, value) in enumerate(zip(self._arrays, values, strict=True)):
+            try:
+                array[i] = value
+            except TypeError:
+                if value is not None or not self._is_int[j]:
+                    raise
+                self._null_int(j, i)
+
+        self._size = i + 1
+
+    def _null_int(self, column: int, row: int) -> None:
+        mask = self._int_masks.get(column)
+        if mask is None:
+            mask = np.zeros(self.capacity, dtype=bool)
+            self._int_masks[column] = mask
+        self._arrays[column][row] = 0
+        mask[row] = True
+
+    def clear(self) -> None:
+        """Reset the buffer for reuse without releasing its arrays."""
+
+        self._size = 0
+        for mask in self._int_masks.values():
+            mask[:] = False
+
+    def to_record_batch(self) -> pa.RecordBatch:
+        """Copy the buffered rows into a RecordBatch matching `self.schema`.
+
+        The batch owns its memory, so the buffer can be cleared and refilled
+        while the batch is still being written elsewhere.
+        """
+
+        n = self._size
+        stored = dict(zip(self.columns, range(len(self.columns)), strict=True))
+        arrays: list[pa.Array] = []
+
+        for field in self.schema:
+            if field.name in self.constants:
+                value = self.constants[field.name]
+                arrays.append(pa.array(np.full(n, value, dtype=object), type=field.type))
+                continue
+
+            j = stored[field.name]
+            data = self._arrays[j][:n].copy()
+            mask = self._int_masks.get(j)
+            if mask is not None:
+                arrays.append(pa.array(data, type=field.type, mask=mask[:n].copy()))
+            elif data.dtype.kind == "f":
+                arrays.append(pa.array(data, type=field.type, from_pandas=True))
+            else:
+                arrays.append(pa.array(data, type=field.type))
+
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class TickBuffer(ColumnarBuffer):
+    """Per-symbol buffer for `TICKS_SCHEMA_V1` rows.
+
+    `append` takes: timestamp, datetime, bid, ask, bidVolume, askVolume, last,
+    spread, spread_pct, local_timestamp.
+    """
+
+    def __init__(self, symbol: str, capacity: int):
+        super().__init__(TICKS_SCHEMA_V1, capacity, constants={"symbol": symbol})
+        self.symbol = symbol
+        # Most recent trade price, kept current by the trade stream so the tick
+        # path reads it as an attribute of the buffer it already holds.
+        self.last: float | None = None
+
+
+class TradeBuffer(ColumnarBuffer):
+    """Per-symbol buffer for `TRADES_SCHEMA_V1` rows.
+
+    `append` takes: timestamp, datetime, id, side, price, amount, cost,
+    local_timestamp.
+    """
+
+    def __init__(self, symbol: str, capacity: int):
+        super().__init__(TRADES_SCHEMA_V1, capacity, constants={"symbol": symbol})
+        self.symbol = symbol
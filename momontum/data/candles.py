@@ -0,0 +1,247 @@
+"""OHLC candles (`CANDLES_SCHEMA_V1`) from ticks, streaming and in batch.
+
+Candles are built from the mid price `(bid + ask) / 2` of each tick and
+bucketed by exchange timestamp: bucket `[start_ts, end_ts)` with
+`start_ts = timestamp - timestamp % interval`. Buckets without ticks produce no
+row. They live in `candles/<interval>/<symbol>/YYYY/MM/DD/`, partitioned by
+`start_ts`.
+
+- `CandleAggregator` runs inside the harvester: O(1) work per tick and
+  interval. A bucket is closed by the first tick past its end, or by
+  `close_expired(now_ms)` once the clock passes its end (a quiet market). Ticks
+  older than the open bucket are counted in `late` and not aggregated, so an
+  emitted candle is never reopened.
+- `candles_from_ticks` / `backfill_candles` materialize the same candles from
+  tick files with Polars, for history recorded before the aggregator ran.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Iterable, Sequence
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+import polars as pl
+import pyarrow as pa
+
+from momontum.data.buffers import ColumnarBuffer
+from momontum.data.layout import (
+    CANDLES_DATASET,
+    TICK_TIMEFRAME,
+    TICKS_DATASET,
+    PartitionedDatasetWriter,
+    iter_partition_dirs,
+    part_index,
+    partition_dir,
+)
+from momontum.schemas import CANDLES_SCHEMA_V1
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVALS = ("1s", "1min", "5min", "1h")
+CANDLE_TIME_COLUMN = "start_ts"
+
+_INTERVAL = re.compile(r"^(\d+)(ms|s|min|h|d)$")
+_UNIT_MS = {"ms": 1, "s": 1_000, "min": 60_000, "h": 3_600_000, "d": 86_400_000}
+
+
+def interval_ms(interval: str) -> int:
+    """Length of an interval label (`1s`, `5min`, `1h`, `1d`) in milliseconds."""
+
+    match = _INTERVAL.match(interval)
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"invalid candle interval {interval!r}, expected e.g. 1s, 5min, 1h")
+    ms = int(match.group(1)) * _UNIT_MS[match.group(2)]
+    if 86_400_000 % ms:
+        # Buckets must not straddle the UTC day partitions
+        raise ValueError(f"candle interval {interval!r} does not divide a day")
+    return ms
+
+
+class CandleBuffer(ColumnarBuffer):
+    """Closed candles of one symbol and interval.
+
+    `append` takes: start_ts, end_ts, open, high, low, close, n_ticks.
+    """
+
+    def __init__(self, symbol: str, interval: str, capacity: int):
+        super().__init__(
+            CANDLES_SCHEMA_V1, capacity, constants={"symbol": symbol, "interval": interval}
+        )
+        self.symbol = symbol
+        self.interval = interval
+
+
+class CandleAggregator:
+    """Incremental OHLC candles of one symbol at several intervals."""
+
+    def __init__(
+        self, symbol: str, intervals: Sequence[str] = DEFAULT_INTERVALS, capacity: int = 1024
+    ):
+        self.symbol = symbol
+        self.intervals = tuple(intervals)
+        self._ms = [interval_ms(i) for i in self.intervals]
+        n = len(self.intervals)
+        # Open bucket per interval (start None = no open bucket)
+        self._start: list[int | None] = [None] * n
+        self._open = [0.0] * n
+        self._high = [0.0] * n
+        self._low = [0.0] * n
+        self._close = [0.0] * n
+        self._count = [0] * n
+        self._closed_end = [0] * n  # end of the last emitted bucket
+        self.buffers = [CandleBuffer(symbol, i, capacity) for i in self.intervals]
+        self.needs_flush = False  # a buffer is full: drain() before the next update
+        self.late = 0
+
+    def update(self, timestamp: int, price: float) -> None:
+        late = False
+        for k, ms in enumerate(self._ms):
+            start = self._start[k]
+            if start is not None and start <= timestamp < start + ms:
+                if price > self._high[k]:
+                    self._high[k] = price
+                elif price < self._low[k]:
+                    self._low[k] = price
+                self._close[k] = price
+                self._count[k] += 1
+                continue
+
+            if timestamp < (self._closed_end[k] if start is None else start):
+                late = True  # belongs to a bucket that was already emitted
+                continue
+            if start is not None:
+                self._emit(k)
+            self._start[k] = timestamp - timestamp % ms
+            self._open[k] = self._high[k] = self._low[k] = self._close[k] = price
+            self._count[k] = 1
+        if late:
+            self.late += 1
+
+    def close_expired(self, now_ms: float) -> int:
+        """Emit every open bucket that ends at or before *now_ms*; returns how many."""
+
+        closed = 0
+        for k, ms in enumerate(self._ms):
+            start = self._start[k]
+            if start is not None and start + ms <= now_ms:
+                self._emit(k)
+                closed += 1
+        return closed
+
+    def _emit(self, k: int) -> None:
+        start = self._start[k]
+        assert start is not None
+        end = start + self._ms[k]
+        buffer = self.buffers[k]
+        buffer.append(
+            start, end, self._open[k], self._high[k], self._low[k], self._close[k], self._count[k]
+        )
+        if buffer.is_full:
+            self.needs_flush = True
+        self._closed_end[k] = end
+        self._start[k] = None
+
+    def drain(self) -> list[tuple[str, pa.RecordBatch]]:
+        """Closed candles as `(interval, batch)` pairs; clears the buffers."""
+
+        batches = []
+        for buffer in self.buffers:
+            if len(buffer):
+                batches.append((buffer.interval, buffer.to_record_batch()))
+                buffer.clear()
+        self.needs_flush = False
+        return batches
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers)
+
+
+def candles_from_ticks(ticks: pa.Table | pl.DataFrame, interval: str) -> pa.Table:
+    """Candles of every symbol in *ticks* (Polars group-by on the mid price)."""
+
+    ms = interval_ms(interval)
+    frame = ticks if isinstance(ticks, pl.DataFrame) else pl.from_arrow(ticks)
+    assert isinstance(frame, pl.DataFrame)
+    frame = (
+        frame.lazy()
+        .filter(pl.col("timestamp").is_not_null() & (pl.col("bid") > 0) & (pl.col("ask") > 0))
+        .with_columns(
+            price=(pl.col("bid") + pl.col("ask")) / 2,
+            start_ts=pl.col("timestamp") - pl.col("timestamp") % ms,
+        )
+        .sort("timestamp", maintain_order=True)
+        .group_by("symbol", "start_ts", maintain_order=True)
+        .agg(
+            open=pl.col("price").first(),
+            high=pl.col("price").max(),
+            low=pl.col("price").min(),
+            close=pl.col("price").last(),
+            n_ticks=pl.len(),
+        )
+        .with_columns(interval=pl.lit(interval), end_ts=pl.col("start_ts") + ms)
+        .sort("symbol", "start_ts")
+        .select(CANDLES_SCHEMA_V1.names)
+        .collect()
+    )
+    return frame.to_arrow().cast(CANDLES_SCHEMA_V1)
+
+
+def _part_files(directory: Path) -> list[Path]:
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if part_index(p) is not None)
+
+
+def backfill_candles(
+    root: str | Path,
+    intervals: Sequence[str] = DEFAULT_INTERVALS,
+    *,
+    symbols: Iterable[str] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    include_today: bool = False,
+    overwrite: bool = False,
+) -> int:
+    """Write candles for tick partitions under *root*; returns the candle rows written.
+
+    One symbol/day of ticks is read at a time. Candle partitions that already
+    hold files are skipped, or rebuilt with *overwrite* (old parts are removed
+    after the new one is written). The current UTC day is skipped unless
+    *include_today*, since the harvester is still writing it.
+    """
+
+    writers = {
+        i: PartitionedDatasetWriter(root, CANDLES_DATASET, i, time_column=CANDLE_TIME_COLUMN)
+        for i in intervals
+    }
+    today = datetime.now(UTC).date()
+    written = 0
+
+    for symbol_dir, day, tick_dir in iter_partition_dirs(
+        root, TICKS_DATASET, TICK_TIMEFRAME, symbols=symbols, start=start, end=end
+    ):
+        if day >= today and not include_today:
+            continue
+        targets = {
+            i: _part_files(partition_dir(root, CANDLES_DATASET, i, symbol_dir, day))
+            for i in intervals
+        }
+        todo = [i for i in intervals if overwrite or not targets[i]]
+        tick_files = _part_files(tick_dir)
+        if not todo or not tick_files:
+            continue
+
+        ticks = pl.scan_parquet(tick_files).select("symbol", "timestamp", "bid", "ask").collect()
+        for interval in todo:
+            candles = candles_from_ticks(ticks, interval)
+            writers[interval].write_table(candles)
+            for old in targets[interval]:
+                old.unlink(missing_ok=True)
+            written += candles.num_rows
+        logger.info(f"🕯️ {symbol_dir} {day}: candles for {', '.join(todo)}")
+
+    return written
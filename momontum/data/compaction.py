@@ -0,0 +1,276 @@
+"""Data lake compaction.
+
+Merges the many small part files of a partition (symbol + UTC day) into one
+large file that is:
+- sorted by the dataset's time column
+- deduplicated (exact duplicate rows are dropped)
+- zstd-compressed with tuned row groups and full column statistics
+- marked as compacted in its Parquet metadata, so later runs skip it
+
+Compaction is incremental (already-compacted and still-open partitions are
+skipped) and can run partitions in parallel worker processes.
+
+Atomicity: the merged file is written to a hidden temp file, then moved over
+the partition's first part with `os.replace`, and only then are the remaining
+inputs unlinked. Readers never see a half-written file and never miss rows; a
+reader listing the partition during the few microseconds between the replace
+and the unlinks may see duplicates.
+
+Legacy flat files (`<exchange>_<SYMBOL>_<ts>.parquet` in the data root, some
+without a `symbol` column) can be migrated into the partitioned layout first.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from momontum.data.layout import (
+    TICK_TIMEFRAME,
+    TICKS_DATASET,
+    PartitionedDatasetWriter,
+    iter_partition_dirs,
+    list_legacy_files,
+    part_index,
+)
+from momontum.data.rotation import IN_PROGRESS_PREFIX
+from momontum.data.schema import (
+    SchemaVersion,
+    attach_schema_version,
+    read_parquet,
+)
+from momontum.schemas import TICKS_SCHEMA_V1
+
+logger = logging.getLogger(__name__)
+
+COMPACTED_KEY = "momontum:compacted"
+DEFAULT_ROW_GROUP_SIZE = 256 * 1024
+LEGACY_SYMBOL = "LEGACY"
+
+_LEGACY_NAME = re.compile(r"^[A-Za-z0-9]+_(?P<symbol>[A-Za-z0-9]+)_\d{8}_\d{6}\.parquet$")
+
+
+@dataclass(frozen=True)
+class CompactionOptions:
+    """Output tuning for compacted files."""
+
+    time_column: str = "timestamp"
+    compression: str = "zstd"
+    compression_level: int | None = None
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+
+
+@dataclass(frozen=True)
+class CompactionResult:
+    partition: Path
+    inputs: int
+    rows_in: int
+    rows_out: int
+    output: Path | None
+
+
+def is_compacted(path: Path) -> bool:
+    """True if *path* was produced by `compact_partition`."""
+
+    metadata = pq.read_schema(path).metadata or {}
+    return metadata.get(COMPACTED_KEY.encode("utf-8")) == b"1"
+
+
+def _parts(directory: Path) -> list[Path]:
+    parts = [(part_index(p), p) for p in directory.iterdir()]
+    return [p for i, p in sorted((i, p) for i, p in parts if i is not None)]
+
+
+def _has_open_writer(directory: Path) -> bool:
+    return any(p.name.startswith(IN_PROGRESS_PREFIX) for p in directory.iterdir())
+
+
+def plan_compaction(
+    root: str | Path,
+    dataset: str = TICKS_DATASET,
+    timeframe: str = TICK_TIMEFRAME,
+    *,
+    symbols: Iterable[str] | None = None,
+    include_today: bool = False,
+) -> list[Path]:
+    """Partition directories that need compaction.
+
+    Skips partitions that are already a single compacted file, partitions with
+    an open (in-progress) writer file and, unless *include_today*, the current
+    UTC day, which the harvester is still appending to.
+    """
+
+    today = datetime.now(UTC).date()
+    planned: list[Path] = []
+    for _, day, directory in iter_partition_dirs(root, dataset, timeframe, symbols=symbols):
+        if day >= today and not include_today:
+            continue
+        if _has_open_writer(directory):
+            continue
+        parts = _parts(directory)
+        if not parts or (len(parts) == 1 and is_compacted(parts[0])):
+            continue
+        planned.append(directory)
+    return planned
+
+
+def _sort_and_dedupe(table: pa.Table, time_column: str) -> pa.Table:
+    frame = pl.from_arrow(table)
+    assert isinstance(frame, pl.DataFrame)
+    keys = [time_column]
+    if time_column != "local_timestamp" and "local_timestamp" in frame.columns:
+        keys.append("local_timestamp")
+    frame = frame.unique(maintain_order=True).sort(keys, maintain_order=True)
+    return frame.to_arrow().cast(table.schema)
+
+
+def write_compacted(path: Path, table: pa.Table, options: CompactionOptions) -> None:
+    """Write *table* with compaction settings (zstd, row groups, stats, sort order)."""
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[COMPACTED_KEY.encode("utf-8")] = b"1"
+    table = table.replace_schema_metadata(metadata)
+
+    pq.write_table(
+        table,
+        path,
+        compression=options.compression,
+        compression_level=options.compression_level,
+        row_group_size=options.row_group_size,
+        write_statistics=True,
+        sorting_columns=[pq.SortingColumn(table.schema.get_field_index(options.time_column))],
+    )
+
+
+def compact_partition(
+    directory: str | Path, options: CompactionOptions | None = None
+) -> CompactionResult:
+    """Merge every part file in one partition directory into a single file."""
+
+    directory = Path(directory)
+    options = options or CompactionOptions()
+    parts = _parts(directory)
+    if not parts:
+        return CompactionResult(directory, 0, 0, 0, None)
+
+    tables = [read_parquet(p, expected_version=SchemaVersion.V1) for p in parts]
+    merged = pa.concat_tables(
+        [t.replace_schema_metadata(None) for t in tables], promote_options="permissive"
+    )
+    rows_in = merged.num_rows
+    merged = attach_schema_version(
+        _sort_and_dedupe(merged, options.time_column), version=SchemaVersion.V1
+    )
+
+    fd, tmp_name = tempfile.mkstemp(prefix=".compact-", suffix=".tmp", dir=directory)
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        write_compacted(tmp, merged, options)
+        os.replace(tmp, parts[0])
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    for extra in parts[1:]:
+        extra.unlink(missing_ok=True)
+
+    logger.info(f"🗜️ Compacted {directory}: {len(parts)} files, {rows_in} -> {merged.num_rows} rows")
+    return CompactionResult(directory, len(parts), rows_in, merged.num_rows, parts[0])
+
+
+def compact(
+    root: str | Path,
+    dataset: str = TICKS_DATASET,
+    timeframe: str = TICK_TIMEFRAME,
+    *,
+    symbols: Iterable[str] | None = None,
+    include_today: bool = False,
+    options: CompactionOptions | None = None,
+    workers: int = 1,
+) -> list[CompactionResult]:
+    """Compact every partition that needs it, optionally in parallel processes."""
+
+    planned = plan_compaction(
+        root, dataset, timeframe, symbols=symbols, include_today=include_today
+    )
+    options = options or CompactionOptions()
+    if not planned:
+        return []
+
+    if workers <= 1:
+        return [compact_partition(d, options) for d in planned]
+
+    # spawn, not fork: Polars/Arrow thread pools are not fork-safe.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(compact_partition, planned, [options] * len(planned)))
+
+
+def legacy_symbol(path: Path, symbol_map: Mapping[str, str] | None = None) -> str:
+    """Best-effort symbol for a legacy flat file named `<exchange>_<SYMBOL>_<ts>.parquet`.
+
+    *symbol_map* maps slash-less tokens (`BTCUSDT`) to canonical symbols
+    (`BTC/USDT`); unknown `...USDT` tokens are split on the quote currency.
+    """
+
+    match = _LEGACY_NAME.match(path.name)
+    if not match:
+        return LEGACY_SYMBOL
+    token = match.group("symbol")
+    if symbol_map and token in symbol_map:
+        return symbol_map[token]
+    if token.endswith("USDT") and len(token) > 4:
+        return f"{token[:-4]}/USDT"
+    return token
+
+
+def conform_to_schema(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Select/cast *table* to *schema*, filling missing columns with nulls."""
+
+    columns = []
+    for field in schema:
+        if field.name in table.column_names:
+            columns.append(table[field.name].cast(field.type))
+        else:
+            columns.append(pa.nulls(table.num_rows, type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def migrate_legacy(
+    root: str | Path,
+    *,
+    symbol_map: Mapping[str, str] | None = None,
+    schema: pa.Schema = TICKS_SCHEMA_V1,
+) -> list[Path]:
+    """Move legacy flat tick files into the partitioned layout.
+
+    Files without a `symbol` column get one derived from the filename. Each
+    legacy file is deleted only after its rows were written; a crash in between
+    leaves duplicates, which the next compaction removes.
+    """
+
+    writer = PartitionedDatasetWriter(root, TICKS_DATASET, TICK_TIMEFRAME)
+    migrated: list[Path] = []
+    for path in list_legacy_files(root):
+        table = pq.read_table(path)
+        if "symbol" not in table.column_names:
+            symbol = legacy_symbol(path, symbol_map)
+            table = table.append_column("symbol", pa.array([symbol] * table.num_rows))
+        writer.write_table(conform_to_schema(table, schema))
+        path.unlink()
+        migrated.append(path)
+    if migrated:
+        logger.info(f"📦 Migrated {len(migrated)} legacy files into {TICKS_DATASET}/")
+    return migrated
@@ -0,0 +1,317 @@
+"""L2 order book depth buffers and diff encoding.
+
+Two storage modes for the optional `depth` dataset:
+
+- snapshot (`depth_schema(levels)`): every update stores all N levels of both
+  sides as Arrow fixed-size list columns, backed by 2-D NumPy buffers
+- diff (`DEPTH_DIFF_SCHEMA_V1`): every update stores only the levels whose
+  price or quantity changed since the previous update, as variable-length
+  lists of (level, price, qty). A keyframe row with every level is written at
+  the start of each flushed batch and every `keyframe_interval` rows, so each
+  batch decodes on its own. Updates that change none of the top N levels are
+  not stored at all.
+
+`decode_depth_diffs` turns diff rows back into snapshot rows.
+
+Missing levels (thin books) are NaN in both modes.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+import pyarrow as pa
+
+from momontum.data.buffers import BufferFullError
+from momontum.schemas import DEPTH_DIFF_SCHEMA_V1, depth_schema
+
+DEPTH_SNAPSHOT = "snapshot"
+DEPTH_DIFF = "diff"
+DEPTH_MODES = (DEPTH_SNAPSHOT, DEPTH_DIFF)
+
+# Row order of the per-update (4, levels) array.
+BID_PX, BID_QTY, ASK_PX, ASK_QTY = range(4)
+
+
+def depth_timeframe(levels: int, mode: str = DEPTH_SNAPSHOT) -> str:
+    """Timeframe directory for a depth dataset (`l20`, `l20-diff`)."""
+
+    if mode not in DEPTH_MODES:
+        raise ValueError(f"unknown depth mode {mode!r}, expected one of {DEPTH_MODES}")
+    return f"l{levels}" if mode == DEPTH_SNAPSHOT else f"l{levels}-diff"
+
+
+def fill_levels(
+    out: np.ndarray, bids: Sequence[Sequence[float]], asks: Sequence[Sequence[float]]
+) -> None:
+    """Copy ccxt `[[price, qty, ...], ...]` sides into a (4, levels) array, NaN-padded."""
+
+    levels = out.shape[1]
+    for px_row, qty_row, side in ((BID_PX, BID_QTY, bids), (ASK_PX, ASK_QTY, asks)):
+        n = min(len(side), levels)
+        for i in range(n):
+            entry = side[i]
+            out[px_row, i] = entry[0]
+            out[qty_row, i] = entry[1]
+        out[px_row, n:] = np.nan
+        out[qty_row, n:] = np.nan
+
+
+def _fixed_list(values: np.ndarray, levels: int) -> pa.FixedSizeListArray:
+    return pa.FixedSizeListArray.from_arrays(pa.array(values.ravel().copy()), levels)
+
+
+class _DepthRows:
+    """Shared row bookkeeping (times, capacity) of the depth buffers."""
+
+    schema: pa.Schema
+
+    def __init__(self, symbol: str, levels: int, capacity: int):
+        if capacity <= 0 or levels <= 0:
+            raise ValueError(f"capacity and levels must be positive, got {capacity}, {levels}")
+
+        self.symbol = symbol
+        self.levels = levels
+        self.capacity = capacity
+        self._timestamp = np.empty(capacity, dtype=np.int64)
+        self._timestamp_null = np.zeros(capacity, dtype=bool)
+        self._local_timestamp = np.empty(capacity, dtype=np.float64)
+        self._row = np.empty((4, levels), dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def is_full(self) -> bool:
+        return self._size >= self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return self._timestamp.nbytes + self._timestamp_null.nbytes + self._local_timestamp.nbytes
+
+    def _start_row(self) -> int:
+        if self._size >= self.capacity:
+            raise BufferFullError(f"buffer full ({self.capacity} rows)")
+        return self._size
+
+    def _set_times(self, i: int, timestamp: int | None, local_timestamp: float) -> None:
+        self._timestamp_null[i] = timestamp is None
+        self._timestamp[i] = 0 if timestamp is None else timestamp
+        self._local_timestamp[i] = local_timestamp
+
+    def _time_arrays(self, n: int) -> list[pa.Array]:
+        return [
+            pa.array([self.symbol] * n, type=pa.string()),
+            pa.array(
+                self._timestamp[:n].copy(), type=pa.int64(), mask=self._timestamp_null[:n].copy()
+            ),
+            pa.array(self._local_timestamp[:n].copy(), type=pa.float64()),
+        ]
+
+    def clear(self) -> None:
+        self._size = 0
+
+
+class DepthBuffer(_DepthRows):
+    """Fixed-capacity buffer of L2 snapshots for one symbol (`depth_schema(levels)`)."""
+
+    def __init__(self, symbol: str, levels: int, capacity: int):
+        super().__init__(symbol, levels, capacity)
+        self.schema = depth_schema(levels)
+        self._sides = np.empty((4, capacity, levels), dtype=np.float64)
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + self._sides.nbytes
+
+    def append(
+        self,
+        timestamp: int | None,
+        local_timestamp: float,
+        bids: Sequence[Sequence[float]],
+        asks: Sequence[Sequence[float]],
+    ) -> None:
+        i = self._start_row()
+        fill_levels(self._row, bids, asks)
+        self._sides[:, i, :] = self._row
+        self._set_times(i, timestamp, local_timestamp)
+        self._size = i + 1
+
+    def to_record_batch(self) -> pa.RecordBatch:
+        """Copy the buffered snapshots into a RecordBatch (safe to clear afterwards)."""
+
+        n = self._size
+        arrays = self._time_arrays(n)
+        arrays += [_fixed_list(self._sides[k, :n], self.levels) for k in range(4)]
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class DepthDiffBuffer(_DepthRows):
+    """Like `DepthBuffer`, but stores only changed levels (`DEPTH_DIFF_SCHEMA_V1`).
+
+    `append` returns False when the update changed none of the top levels and
+    was therefore not stored.
+    """
+
+    def __init__(self, symbol: str, levels: int, capacity: int, *, keyframe_interval: int = 100):
+        super().__init__(symbol, levels, capacity)
+        self.schema = DEPTH_DIFF_SCHEMA_V1
+        self.keyframe_interval = keyframe_interval
+        self._keyframe = np.zeros(capacity, dtype=bool)
+        # Per side (bid, ask): list offsets, changed level indices, (px, qty) values.
+        self._offsets = np.zeros((2, capacity + 1), dtype=np.int32)
+        self._level = np.empty((2, capacity * levels), dtype=np.int16)
+        self._values = np.empty((2, 2, capacity * levels), dtype=np.float64)
+        self._prev = np.full((4, levels), np.nan)
+        self._all_levels = np.arange(levels)
+        self._since_keyframe = 0
+        self._need_keyframe = True
+        self.skipped = 0
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            super().nbytes
+            + self._keyframe.nbytes
+            + self._offsets.nbytes
+            + self._level.nbytes
+            + self._values.nbytes
+        )
+
+    def append(
+        self,
+        timestamp: int | None,
+        local_timestamp: float,
+        bids: Sequence[Sequence[float]],
+        asks: Sequence[Sequence[float]],
+    ) -> bool:
+        i = self._start_row()
+        row, prev = self._row, self._prev
+        fill_levels(row, bids, asks)
+        keyframe = self._need_keyframe or self._since_keyframe >= self.keyframe_interval
+        if keyframe:
+            changed = (self._all_levels, self._all_levels)
+        else:
+            # NaN == NaN counts as unchanged (level still missing)
+            same = (row == prev) | (np.isnan(row) & np.isnan(prev))
+            changed = (
+                np.flatnonzero(~(same[BID_PX] & same[BID_QTY])),
+                np.flatnonzero(~(same[ASK_PX] & same[ASK_QTY])),
+            )
+            if not changed[0].size and not changed[1].size:
+                self.skipped += 1
+                return False
+
+        for side, levels in enumerate(changed):
+            start = self._offsets[side, i]
+            end = start + len(levels)
+            self._level[side, start:end] = levels
+            self._values[side, 0, start:end] = row[2 * side, levels]
+            self._values[side, 1, start:end] = row[2 * side + 1, levels]
+            self._offsets[side, i + 1] = end
+
+        self._keyframe[i] = keyframe
+        self._since_keyframe = 0 if keyframe else self._since_keyframe + 1
+        self._need_keyframe = False
+        prev[:] = row
+        self._set_times(i, timestamp, local_timestamp)
+        self._size = i + 1
+        return True
+
+    def clear(self) -> None:
+        """Reset for reuse; the next row is a keyframe so every batch decodes on its own."""
+
+        self._size = 0
+        self._need_keyframe = True
+
+    def to_record_batch(self) -> pa.RecordBatch:
+        n = self._size
+        arrays = self._time_arrays(n)
+        arrays.append(pa.array(self._keyframe[:n].copy(), type=pa.bool_()))
+        for side in range(2):
+            offsets = pa.array(self._offsets[side, : n + 1].copy())
+            end = self._offsets[side, n]
+            arrays.append(
+                pa.ListArray.from_arrays(offsets, pa.array(self._level[side, :end].copy()))
+            )
+            for k in range(2):
+                values = pa.array(self._values[side, k, :end].copy())
+                arrays.append(pa.ListArray.from_arrays(offsets, values))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def make_depth_buffer(
+    symbol: str, levels: int, capacity: int, mode: str = DEPTH_SNAPSHOT, **kwargs: Any
+) -> DepthBuffer | DepthDiffBuffer:
+    if mode == DEPTH_DIFF:
+        return DepthDiffBuffer(symbol, levels, capacity, **kwargs)
+    if mode == DEPTH_SNAPSHOT:
+        return DepthBuffer(symbol, levels, capacity)
+    raise ValueError(f"unknown depth mode {mode!r}, expected one of {DEPTH_MODES}")
+
+
+def _list_parts(column: pa.ChunkedArray) -> tuple[np.ndarray, np.ndarray]:
+    array = column.combine_chunks()
+    if isinstance(array, pa.ChunkedArray):  # empty column
+        array = pa.array([], type=column.type)
+    offsets = array.offsets.to_numpy()
+    values = array.values.to_numpy(zero_copy_only=False)
+    return offsets, values
+
+
+def decode_depth_diffs(table: pa.Table, levels: int) -> pa.Table:
+    """Rebuild full snapshots (`depth_schema(levels)`) from diff rows.
+
+    Rows must be in arrival order per symbol. Rows before a symbol's first
+    keyframe have NaN for every level not seen yet.
+    """
+
+    n = table.num_rows
+    symbols = table["symbol"].to_pylist()
+    keyframes = table["keyframe"].to_numpy(zero_copy_only=False)
+    sides = []
+    for prefix in ("bid", "ask"):
+        offsets, level = _list_parts(table[f"{prefix}_level"])
+        _, px = _list_parts(table[f"{prefix}_px"])
+        _, qty = _list_parts(table[f"{prefix}_qty"])
+        sides.append((offsets, level.astype(np.intp), px, qty))
+
+    out = np.empty((4, n, levels), dtype=np.float64)
+    state: dict[str, np.ndarray] = {}
+    for i in range(n):
+        current = state.get(symbols[i])
+        if current is None or keyframes[i]:
+            current = np.full((4, levels), np.nan)
+            state[symbols[i]] = current
+        for side, (offsets, level, px, qty) in enumerate(sides):
+            lo, hi = offsets[i], offsets[i + 1]
+            idx = level[lo:hi]
+            current[2 * side, idx] = px[lo:hi]
+            current[2 * side + 1, idx] = qty[lo:hi]
+        out[:, i, :] = current
+
+    schema = depth_schema(levels)
+    arrays = [
+        table["symbol"].combine_chunks(),
+        table["timestamp"].combine_chunks(),
+        table["local_timestamp"].combine_chunks(),
+    ]
+    arrays += [_fixed_list(out[k], levels) for k in range(4)]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def depth_imbalance(
+    bids: Sequence[Sequence[float]], asks: Sequence[Sequence[float]], levels: int
+) -> float:
+    """Quantity imbalance over the top *levels*, level i weighted by 1 / (i + 1).
+
+    Range [-1, 1]; positive means more resting size on the bid side.
+    """
+
+    bid_qty = sum(entry[1] / (i + 1) for i, entry in enumerate(bids[:levels]))
+    ask_qty = sum(entry[1] / (i + 1) for i, entry in enumerate(asks[:levels]))
+    total = bid_qty + ask_qty
+    return (bid_qty - ask_qty) / total if total > 0 else 0.0
@@ -0,0 +1,118 @@
+"""Ship RecordBatches between processes.
+
+Worker processes in the sharded harvester do not write Parquet themselves; they
+send each flushed batch to the supervisor, which owns the single shared writer.
+Batches travel as Arrow IPC stream bytes (no per-row pickling) over a bounded
+`multiprocessing` queue, so a slow writer pushes back on every worker.
+
+Durability flows the other way: the supervisor sends `(symbol, watermark)` acks
+on a per-worker queue so each worker can truncate its own tick journals. On
+shutdown a worker sends `ShardDrained` after its last batch; the supervisor
+closes its open files and answers with `None` on the ack queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import pyarrow as pa
+
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET
+
+
+def encode_batch(batch: pa.RecordBatch) -> bytes:
+    """Serialize *batch* as an Arrow IPC stream."""
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_batch(payload: bytes) -> pa.RecordBatch:
+    """Inverse of `encode_batch`."""
+
+    return pa.ipc.open_stream(payload).read_next_batch()
+
+
+@dataclass(frozen=True)
+class BatchMessage:
+    """One flushed batch sent from a worker to the supervisor's writer."""
+
+    shard_id: int
+    payload: bytes
+    watermark: int | None = None
+    dataset: str = TICKS_DATASET
+    timeframe: str = TICK_TIMEFRAME
+
+    @property
+    def batch(self) -> pa.RecordBatch:
+        return decode_batch(self.payload)
+
+
+@dataclass(frozen=True)
+class ShardDrained:
+    """Sent after a worker's final batch; the supervisor answers on the ack queue."""
+
+    shard_id: int
+
+
+ACK_POLL_SECONDS = 0.5
+
+
+class QueueTickSink:
+    """Async producer side: sends batches to a (multiprocessing) queue.
+
+    `put` blocks when the queue is full; it runs in the default executor so the
+    event loop keeps serving other symbols while this one waits (backpressure).
+    """
+
+    def __init__(self, out: Any, shard_id: int, acks: Any | None = None):
+        self.out = out
+        self.shard_id = shard_id
+        self.acks = acks
+        self.sent = 0
+        self.backpressure_waits = 0
+
+    async def submit(
+        self,
+        batch: pa.RecordBatch,
+        watermark: int | None = None,
+        *,
+        dataset: str = TICKS_DATASET,
+        timeframe: str = TICK_TIMEFRAME,
+    ) -> None:
+        message = BatchMessage(self.shard_id, encode_batch(batch), watermark, dataset, timeframe)
+        await self._put(message)
+        self.sent += 1
+
+    async def close(self) -> None:
+        """Tell the supervisor that every batch of this shard has been sent."""
+
+        await self._put(ShardDrained(self.shard_id))
+
+    async def listen(self, on_durable: Callable[[str, int], None]) -> None:
+        """Apply durability acks until the supervisor answers `close()`."""
+
+        if self.acks is None:
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                ack = await loop.run_in_executor(None, self.acks.get, True, ACK_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if ack is None:
+                return
+            on_durable(*ack)
+
+    async def _put(self, message: Any) -> None:
+        try:
+            self.out.put_nowait(message)
+        except queue.Full:
+            self.backpressure_waits += 1
+            await asyncio.get_running_loop().run_in_executor(None, self.out.put, message)
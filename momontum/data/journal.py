@@ -0,0 +1,333 @@
+"""Crash-safe, memory-mapped write-ahead journal for ticks.
+
+Ticks sit in memory (`TickBuffer`) and in open Parquet files (`RollingParquetWriter`)
+until a part file is closed, so a SIGKILL or OOM loses them. Each tick is
+therefore also appended to a per-symbol journal file:
+
+- the file is memory-mapped, so an append is a `struct.pack_into` into the page
+  cache with no syscall; the kernel keeps the data even if the process dies
+- `sync()` (msync) makes it durable against power loss and is meant to be called
+  on a timer (see `config.JOURNAL_FSYNC_INTERVAL`), never per tick
+- `truncate_through(seq)` drops records once the writer reports them durable in
+  a closed Parquet file; remaining records are moved to the front
+- on startup, `read()` returns whatever is left so it can be replayed
+
+File layout (little-endian):
+
+    header:  magic(8s) version(u32) record_size(u32) symbol(32s) epoch(u64) base_seq(u64)
+             count(u64)
+    records: epoch(u64) timestamp(i64) bid ask bidVolume askVolume last spread
+             spread_pct local_timestamp (f64 each)
+
+Records carry the header epoch; a record whose epoch does not match (e.g. a
+stale record from before a reset) ends replay. Missing floats are NaN and a
+missing timestamp is stored as INT64_MIN.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+from momontum.data.layout import symbol_to_path
+from momontum.data.rotation import RollingParquetWriter, part_watermarks
+from momontum.schemas import TICKS_SCHEMA_V1
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MMTWAL01"
+VERSION = 1
+NULL_TIMESTAMP = np.iinfo(np.int64).min
+
+HEADER = struct.Struct("<8sII32sQQQ")
+RECORD = struct.Struct("<Qqdddddddd")
+_COUNT = struct.Struct("<Q")
+_COUNT_OFFSET = HEADER.size - _COUNT.size
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("epoch", "<u8"),
+        ("timestamp", "<i8"),
+        ("bid", "<f8"),
+        ("ask", "<f8"),
+        ("bidVolume", "<f8"),
+        ("askVolume", "<f8"),
+        ("last", "<f8"),
+        ("spread", "<f8"),
+        ("spread_pct", "<f8"),
+        ("local_timestamp", "<f8"),
+    ]
+)
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+_NAN = float("nan")
+
+
+class JournalCorruptError(ValueError):
+    """Raised when a journal file has an unexpected header."""
+
+
+class TickJournal:
+    """Append-only mmap journal of ticks for a single symbol.
+
+    Not thread-safe for appends; call `append`/`truncate_through` from one
+    thread (the event loop). `sync()` may run on another thread.
+    """
+
+    def __init__(self, path: str | Path, symbol: str | None = None, *, capacity: int = 65_536):
+        """Open *path*, creating it for *symbol* if missing.
+
+        Existing journals keep the symbol stored in their header, so leftover
+        files can be replayed without knowing which basket wrote them.
+        """
+
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fresh = not self.path.exists() or self.path.stat().st_size < HEADER.size
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        if fresh:
+            if symbol is None:
+                os.close(self._fd)
+                raise ValueError(f"{self.path}: symbol is required to create a journal")
+            if len(symbol.encode("utf-8")) > 32:
+                os.close(self._fd)
+                raise ValueError(f"symbol too long for journal header: {symbol!r}")
+            self.symbol = symbol
+            self._capacity = capacity
+            os.ftruncate(self._fd, self._size_for(capacity))
+            self._mm = mmap.mmap(self._fd, 0)
+            self._epoch, self._base_seq, self._count = 1, 0, 0
+            self._write_header()
+        else:
+            self._mm = mmap.mmap(self._fd, 0)
+            magic, version, record_size, raw_symbol, epoch, base_seq, count = HEADER.unpack_from(
+                self._mm, 0
+            )
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                self.close()
+                raise JournalCorruptError(f"{self.path}: not a v{VERSION} tick journal")
+            self.symbol = raw_symbol.rstrip(b"\0").decode("utf-8")
+            self._capacity = (len(self._mm) - HEADER.size) // RECORD.size
+            self._epoch, self._base_seq = epoch, base_seq
+            self._count = min(count, self._capacity)
+
+    @staticmethod
+    def _size_for(capacity: int) -> int:
+        return HEADER.size + capacity * RECORD.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest record (-1 if nothing was ever appended)."""
+
+        return self._base_seq + self._count - 1
+
+    def append(
+        self,
+        timestamp: int | None,
+        bid: float | None,
+        ask: float | None,
+        bid_volume: float | None,
+        ask_volume: float | None,
+        last: float | None,
+        spread: float | None,
+        spread_pct: float | None,
+        local_timestamp: float,
+    ) -> int:
+        """Append one tick and return its sequence number."""
+
+        count = self._count
+        if count >= self._capacity:
+            self._grow()
+
+        RECORD.pack_into(
+            self._mm,
+            HEADER.size + count * RECORD.size,
+            self._epoch,
+            NULL_TIMESTAMP if timestamp is None else timestamp,
+            _NAN if bid is None else bid,
+            _NAN if ask is None else ask,
+            _NAN if bid_volume is None else bid_volume,
+            _NAN if ask_volume is None else ask_volume,
+            _NAN if last is None else last,
+            _NAN if spread is None else spread,
+            _NAN if spread_pct is None else spread_pct,
+            local_timestamp,
+        )
+        # Publish the record only after it is fully written.
+        self._count = count + 1
+        _COUNT.pack_into(self._mm, _COUNT_OFFSET, self._count)
+        return self._base_seq + count
+
+    def records(self) -> np.ndarray:
+        """Copy of all valid records as a structured array (`RECORD_DTYPE`)."""
+
+        data = np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=self._count, offset=HEADER.size)
+        stale = np.flatnonzero(data["epoch"] != self._epoch)
+        if stale.size:
+            data = data[: stale[0]]
+        return data.copy()
+
+    def read(self) -> pa.RecordBatch:
+        """Journal contents as a `TICKS_SCHEMA_V1` RecordBatch (for replay)."""
+
+        return records_to_batch(self.records(), self.symbol)
+
+    def truncate_through(self, seq: int) -> None:
+        """Drop every record with sequence number <= *seq*."""
+
+        if self._mm.closed:
+            return
+        drop = min(seq - self._base_seq + 1, self._count)
+        if drop <= 0:
+            return
+
+        remaining = self._count - drop
+        if remaining:
+            self._mm.move(HEADER.size, HEADER.size + drop * RECORD.size, remaining * RECORD.size)
+        self._base_seq += drop
+        self._count = remaining
+        self._write_header()
+
+    def reset(self) -> None:
+        """Drop all records (after a successful replay)."""
+
+        self._base_seq += self._count
+        self._count = 0
+        self._epoch += 1
+        self._write_header()
+
+    def sync(self) -> None:
+        """Flush the mapping to disk (msync)."""
+
+        with self._lock:
+            self._mm.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mm.closed:
+                return
+            self._mm.flush()
+            self._mm.close()
+            os.close(self._fd)
+
+    def _write_header(self) -> None:
+        HEADER.pack_into(
+            self._mm,
+            0,
+            MAGIC,
+            VERSION,
+            RECORD.size,
+            self.symbol.encode("utf-8"),
+            self._epoch,
+            self._base_seq,
+            self._count,
+        )
+
+    def _grow(self) -> None:
+        with self._lock:
+            self._mm.flush()
+            self._mm.close()
+            self._capacity *= 2
+            os.ftruncate(self._fd, self._size_for(self._capacity))
+            self._mm = mmap.mmap(self._fd, 0)
+
+
+def _iso8601(ms: int) -> str | None:
+    if ms == NULL_TIMESTAMP:
+        return None
+    dt = datetime.fromtimestamp(ms / 1000, tz=UTC)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{ms % 1000:03d}Z"
+
+
+def records_to_batch(records: np.ndarray, symbol: str) -> pa.RecordBatch:
+    """Convert journal records into a `TICKS_SCHEMA_V1` RecordBatch.
+
+    `datetime` is rebuilt from the exchange timestamp in ccxt's ISO8601 format.
+    """
+
+    n = len(records)
+    timestamps = records["timestamp"]
+    ts_mask = timestamps == NULL_TIMESTAMP
+    arrays: list[pa.Array] = []
+    for field in TICKS_SCHEMA_V1:
+        if field.name == "symbol":
+            arrays.append(pa.array([symbol] * n, type=field.type))
+        elif field.name == "datetime":
+            arrays.append(pa.array([_iso8601(int(t)) for t in timestamps], type=field.type))
+        elif field.name == "timestamp":
+            arrays.append(pa.array(timestamps, type=field.type, mask=ts_mask))
+        else:
+            arrays.append(pa.array(records[field.name], type=field.type, from_pandas=True))
+    return pa.RecordBatch.from_arrays(arrays, schema=TICKS_SCHEMA_V1)
+
+
+def journal_path(directory: str | Path, symbol: str) -> Path:
+    return Path(directory) / f"{symbol_to_path(symbol)}.wal"
+
+
+def replay_journals(
+    directory: str | Path, writer: RollingParquetWriter, recovered: Iterable[Path] = ()
+) -> int:
+    """Write every leftover journal in *directory* through *writer*, then empty them.
+
+    The writer is closed afterwards so replayed rows end up in published files
+    before the journals are reset. *recovered* are the files `writer.recover()`
+    published: their rows were never reported durable, so they are still
+    journaled, and records within a file's watermark range (`part_watermarks`)
+    are skipped rather than written twice. Returns the number of replayed rows.
+    """
+
+    directory = Path(directory)
+    if not directory.is_dir():
+        return 0
+
+    held: dict[str, list[tuple[int, int]]] = {}
+    for path in recovered:
+        marks = part_watermarks(path)
+        if marks is not None:
+            symbol, low, high = marks
+            held.setdefault(symbol, []).append((-1 if low is None else low, high))
+
+    journals = [TickJournal(path) for path in sorted(directory.glob("*.wal"))]
+    try:
+        replayed = 0
+        for journal in journals:
+            batch = journal.read()
+            ranges = held.get(journal.symbol)
+            if ranges and batch.num_rows:
+                seqs = journal.last_seq - len(journal) + 1 + np.arange(batch.num_rows)
+                keep = np.ones(batch.num_rows, dtype=bool)
+                for low, high in ranges:
+                    keep &= (seqs <= low) | (seqs > high)
+                skipped = batch.num_rows - int(keep.sum())
+                if skipped:
+                    logger.warning(
+                        f"♻️ {journal.symbol}: {skipped} journaled ticks already recovered"
+                    )
+                    batch = batch.filter(pa.array(keep))
+            if batch.num_rows:
+                writer.write_batch(batch)
+                replayed += batch.num_rows
+                logger.warning(f"♻️ {journal.symbol}: replaying {batch.num_rows} journaled ticks")
+        writer.close()
+        for journal in journals:
+            journal.reset()
+        return replayed
+    finally:
+        for journal in journals:
+            journal.close()
@@ -0,0 +1,243 @@
+"""Canonical on-disk layout for partitioned Parquet datasets.
+
+Implements the layout from docs/parquet_schema.md:
+
+    DATA_ROOT/<dataset>/<timeframe>/<symbol>/YYYY/MM/DD/part-NNNN.parquet
+
+- rows are placed by the UTC date of their timestamp column
+- every file is written through `write_parquet`, so it carries `schema_version`
+- part numbers are claimed with an atomic hard link, so concurrent writers
+  (threads or processes) never overwrite each other and readers never observe a
+  half-written file under its final name
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from momontum.data.schema import SchemaVersion, write_parquet
+
+logger = logging.getLogger(__name__)
+
+TICKS_DATASET = "ticks"
+TICK_TIMEFRAME = "tick"
+TRADES_DATASET = "trades"
+TRADE_TIMEFRAME = "trade"
+DEPTH_DATASET = "depth"  # timeframe is the level count/encoding, see momontum.data.depth
+CANDLES_DATASET = "candles"  # timeframe is the interval, see momontum.data.candles
+FEATURES_DATASET = "features"  # per-tick features, see momontum.features
+
+PART_PATTERN = re.compile(r"^part-(\d{4,})\.parquet$")
+MS_PER_DAY = 86_400_000
+
+
+def symbol_to_path(symbol: str) -> str:
+    """Path-safe form of an exchange symbol (`BTC/USDT` -> `BTC-USDT`)."""
+
+    return symbol.replace("/", "-").replace(":", "_")
+
+
+def part_name(index: int) -> str:
+    return f"part-{index:04d}.parquet"
+
+
+def partition_dir(root: str | Path, dataset: str, timeframe: str, symbol: str, day: date) -> Path:
+    """Directory holding one symbol/day partition."""
+
+    return (
+        Path(root)
+        / dataset
+        / timeframe
+        / symbol_to_path(symbol)
+        / f"{day.year:04d}"
+        / f"{day.month:02d}"
+        / f"{day.day:02d}"
+    )
+
+
+def part_index(path: Path) -> int | None:
+    """Part number of a `part-NNNN.parquet` path, or None for other files."""
+
+    match = PART_PATTERN.match(path.name)
+    return int(match.group(1)) if match else None
+
+
+def _next_part_index(directory: Path) -> int:
+    highest = -1
+    if directory.is_dir():
+        for entry in directory.iterdir():
+            index = part_index(entry)
+            if index is not None:
+                highest = max(highest, index)
+    return highest + 1
+
+
+class PartitionedDatasetWriter:
+    """Writes tables into the canonical `<dataset>/<timeframe>/<symbol>/YYYY/MM/DD` layout."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        dataset: str,
+        timeframe: str,
+        *,
+        version: SchemaVersion = SchemaVersion.V1,
+        time_column: str = "timestamp",
+        symbol_column: str = "symbol",
+        compression: str = "snappy",
+    ):
+        self.root = Path(root)
+        self.dataset = dataset
+        self.timeframe = timeframe
+        self.version = version
+        self.time_column = time_column
+        self.symbol_column = symbol_column
+        self.compression = compression
+
+        self._lock = threading.Lock()
+        self._next_index: dict[Path, int] = {}
+
+    def partition_dir(self, symbol: str, day: date) -> Path:
+        return partition_dir(self.root, self.dataset, self.timeframe, symbol, day)
+
+    def write_batch(self, batch: pa.RecordBatch) -> list[Path]:
+        return self.write_table(pa.Table.from_batches([batch]))
+
+    def write_table(self, table: pa.Table) -> list[Path]:
+        """Split *table* by symbol and UTC day and write one part file per partition."""
+
+        written: list[Path] = []
+        for (symbol, day), part in self.split(table):
+            written.append(self.write_partition(symbol, day, part))
+        return written
+
+    def split(self, table: pa.Table) -> Iterable[tuple[tuple[str, date], pa.Table]]:
+        """Yield `((symbol, day), rows)` groups for *table*.
+
+        Rows with a null timestamp are placed in the current UTC day.
+        """
+
+        if table.num_rows == 0:
+            return
+
+        days = pc.divide(table[self.time_column], MS_PER_DAY)
+        today = datetime.now(UTC).date()
+        today_idx = (today - date(1970, 1, 1)).days
+        days = pc.fill_null(days, today_idx)
+
+        for symbol in pc.unique(table[self.symbol_column]).to_pylist():
+            by_symbol = pc.equal(table[self.symbol_column], symbol)
+            for day_idx in pc.unique(pc.filter(days, by_symbol)).to_pylist():
+                mask = pc.and_(by_symbol, pc.equal(days, day_idx))
+                day = date(1970, 1, 1) + timedelta(days=day_idx)
+                yield (symbol, day), table.filter(mask)
+
+    def write_partition(self, symbol: str, day: date, table: pa.Table) -> Path:
+        """Write *table* as the next free `part-NNNN.parquet` in the partition."""
+
+        directory = self.partition_dir(symbol, day)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_name = tempfile.mkstemp(prefix=".part-", suffix=".tmp", dir=directory)
+        os.close(fd)
+        tmp = Path(tmp_name)
+        try:
+            write_parquet(tmp, table, version=self.version, compression=self.compression)
+            return self._publish(directory, tmp)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _publish(self, directory: Path, tmp: Path) -> Path:
+        # os.link fails if the target exists, which makes claiming a part number
+        # atomic even across processes sharing the same data root.
+        with self._lock:
+            index = self._next_index.get(directory)
+            if index is None:
+                index = _next_part_index(directory)
+            while True:
+                target = directory / part_name(index)
+                try:
+                    os.link(tmp, target)
+                except FileExistsError:
+                    index += 1
+                    continue
+                self._next_index[directory] = index + 1
+                return target
+
+
+def iter_partition_dirs(
+    root: str | Path,
+    dataset: str,
+    timeframe: str,
+    *,
+    symbols: Iterable[str] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> Iterable[tuple[str, date, Path]]:
+    """Yield `(symbol_dir, day, path)` for partitions matching the filters.
+
+    Pruning happens on directory names only; no Parquet file is opened.
+    *start* and *end* are inclusive UTC dates.
+    """
+
+    base = Path(root) / dataset / timeframe
+    if not base.is_dir():
+        return
+
+    if symbols is None:
+        symbol_dirs = sorted(p for p in base.iterdir() if p.is_dir())
+    else:
+        symbol_dirs = [base / symbol_to_path(s) for s in symbols]
+
+    for symbol_dir in symbol_dirs:
+        if not symbol_dir.is_dir():
+            continue
+        for day_dir in sorted(symbol_dir.glob("[0-9][0-9][0-9][0-9]/[0-9][0-9]/[0-9][0-9]")):
+            try:
+                day = date(
+                    int(day_dir.parent.parent.name), int(day_dir.parent.name), int(day_dir.name)
+                )
+            except ValueError:
+                continue
+            if start is not None and day < start:
+                continue
+            if end is not None and day > end:
+                continue
+            yield symbol_dir.name, day, day_dir
+
+
+def list_partition_files(
+    root: str | Path,
+    dataset: str,
+    timeframe: str,
+    *,
+    symbols: Iterable[str] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> list[Path]:
+    """Part files for the matching partitions, ordered by symbol, day and part number."""
+
+    files: list[Path] = []
+    for _, _, day_dir in iter_partition_dirs(
+        root, dataset, timeframe, symbols=symbols, start=start, end=end
+    ):
+        parts = {part_index(p): p for p in day_dir.iterdir()}
+        parts.pop(None, None)
+        files.extend(parts[i] for i in sorted(i for i in parts if i is not None))
+    return files
+
+
+def list_legacy_files(root: str | Path) -> list[Path]:
+    """Flat `<exchange>_<SYMBOL>_<ts>.parquet` files written before the partitioned layout."""
+
+    return sorted(Path(root).glob("*.parquet"))
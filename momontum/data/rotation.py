@@ -0,0 +1,290 @@
+"""Append-mode, rotating Parquet writer for the partitioned layout.
+
+Writing one file per flush produces tens of thousands of tiny files per day.
+`RollingParquetWriter` instead keeps one open `ParquetWriter` per partition
+(symbol + UTC day), appends each flush as a row group, and rotates to a new
+`part-NNNN.parquet` when a row-count, byte-size or wall-clock limit is reached.
+
+Crash safety:
+- open files live under a hidden `.part-*.inprogress` name, so readers globbing
+  `part-*.parquet` never see a file without a footer
+- closing a file writes the footer and then publishes it with the same atomic
+  hard-link step used by `PartitionedDatasetWriter`
+- `recover()` runs at startup: in-progress files that are readable (footer
+  written, publish step interrupted) are published; files without a footer are
+  renamed to `*.corrupt` and left for inspection
+
+Durability watermarks: callers may tag each write with a monotonically
+increasing per-symbol watermark (e.g. a `TickJournal` sequence number). Once
+every row up to a watermark sits in a closed, published file, `on_durable` is
+called with `(symbol, watermark)` so the journal can be truncated. A closing
+part also records the watermark range of its rows in its footer
+(`part_watermarks`), so rows of a file that `recover()` publishes, which were
+never reported durable, can be told apart from journaled rows still missing.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from momontum.data.layout import PartitionedDatasetWriter
+from momontum.data.schema import schema_with_version
+
+# Footer key of a closed part's watermark range, JSON {"symbol", "low", "high"}
+WATERMARK_KEY = "momontum.watermarks"
+
+logger = logging.getLogger(__name__)
+
+IN_PROGRESS_PREFIX = ".part-"
+IN_PROGRESS_SUFFIX = ".inprogress"
+CORRUPT_SUFFIX = ".corrupt"
+
+
+@dataclass(frozen=True)
+class RotationPolicy:
+    """Limits after which an open part file is closed and a new one started.
+
+    Any limit set to None is disabled.
+    """
+
+    max_rows: int | None = 1_000_000
+    max_bytes: int | None = 128 * 1024 * 1024
+    max_age_seconds: float | None = 3600.0
+
+    def should_rotate(self, *, rows: int, nbytes: int, age_seconds: float) -> bool:
+        if self.max_rows is not None and rows >= self.max_rows:
+            return True
+        if self.max_bytes is not None and nbytes >= self.max_bytes:
+            return True
+        return self.max_age_seconds is not None and age_seconds >= self.max_age_seconds
+
+
+@dataclass
+class _OpenPart:
+    directory: Path
+    path: Path
+    sink: pa.NativeFile
+    writer: pq.ParquetWriter
+    opened_at: float
+    rows: int = 0
+    # Rows in this part all have a watermark strictly greater than this.
+    low_watermark: int | None = None
+    # ...and at most this (the watermark of the last write into it)
+    high_watermark: int | None = None
+
+    @property
+    def nbytes(self) -> int:
+        return self.sink.tell()
+
+
+class RollingParquetWriter(PartitionedDatasetWriter):
+    """`PartitionedDatasetWriter` that appends row groups to long-lived part files.
+
+    Not thread-safe for concurrent writes; use it from a single writer thread
+    (e.g. behind `BackgroundWriter`). `close()` must be called on shutdown to
+    write the footers of all open files.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        dataset: str,
+        timeframe: str,
+        *,
+        policy: RotationPolicy | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        on_durable: Callable[[str, int], None] | None = None,
+        **kwargs,
+    ):
+        super().__init__(root, dataset, timeframe, **kwargs)
+        self.policy = policy or RotationPolicy()
+        self.clock = clock
+        self.on_durable = on_durable
+        self._open: dict[tuple[str, date], _OpenPart] = {}
+        self._parts_lock = threading.RLock()
+        self._watermarks: dict[str, int] = {}
+        self._durable: dict[str, int] = {}
+        self._incoming: int | None = None  # watermark of the write in progress
+
+    @property
+    def open_partitions(self) -> list[tuple[str, date]]:
+        return list(self._open)
+
+    def write_batch(self, batch: pa.RecordBatch, watermark: int | None = None) -> list[Path]:
+        return self.write_table(pa.Table.from_batches([batch]), watermark=watermark)
+
+    def write_table(self, table: pa.Table, watermark: int | None = None) -> list[Path]:
+        """Append *table*; *watermark* tags every symbol it contains (see module docs)."""
+
+        with self._parts_lock:
+            self._incoming = watermark
+            try:
+                written = super().write_table(table)
+            finally:
+                self._incoming = None
+            if watermark is not None:
+                for symbol in pc.unique(table[self.symbol_column]).to_pylist():
+                    self._watermarks[symbol] = watermark
+                    self._notify_durable(symbol)
+            return written
+
+    def write_partition(self, symbol: str, day: date, table: pa.Table) -> Path:
+        """Append *table* as a row group; returns the in-progress file it went to."""
+
+        with self._parts_lock:
+            self.rotate_expired()
+
+            key = (symbol, day)
+            part = self._open.get(key)
+            if part is None:
+                part = self._open_part(self.partition_dir(symbol, day), table.schema)
+                part.low_watermark = self._watermarks.get(symbol)
+                self._open[key] = part
+
+            part.writer.write_table(table.replace_schema_metadata(part.writer.schema.metadata))
+            part.rows += table.num_rows
+            if self._incoming is not None:
+                part.high_watermark = self._incoming
+            path = part.path
+
+            if self._expired(part):
+                self._close_part(key)
+            return path
+
+    def rotate_expired(self) -> list[Path]:
+        """Close every open part that has hit a rotation limit."""
+
+        with self._parts_lock:
+            expired = [key for key, part in self._open.items() if self._expired(part)]
+            return [self._close_part(key) for key in expired]
+
+    def close(self) -> list[Path]:
+        """Write footers for and publish all open parts."""
+
+        with self._parts_lock:
+            return [self._close_part(key) for key in list(self._open)]
+
+    def close_symbols(self, symbols: Iterable[str]) -> list[Path]:
+        """Write footers for and publish the open parts of *symbols* only."""
+
+        wanted = set(symbols)
+        with self._parts_lock:
+            return [self._close_part(key) for key in list(self._open) if key[0] in wanted]
+
+    def recover(self) -> tuple[list[Path], list[Path]]:
+        """Finalize in-progress files left behind by a previous process.
+
+        Returns `(published, quarantined)` paths. Must run before this writer
+        opens any file of its own.
+        """
+
+        published: list[Path] = []
+        quarantined: list[Path] = []
+        base = self.root / self.dataset / self.timeframe
+        if not base.is_dir():
+            return published, quarantined
+
+        leftovers = [*base.rglob(f"{IN_PROGRESS_PREFIX}*{IN_PROGRESS_SUFFIX}")]
+        leftovers += base.rglob(f"{IN_PROGRESS_PREFIX}*.tmp")
+        for path in sorted(leftovers):
+            try:
+                readable = pq.ParquetFile(path).metadata.num_rows > 0
+            except Exception:
+                readable = False
+
+            if readable:
+                published.append(self._publish(path.parent, path))
+                path.unlink()
+                logger.warning(f"♻️ Recovered complete in-progress file as {published[-1]}")
+            else:
+                target = path.with_name(path.name + CORRUPT_SUFFIX)
+                path.rename(target)
+                quarantined.append(target)
+                logger.warning(f"♻️ Quarantined unreadable in-progress file {target}")
+
+        return published, quarantined
+
+    def _expired(self, part: _OpenPart) -> bool:
+        return self.policy.should_rotate(
+            rows=part.rows, nbytes=part.nbytes, age_seconds=self.clock() - part.opened_at
+        )
+
+    def _open_part(self, directory: Path, schema: pa.Schema) -> _OpenPart:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(
+            prefix=IN_PROGRESS_PREFIX, suffix=IN_PROGRESS_SUFFIX, dir=directory
+        )
+        os.close(fd)
+        path = Path(name)
+        sink = pa.OSFile(str(path), "wb")
+        writer = pq.ParquetWriter(
+            sink,
+            schema_with_version(schema.remove_metadata(), version=self.version),
+            compression=self.compression,
+        )
+        return _OpenPart(directory, path, sink, writer, self.clock())
+
+    def _finish(self, symbol: str, part: _OpenPart) -> None:
+        """Write the footer (with the part's watermark range) of an open part."""
+
+        if part.high_watermark is not None:
+            marks = {"symbol": symbol, "low": part.low_watermark, "high": part.high_watermark}
+            part.writer.add_key_value_metadata({WATERMARK_KEY: json.dumps(marks)})
+        part.writer.close()
+        part.sink.close()
+
+    def _close_part(self, key: tuple[str, date]) -> Path:
+        part = self._open.pop(key)
+        self._finish(key[0], part)
+        try:
+            published = self._publish(part.directory, part.path)
+        finally:
+            part.path.unlink(missing_ok=True)
+        self._notify_durable(key[0])
+        return published
+
+    def _notify_durable(self, symbol: str) -> None:
+        if symbol not in self._watermarks:
+            return
+
+        open_lows = [part.low_watermark for (s, _), part in self._open.items() if s == symbol]
+        if not open_lows:
+            durable: int | None = self._watermarks[symbol]
+        elif any(low is None for low in open_lows):
+            durable = None
+        else:
+            durable = min(low for low in open_lows if low is not None)
+
+        if durable is None or durable <= self._durable.get(symbol, -1):
+            return
+        self._durable[symbol] = durable
+        if self.on_durable is not None:
+            self.on_durable(symbol, durable)
+
+
+def part_watermarks(path: str | Path) -> tuple[str, int | None, int] | None:
+    """`(symbol, low, high)` from a part's footer: its rows have `low < watermark <= high`.
+
+    *low* is None when nothing was written with a watermark before the part
+    opened. None for parts written without watermarks.
+    """
+
+    metadata = pq.ParquetFile(path).metadata.metadata or {}
+    raw = metadata.get(WATERMARK_KEY.encode())
+    if raw is None:
+        return None
+    marks = json.loads(raw)
+    return marks["symbol"], marks["low"], marks["high"]
@@ -44,6 +44,18 @@ def attach_schema_version(table: pa.Table, *, version: SchemaVersion) -> pa.Tabl
     return table.replace_schema_metadata(existing)
 
 
+def schema_with_version(schema: pa.Schema, *, version: SchemaVersion) -> pa.Schema:
+    """Return a copy of *schema* with schema_version stored in its metadata.
+
+    Used when opening a `pyarrow.parquet.ParquetWriter` that appends row groups
+    over time instead of writing a single table.
+    """
+
+    existing = dict(schema.metadata or {})
+    existing[SCHEMA_VERSION_KEY.encode("utf-8")] = version.value.encode("utf-8")
+    return schema.with_metadata(existing)
+
+
 def read_schema_version(table: pa.Table) -> SchemaVersion:
     """Read schema_version from a Table's schema metadata.
 
@@ -0,0 +1,142 @@
+"""Background Parquet writer stage.
+
+Compression and disk I/O are synchronous in PyArrow. Running them on the
+asyncio event loop stalls every other coroutine (e.g. `watch_order_book`), so
+flushes are handed to a dedicated writer thread through a bounded queue.
+
+- `submit()` awaits when the queue is full: producers feel explicit backpressure
+  instead of the process silently accumulating unbounded memory.
+- a single worker thread runs jobs in submission order, so sinks need not be
+  thread-safe. PyArrow releases the GIL while compressing and writing.
+- `close()` drains every queued job before returning.
+- `on_flush(seconds, rows)` (optional) is called on the event loop after each
+  successful write, e.g. to feed a flush-duration histogram.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+WriteFn = Callable[[pa.RecordBatch], Any]
+
+
+@dataclass
+class WriterStats:
+    """Counters describing the writer stage."""
+
+    submitted: int = 0
+    written: int = 0
+    rows_written: int = 0
+    errors: int = 0
+    backpressure_waits: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    last_flush_seconds: float = 0.0
+    max_flush_seconds: float = 0.0
+    total_flush_seconds: float = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class BackgroundWriter:
+    """Runs write jobs on a worker thread, fed by a bounded asyncio queue."""
+
+    def __init__(self, max_queue: int = 64, *, name: str = "parquet-writer"):
+        if max_queue <= 0:
+            raise ValueError(f"max_queue must be positive, got {max_queue}")
+
+        self.max_queue = max_queue
+        self.name = name
+        self.stats = WriterStats()
+        self.on_flush: Callable[[float, int], None] | None = None
+
+        self._queue: asyncio.Queue[tuple[WriteFn, pa.RecordBatch] | None] | None = None
+        self._consumer: asyncio.Task[None] | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._consumer is not None and not self._consumer.done()
+
+    def start(self) -> None:
+        """Start the consumer task on the running event loop (idempotent)."""
+
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+        self._consumer = asyncio.create_task(self._run(), name=self.name)
+
+    async def submit(self, write: WriteFn, batch: pa.RecordBatch) -> None:
+        """Queue `write(batch)`; waits (backpressure) while the queue is full."""
+
+        if not self.running:
+            self.start()
+        assert self._queue is not None
+
+        if self._queue.full():
+            self.stats.backpressure_waits += 1
+            logger.warning(
+                f"✍️ {self.name}: queue full ({self.max_queue} batches), applying backpressure"
+            )
+
+        await self._queue.put((write, batch))
+        self.stats.submitted += 1
+        depth = self._queue.qsize()
+        self.stats.queue_depth = depth
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, depth)
+
+    async def close(self) -> None:
+        """Drain all queued jobs, then stop the worker thread."""
+
+        if self._queue is None or self._consumer is None:
+            return
+
+        if not self._consumer.done():
+            await self._queue.put(None)
+            await self._consumer
+
+        assert self._executor is not None
+        self._executor.shutdown(wait=True)
+        self._queue = None
+        self._consumer = None
+        self._executor = None
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+
+        while True:
+            job = await self._queue.get()
+            self.stats.queue_depth = self._queue.qsize()
+            if job is None:
+                return
+
+            write, batch = job
+            started = time.perf_counter()
+            try:
+                await loop.run_in_executor(self._executor, write, batch)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error(f"✍️ {self.name}: write failed ({batch.num_rows} rows): {e}")
+                continue
+
+            elapsed = time.perf_counter() - started
+            self.stats.written += 1
+            self.stats.rows_written += batch.num_rows
+            self.stats.last_flush_seconds = elapsed
+            self.stats.max_flush_seconds = max(self.stats.max_flush_seconds, elapsed)
+            self.stats.total_flush_seconds += elapsed
+            if self.on_flush is not None:
+                self.on_flush(elapsed, batch.num_rows)
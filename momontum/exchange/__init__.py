@@ -0,0 +1 @@
+"""Exchange clients and test doubles."""
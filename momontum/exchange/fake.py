@@ -0,0 +1,169 @@
+"""Local fake of the ccxt.pro order book API.
+
+`FakeExchange` serves synthetic L2 order books (random-walk mid price) and
+trades through the same coroutines the harvester uses (`watch_order_book`,
+`watch_order_book_for_symbols`, `watch_trades`, `load_markets`, `close`), so
+throughput and reconnect handling can be exercised without the network:
+
+- `rate` limits updates per second per stream (None = as fast as the loop allows)
+- `fail_every` / `failure_rate` raise `ccxt.NetworkError` deterministically or
+  randomly, like a dropped websocket; the next call counts as a reconnect
+- `stats` counts updates, failures and (re)connects per stream
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from ccxt.base.errors import NetworkError
+
+
+@dataclass
+class FakeExchangeStats:
+    updates: int = 0
+    trades: int = 0
+    failures: int = 0
+    connects: int = 0
+    dropped: int = 0  # updates superseded before the consumer asked (replay conflation)
+    updates_by_symbol: dict[str, int] = field(default_factory=dict)
+
+
+def _iso8601(ms: int) -> str:
+    dt = datetime.fromtimestamp(ms / 1000, tz=UTC)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{ms % 1000:03d}Z"
+
+
+class FakeExchange:
+    """In-process stand-in for a ccxt.pro exchange (order book streams only)."""
+
+    id = "fake"
+    has = {"watchOrderBook": True, "watchOrderBookForSymbols": True, "watchTrades": True}
+
+    def __init__(
+        self,
+        symbols: Sequence[str] = (),
+        *,
+        rate: float | None = None,
+        fail_every: int | None = None,
+        failure_rate: float = 0.0,
+        start_price: float = 100.0,
+        tick_size: float = 0.01,
+        seed: int = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.symbols = list(symbols)
+        self.rate = rate
+        self.fail_every = fail_every
+        self.failure_rate = failure_rate
+        self.tick_size = tick_size
+        self.clock = clock
+        self.stats = FakeExchangeStats()
+        self.closed = False
+
+        self._rng = random.Random(seed)
+        self._mid = dict.fromkeys(self.symbols, start_price)
+        self._start_price = start_price
+        self._connected: set[tuple[str, ...]] = set()
+        self._cursor = 0  # round-robin position for multiplexed streams
+        self._calls = 0
+
+    async def load_markets(self, reload: bool = False) -> dict[str, Any]:
+        return {s: {"symbol": s} for s in self.symbols}
+
+    async def close(self) -> None:
+        self.closed = True
+        self._connected.clear()
+
+    async def watch_order_book(
+        self, symbol: str, limit: int | None = None, params: dict | None = None
+    ) -> dict[str, Any]:
+        await self._next_update((symbol,))
+        return self._order_book(symbol, limit or 5)
+
+    async def watch_order_book_for_symbols(
+        self, symbols: list[str], limit: int | None = None, params: dict | None = None
+    ) -> dict[str, Any]:
+        """Next update of any symbol in *symbols* (round-robin across the basket)."""
+
+        stream = tuple(symbols)
+        await self._next_update(stream)
+        symbol = symbols[self._cursor % len(symbols)]
+        self._cursor += 1
+        return self._order_book(symbol, limit or 5)
+
+    async def watch_trades(
+        self,
+        symbol: str,
+        since: int | None = None,
+        limit: int | None = None,
+        params: dict | None = None,
+    ) -> list[dict[str, Any]]:
+        """One to three new trades around the current mid price."""
+
+        await self._next_update(("trades", symbol))
+        mid = self._mid.get(symbol, self._start_price)
+        timestamp = int(self.clock() * 1000)
+        trades = []
+        for _ in range(self._rng.randint(1, 3)):
+            side = self._rng.choice(("buy", "sell"))
+            price = round(mid + (self.tick_size if side == "buy" else -self.tick_size) / 2, 8)
+            amount = round(self._rng.uniform(0.001, 2), 6)
+            self.stats.trades += 1
+            trades.append(
+                {
+                    "id": str(self.stats.trades),
+                    "symbol": symbol,
+                    "timestamp": timestamp,
+                    "datetime": _iso8601(timestamp),
+                    "side": side,
+                    "price": price,
+                    "amount": amount,
+                    "cost": price * amount,
+                }
+            )
+        return trades
+
+    async def _next_update(self, stream: tuple[str, ...]) -> None:
+        if stream not in self._connected:
+            self._connected.add(stream)
+            self.stats.connects += 1
+
+        if self.rate is not None:
+            await asyncio.sleep(1.0 / self.rate)
+        else:
+            await asyncio.sleep(0)
+
+        self._calls += 1
+        failed = self.fail_every is not None and self._calls % self.fail_every == 0
+        if failed or (self.failure_rate and self._rng.random() < self.failure_rate):
+            self.stats.failures += 1
+            self._connected.discard(stream)
+            raise NetworkError(f"fake: connection lost on {','.join(stream)}")
+
+    def _order_book(self, symbol: str, limit: int) -> dict[str, Any]:
+        mid = self._mid.get(symbol, self._start_price)
+        mid = max(self.tick_size, mid + self._rng.gauss(0.0, 10 * self.tick_size))
+        self._mid[symbol] = mid
+
+        best_bid = round(mid - self.tick_size / 2, 8)
+        best_ask = round(best_bid + self.tick_size, 8)
+        bids = [[best_bid - i * self.tick_size, self._rng.uniform(0.1, 10)] for i in range(limit)]
+        asks = [[best_ask + i * self.tick_size, self._rng.uniform(0.1, 10)] for i in range(limit)]
+
+        self.stats.updates += 1
+        self.stats.updates_by_symbol[symbol] = self.stats.updates_by_symbol.get(symbol, 0) + 1
+        timestamp = int(self.clock() * 1000)
+        return {
+            "symbol": symbol,
+            "bids": bids,
+            "asks": asks,
+            "timestamp": timestamp,
+            "datetime": _iso8601(timestamp),
+            "nonce": self.stats.updates,
+        }
@@ -0,0 +1,242 @@
+"""Replay recorded (or synthetic) ticks through the ccxt.pro order book API.
+
+`ReplayExchange` is a drop-in for the exchange client of `DataHarvester`, fed
+from a `TICKS_SCHEMA_V1` table instead of the network:
+
+- `ReplayExchange.from_parquet()` loads ticks harvested into the data lake;
+  `ReplayExchange.synthetic()` generates random-walk ticks for any number of
+  symbols
+- rows are replayed in exchange-timestamp order, at `speed` times real time,
+  or as fast as the consumer asks for them (`speed=None`)
+- when paced, a consumer that falls behind gets the latest due update, like a
+  websocket order book stream; the skipped updates are counted in
+  `stats.dropped`
+- with `rebase=True` (default) timestamps are shifted to the wall clock time at
+  which each update is due, so `local_timestamp - timestamp` measures delivery
+  lag
+- once every stream is exhausted `finished` is set and further calls block, like
+  an idle stream
+
+Only best bid/ask are recorded in ticks, so books have a single level per side
+and `watchTrades` is not offered.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Sequence
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, list_partition_files
+from momontum.data.schema import read_parquet
+from momontum.exchange.fake import FakeExchangeStats, _iso8601
+from momontum.schemas import TICKS_SCHEMA_V1
+
+MULTIPLEXED = "*"  # stream key of watch_order_book_for_symbols
+
+
+class ReplayExchange:
+    """In-process ccxt.pro stand-in replaying a ticks table."""
+
+    id = "replay"
+    has = {"watchOrderBook": True, "watchOrderBookForSymbols": True, "watchTrades": False}
+
+    def __init__(
+        self,
+        ticks: pa.Table,
+        *,
+        speed: float | None = 1.0,
+        rebase: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        if speed is not None and speed <= 0:
+            raise ValueError(f"speed must be positive (or None for unpaced), got {speed}")
+
+        ticks = ticks.filter(pc.is_valid(ticks["timestamp"])).sort_by("timestamp")
+        self.speed = speed
+        self.rebase = rebase
+        self.clock = clock
+        self.stats = FakeExchangeStats()
+        self.closed = False
+        self.finished = asyncio.Event()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+        symbol_column = ticks["symbol"].to_pylist()
+        self.symbols: list[str] = list(dict.fromkeys(symbol_column))
+        self._symbol = symbol_column
+        self._timestamp = ticks["timestamp"].to_numpy()
+        self._bid = ticks["bid"].to_pylist()
+        self._ask = ticks["ask"].to_pylist()
+        self._bid_volume = ticks["bidVolume"].to_pylist()
+        self._ask_volume = ticks["askVolume"].to_pylist()
+
+        # Seconds after the replay start at which each row is due
+        first = self._timestamp[0] if len(self._timestamp) else 0
+        self._due = (self._timestamp - first) / 1000.0 / (speed or 1.0)
+        symbols = np.asarray(symbol_column, dtype=object)
+        self._rows: dict[str, np.ndarray] = {s: np.flatnonzero(symbols == s) for s in self.symbols}
+        self._rows[MULTIPLEXED] = np.arange(len(symbol_column))
+        self._cursor: dict[str, int] = {}
+        self._connected: set[str] = set()
+        self._done: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._symbol)
+
+    @classmethod
+    def from_parquet(
+        cls,
+        root: str | Path,
+        *,
+        symbols: Sequence[str] | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        **kwargs: Any,
+    ) -> ReplayExchange:
+        """Replay ticks from the data lake (`ticks/tick/...` under *root*)."""
+
+        files = list_partition_files(
+            root, TICKS_DATASET, TICK_TIMEFRAME, symbols=symbols, start=start, end=end
+        )
+        if not files:
+            raise FileNotFoundError(f"no tick files under {root}")
+        tables = [read_parquet(f).select(TICKS_SCHEMA_V1.names) for f in files]
+        return cls(pa.concat_tables(tables).cast(TICKS_SCHEMA_V1), **kwargs)
+
+    @classmethod
+    def synthetic(cls, symbols: Sequence[str], n_ticks: int, **kwargs: Any) -> ReplayExchange:
+        """Replay `synthetic_ticks(symbols, n_ticks)`; `ReplayExchange` options pass through."""
+
+        options = {k: kwargs.pop(k) for k in ("speed", "rebase", "clock") if k in kwargs}
+        return cls(synthetic_ticks(symbols, n_ticks, **kwargs), **options)
+
+    async def load_markets(self, reload: bool = False) -> dict[str, Any]:
+        return {s: {"symbol": s} for s in self.symbols}
+
+    async def close(self) -> None:
+        self.closed = True
+        self._connected.clear()
+
+    async def watch_order_book(
+        self, symbol: str, limit: int | None = None, params: dict | None = None
+    ) -> dict[str, Any]:
+        return self._order_book(await self._next_row(symbol))
+
+    async def watch_order_book_for_symbols(
+        self, symbols: list[str], limit: int | None = None, params: dict | None = None
+    ) -> dict[str, Any]:
+        """Next update of the whole recording (all symbols, in timestamp order)."""
+
+        return self._order_book(await self._next_row(MULTIPLEXED))
+
+    async def _next_row(self, stream: str) -> int:
+        if stream not in self._connected:
+            self._connected.add(stream)
+            self.stats.connects += 1
+        if self.started_at is None:
+            self.started_at = self.clock()
+
+        rows = self._rows.get(stream)
+        if rows is None:
+            raise ValueError(f"replay: no ticks for {stream}")
+        i = self._cursor.get(stream, 0)
+        if i >= len(rows):
+            self._finish(stream)
+            await asyncio.Future()  # idle stream: blocks until cancelled
+
+        if self.speed is None:
+            await asyncio.sleep(0)
+        else:
+            elapsed = self.clock() - self.started_at
+            due = self._due[rows[i]]
+            if due > elapsed:
+                await asyncio.sleep(due - elapsed)
+            else:
+                # Behind schedule: jump to the latest update already due
+                latest = int(np.searchsorted(self._due[rows], elapsed, side="right")) - 1
+                self.stats.dropped += latest - i
+                i = latest
+
+        self._cursor[stream] = i + 1
+        if i + 1 >= len(rows):
+            self._finish(stream)
+        return int(rows[i])
+
+    def _finish(self, stream: str) -> None:
+        self._done.add(stream)
+        if MULTIPLEXED in self._done or self._done.issuperset(self.symbols):
+            if not self.finished.is_set():
+                self.finished_at = self.clock()
+                self.finished.set()
+
+    def _order_book(self, row: int) -> dict[str, Any]:
+        symbol = self._symbol[row]
+        bid, ask = self._bid[row], self._ask[row]
+        if not self.rebase:
+            timestamp = int(self._timestamp[row])
+        elif self.speed is None or self.started_at is None:
+            timestamp = int(self.clock() * 1000)  # unpaced: due as soon as it is asked for
+        else:
+            timestamp = int((self.started_at + self._due[row]) * 1000)
+
+        self.stats.updates += 1
+        self.stats.updates_by_symbol[symbol] = self.stats.updates_by_symbol.get(symbol, 0) + 1
+        return {
+            "symbol": symbol,
+            "bids": [[bid, self._bid_volume[row]]] if bid is not None else [],
+            "asks": [[ask, self._ask_volume[row]]] if ask is not None else [],
+            "timestamp": timestamp,
+            "datetime": _iso8601(timestamp),
+            "nonce": self.stats.updates,
+        }
+
+
+def synthetic_ticks(
+    symbols: Sequence[str],
+    n_ticks: int,
+    *,
+    interval_ms: int = 100,
+    start_ms: int = 1_700_000_000_000,
+    start_price: float = 100.0,
+    tick_size: float = 0.01,
+    seed: int = 0,
+) -> pa.Table:
+    """*n_ticks* random-walk ticks per symbol, one every *interval_ms* (jittered)."""
+
+    rng = np.random.default_rng(seed)
+    tables = []
+    for symbol in symbols:
+        steps = rng.integers(interval_ms // 2, interval_ms * 3 // 2 + 1, n_ticks)
+        timestamp = start_ms + int(rng.integers(0, interval_ms)) + np.cumsum(steps)
+        mid = np.maximum(
+            start_price + np.cumsum(rng.normal(0.0, 10 * tick_size, n_ticks)), tick_size
+        )
+        bid = np.round(mid - tick_size / 2, 8)
+        ask = np.round(bid + tick_size, 8)
+        tables.append(
+            pa.table(
+                {
+                    "symbol": [symbol] * n_ticks,
+                    "timestamp": timestamp,
+                    "datetime": [_iso8601(int(ts)) for ts in timestamp],
+                    "bid": bid,
+                    "ask": ask,
+                    "bidVolume": rng.uniform(0.1, 10, n_ticks),
+                    "askVolume": rng.uniform(0.1, 10, n_ticks),
+                    "last": np.full(n_ticks, np.nan),
+                    "spread": ask - bid,
+                    "spread_pct": (ask - bid) / bid * 100,
+                    "local_timestamp": timestamp / 1000.0,
+                },
+                schema=TICKS_SCHEMA_V1,
+            )
+        )
+    return pa.concat_tables(tables)
@@ -0,0 +1,438 @@
+"""Feature registry: one definition per feature, streaming and vectorized.
+
+Each feature is declared once, as a `Feature` subclass registered under a
+short kind, and provides both implementations:
+
+- `updater()`: an O(1) per-update function of `(bid, ask, bid_volume,
+  ask_volume)` for live use (harvester, `DataProcessor`).
+- `expr()`: a Polars expression over the tick columns of one symbol in time
+  order, for backtests and backfills.
+
+Features are named by spec strings, `<kind>` or `<kind>_<window>`:
+
+- `ema_<n>`: exponential moving average of the mid price, span n
+  (alpha = 2 / (n + 1)), seeded with the first mid
+- `vol_<n>`: standard deviation (ddof=1) of the last n mid log returns
+- `ofi_<n>`: order flow imbalance (Cont, Kukanov & Stoikov) of the best
+  levels, summed over the last n updates
+- `microprice`: size-weighted mid, `(bid * ask_volume + ask * bid_volume) /
+  (bid_volume + ask_volume)`
+- `zscore_<n>`: `(mid - mean) / std` over the last n mids (ddof=1)
+
+Until its window is full (or when undefined, e.g. zero deviation) a feature is
+NaN in streaming and null in Polars. `FeatureSet.frame` computes a whole set
+per symbol; tests keep the two implementations in agreement.
+
+Computed features can be persisted to `features/tick/<symbol>/YYYY/MM/DD/`
+(`backfill_features`) and read back with `load_features`, so backtests load
+columns instead of recomputing them.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Iterable, Sequence
+from datetime import UTC, date, datetime
+from pathlib import Path
+from typing import ClassVar
+
+import polars as pl
+import pyarrow as pa
+
+from momontum.data.layout import (
+    FEATURES_DATASET,
+    TICK_TIMEFRAME,
+    TICKS_DATASET,
+    PartitionedDatasetWriter,
+    iter_partition_dirs,
+    list_partition_files,
+    part_index,
+    partition_dir,
+)
+from momontum.rolling import RollingMoments
+from momontum.schemas import features_schema
+
+logger = logging.getLogger(__name__)
+
+FEATURES_TIMEFRAME = TICK_TIMEFRAME  # one row per tick
+
+Updater = Callable[[float, float, float, float], float]
+
+FEATURES: dict[str, type[Feature]] = {}
+
+
+def register(cls: type[Feature]) -> type[Feature]:
+    """Class decorator adding a feature to the registry under `cls.kind`."""
+
+    if cls.kind in FEATURES:
+        raise ValueError(f"feature kind {cls.kind!r} is already registered")
+    FEATURES[cls.kind] = cls
+    return cls
+
+
+def parse_feature(spec: str | Feature) -> Feature:
+    """`"ema_20"` -> `EMA(20)`; `Feature` instances pass through."""
+
+    if isinstance(spec, Feature):
+        return spec
+    kind, _, window = spec.partition("_")
+    cls = FEATURES.get(kind)
+    if cls is None:
+        raise ValueError(f"unknown feature {spec!r}, expected one of {sorted(FEATURES)}")
+    if not window:
+        return cls()
+    if not window.isdigit():
+        raise ValueError(f"invalid feature window in {spec!r}")
+    return cls(int(window))
+
+
+def _mid() -> pl.Expr:
+    return (pl.col("bid") + pl.col("ask")) / 2
+
+
+class Feature(ABC):
+    """Base class: `kind` is the registry key, `window` the optional parameter."""
+
+    kind: ClassVar[str]
+    windowed: ClassVar[bool] = True
+    min_window: ClassVar[int] = 1
+
+    def __init__(self, window: int | None = None):
+        if self.windowed:
+            if window is None or window < self.min_window:
+                raise ValueError(f"{self.kind} needs a window of at least {self.min_window}")
+        elif window is not None:
+            raise ValueError(f"{self.kind} takes no window")
+        self.window = window
+
+    @property
+    def name(self) -> str:
+        return self.kind if self.window is None else f"{self.kind}_{self.window}"
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+    @abstractmethod
+    def updater(self) -> Updater:
+        """Fresh O(1) streaming update: `(bid, ask, bid_volume, ask_volume) -> value`."""
+
+    @abstractmethod
+    def expr(self) -> pl.Expr:
+        """Polars expression computing the same values over a frame of ticks."""
+
+
+@register
+class EMA(Feature):
+    kind = "ema"
+
+    @property
+    def alpha(self) -> float:
+        assert self.window is not None
+        return 2.0 / (self.window + 1)
+
+    def updater(self) -> Updater:
+        return _EMAUpdater(self.alpha)
+
+    def expr(self) -> pl.Expr:
+        return _mid().ewm_mean(alpha=self.alpha, adjust=False)
+
+
+@register
+class Volatility(Feature):
+    kind = "vol"
+    min_window = 2
+
+    def updater(self) -> Updater:
+        assert self.window is not None
+        return _VolatilityUpdater(self.window)
+
+    def expr(self) -> pl.Expr:
+        assert self.window is not None
+        return (_mid() / _mid().shift(1)).log().rolling_std(self.window)
+
+
+@register
+class OrderFlowImbalance(Feature):
+    kind = "ofi"
+
+    def updater(self) -> Updater:
+        assert self.window is not None
+        return _OrderFlowUpdater(self.window)
+
+    def expr(self) -> pl.Expr:
+        assert self.window is not None
+        bid, ask = pl.col("bid"), pl.col("ask")
+        bid_volume, ask_volume = pl.col("bidVolume"), pl.col("askVolume")
+        prev_bid, prev_ask = bid.shift(1), ask.shift(1)
+        flow = (
+            pl.when(bid >= prev_bid).then(bid_volume).otherwise(0.0)
+            - pl.when(bid <= prev_bid).then(bid_volume.shift(1)).otherwise(0.0)
+            - pl.when(ask <= prev_ask).then(ask_volume).otherwise(0.0)
+            + pl.when(ask >= prev_ask).then(ask_volume.shift(1)).otherwise(0.0)
+        )
+        flow = pl.when(prev_bid.is_not_null()).then(flow)  # no flow before the first change
+        return flow.rolling_sum(self.window)
+
+
+@register
+class Microprice(Feature):
+    kind = "microprice"
+    windowed = False
+
+    def updater(self) -> Updater:
+        return _microprice
+
+    def expr(self) -> pl.Expr:
+        bid, ask = pl.col("bid"), pl.col("ask")
+        bid_volume, ask_volume = pl.col("bidVolume"), pl.col("askVolume")
+        total = bid_volume + ask_volume
+        return (
+            pl.when(total > 0).then((bid * ask_volume + ask * bid_volume) / total).otherwise(_mid())
+        )
+
+
+@register
+class ZScore(Feature):
+    kind = "zscore"
+    min_window = 2
+
+    def updater(self) -> Updater:
+        assert self.window is not None
+        return _ZScoreUpdater(self.window)
+
+    def expr(self) -> pl.Expr:
+        assert self.window is not None
+        std = _mid().rolling_std(self.window)
+        return pl.when(std > 0).then((_mid() - _mid().rolling_mean(self.window)) / std)
+
+
+# Streaming state lives in small callables rather than closures, so a
+# `FeatureStream` can be pickled with the model (processor checkpoints).
+
+
+class _EMAUpdater:
+    __slots__ = ("alpha", "ema")
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.ema = math.nan
+
+    def __call__(self, bid: float, ask: float, bid_volume: float, ask_volume: float) -> float:
+        mid = (bid + ask) / 2
+        ema = self.ema
+        self.ema = mid if ema != ema else (1 - self.alpha) * ema + self.alpha * mid
+        return self.ema
+
+
+class _VolatilityUpdater:
+    __slots__ = ("stats", "prev_mid")
+
+    def __init__(self, window: int):
+        self.stats = RollingMoments(window)
+        self.prev_mid = math.nan
+
+    def __call__(self, bid: float, ask: float, bid_volume: float, ask_volume: float) -> float:
+        mid = (bid + ask) / 2
+        stats, prev_mid = self.stats, self.prev_mid
+        if prev_mid == prev_mid:
+            stats.update(math.log(mid / prev_mid))
+        self.prev_mid = mid
+        return stats.std(ddof=1) if stats.full else math.nan
+
+
+class _OrderFlowUpdater:
+    __slots__ = ("size", "window", "total", "prev")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.window: deque[float] = deque()
+        self.total = 0.0
+        self.prev: tuple[float, float, float, float] | None = None
+
+    def __call__(self, bid: float, ask: float, bid_volume: float, ask_volume: float) -> float:
+        prev = self.prev
+        self.prev = (bid, ask, bid_volume, ask_volume)
+        if prev is None:
+            return math.nan
+        prev_bid, prev_ask, prev_bid_volume, prev_ask_volume = prev
+        flow = 0.0
+        if bid >= prev_bid:
+            flow += bid_volume
+        if bid <= prev_bid:
+            flow -= prev_bid_volume
+        if ask <= prev_ask:
+            flow -= ask_volume
+        if ask >= prev_ask:
+            flow += prev_ask_volume
+
+        window = self.window
+        self.total += flow
+        window.append(flow)
+        if len(window) > self.size:
+            self.total -= window.popleft()
+        return self.total if len(window) == self.size else math.nan
+
+
+def _microprice(bid: float, ask: float, bid_volume: float, ask_volume: float) -> float:
+    total = bid_volume + ask_volume
+    if total > 0:
+        return (bid * ask_volume + ask * bid_volume) / total
+    return (bid + ask) / 2
+
+
+class _ZScoreUpdater:
+    __slots__ = ("stats",)
+
+    def __init__(self, window: int):
+        self.stats = RollingMoments(window)
+
+    def __call__(self, bid: float, ask: float, bid_volume: float, ask_volume: float) -> float:
+        mid = (bid + ask) / 2
+        stats = self.stats
+        stats.update(mid)
+        if not stats.full:
+            return math.nan
+        std = stats.std(ddof=1)
+        return (mid - stats.mean) / std if std > 0 else math.nan
+
+
+class FeatureStream:
+    """Streaming state of a `FeatureSet` for one symbol."""
+
+    def __init__(self, names: list[str], updaters: list[Updater]):
+        self.names = names
+        self._updaters = updaters
+
+    def update(self, bid: float, ask: float, bid_volume: float, ask_volume: float) -> list[float]:
+        return [u(bid, ask, bid_volume, ask_volume) for u in self._updaters]
+
+    def values(self, record: dict) -> dict[str, float]:
+        """Feature values after *record*; NaN (not ready) values are left out."""
+
+        values = self.update(record["bid"], record["ask"], record["bidVolume"], record["askVolume"])
+        return {name: v for name, v in zip(self.names, values, strict=True) if v == v}
+
+
+class FeatureSet:
+    """An ordered set of features, e.g. `FeatureSet(["ema_20", "vol_100"])`."""
+
+    def __init__(self, specs: Iterable[str | Feature] = ()):
+        self.features = [parse_feature(spec) for spec in specs]
+        self.names = [f.name for f in self.features]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"duplicate features in {self.names}")
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    @property
+    def schema(self) -> pa.Schema:
+        return features_schema(self.names)
+
+    def stream(self) -> FeatureStream:
+        return FeatureStream(self.names, [f.updater() for f in self.features])
+
+    def frame(self, ticks: pa.Table | pl.DataFrame) -> pl.DataFrame:
+        """Features of every tick (`FEATURES_SCHEMA` columns), in the input row order.
+
+        Rows of a symbol must be in time order; symbols are computed independently.
+        """
+
+        frame = ticks if isinstance(ticks, pl.DataFrame) else pl.from_arrow(ticks)
+        assert isinstance(frame, pl.DataFrame)
+        over = "symbol" if "symbol" in frame.columns else None
+        columns = [
+            (f.expr().over(over) if over else f.expr()).cast(pl.Float64).alias(f.name)
+            for f in self.features
+        ]
+        keys = [c for c in ("symbol", "timestamp") if c in frame.columns]
+        return frame.select(*keys, *columns)
+
+
+def _part_files(directory: Path) -> list[Path]:
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if part_index(p) is not None)
+
+
+def backfill_features(
+    root: str | Path,
+    features: FeatureSet | Sequence[str],
+    *,
+    symbols: Iterable[str] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    include_today: bool = False,
+    overwrite: bool = False,
+) -> int:
+    """Write the features of recorded ticks under *root*; returns the rows written.
+
+    Each symbol's ticks in the date range are read in one pass, so stateful
+    features carry over day boundaries (they warm up at *start*). Days that
+    already hold feature files are skipped, or rebuilt with *overwrite*. The
+    current UTC day is skipped unless *include_today*.
+    """
+
+    feature_set = features if isinstance(features, FeatureSet) else FeatureSet(features)
+    writer = PartitionedDatasetWriter(root, FEATURES_DATASET, FEATURES_TIMEFRAME)
+    today = datetime.now(UTC).date()
+
+    by_symbol: dict[str, list[tuple[date, Path]]] = {}
+    for symbol_dir, day, tick_dir in iter_partition_dirs(
+        root, TICKS_DATASET, TICK_TIMEFRAME, symbols=symbols, start=start, end=end
+    ):
+        if day < today or include_today:
+            by_symbol.setdefault(symbol_dir, []).append((day, tick_dir))
+
+    written = 0
+    for symbol_dir, days in by_symbol.items():
+        targets = {
+            day: _part_files(
+                partition_dir(root, FEATURES_DATASET, FEATURES_TIMEFRAME, symbol_dir, day)
+            )
+            for day, _ in days
+        }
+        todo = {day for day, _ in days if overwrite or not targets[day]}
+        tick_files = [f for _, tick_dir in days for f in _part_files(tick_dir)]
+        if not todo or not tick_files:
+            continue
+
+        ticks = (
+            pl.scan_parquet(tick_files)
+            .select("symbol", "timestamp", "bid", "ask", "bidVolume", "askVolume")
+            .sort("timestamp", maintain_order=True)
+            .collect()
+        )
+        frame = feature_set.frame(ticks)
+        day_of = (pl.col("timestamp") // 86_400_000).cast(pl.Int32)
+        wanted = [(d - date(1970, 1, 1)).days for d in todo]
+        frame = frame.filter(day_of.is_in(wanted))
+        writer.write_table(frame.to_arrow().cast(feature_set.schema))
+        for day in todo:
+            for old in targets[day]:
+                old.unlink(missing_ok=True)
+        written += frame.height
+        logger.info(f"🧮 {symbol_dir}: {len(todo)} day(s) of {', '.join(feature_set.names)}")
+
+    return written
+
+
+def load_features(
+    root: str | Path,
+    *,
+    symbols: Iterable[str] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> pl.DataFrame | None:
+    """Persisted features (None if there are none), sorted by symbol and timestamp."""
+
+    files = list_partition_files(
+        root, FEATURES_DATASET, FEATURES_TIMEFRAME, symbols=symbols, start=start, end=end
+    )
+    if not files:
+        return None
+    frame = pl.concat([pl.read_parquet(f) for f in files], how="diagonal_relaxed")
+    return frame.sort("symbol", "timestamp", maintain_order=True)
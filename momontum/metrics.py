@@ -0,0 +1,407 @@
+"""Low-overhead metrics with a Prometheus text endpoint.
+
+- `Counter`, `Gauge` and `Histogram` (fixed buckets) are plain Python objects
+  with no locks: each series is updated from one thread (the event loop, or the
+  writer thread for flush metrics), and a scrape only reads them. An `inc` is
+  an attribute add; a histogram `observe` is one `bisect` plus two adds.
+- `CallbackGauge` / `CallbackCounter` are evaluated at scrape time, for values
+  that already exist elsewhere (buffer occupancy, queue depth) and should cost
+  nothing per tick.
+- `MetricsRegistry.render()` produces the Prometheus text format (0.0.4);
+  `MetricsServer` serves it at `GET /metrics` from the running event loop.
+- `ClockOffsetEstimator` tracks `local - exchange` time. Its sliding-window
+  minimum is the clock offset plus the smallest network delay; plotting it over
+  time (e.g. `deriv()` in PromQL) shows clock drift.
+- `measure_loop_lag` samples how late `asyncio.sleep` wakes up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+Labels = tuple[str, ...]
+
+# Exchange-to-local latency (ms)
+LATENCY_MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# Flush / loop lag durations (s)
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+class CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class GaugeValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate from the buckets, interpolating linearly (like `histogram_quantile`)."""
+
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.bounds):  # +Inf bucket: best we know is the top bound
+                    return self.bounds[-1] if self.bounds else math.nan
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.bounds[-1]
+
+
+ChildT = TypeVar("ChildT", CounterValue, GaugeValue, HistogramValue)
+ScalarT = TypeVar("ScalarT", CounterValue, GaugeValue)
+
+
+class _Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        """Yields `(sample name, formatted labels, value)`."""
+
+
+class _LabeledMetric(_Metric, Generic[ChildT]):
+    """Metric with one child value per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._children: dict[Labels, ChildT] = {}
+
+    @abstractmethod
+    def _new_child(self) -> ChildT: ...
+
+    def _child(self, values: Labels) -> ChildT:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {values}")
+            child = self._new_child()
+            self._children[values] = child
+        return child
+
+    def labels(self, *values: str) -> ChildT:
+        return self._child(values)
+
+
+class _ScalarMetric(_LabeledMetric[ScalarT]):
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for values, child in list(self._children.items()):
+            yield self.name, _format_labels(self.labelnames, values), child.value
+
+
+class Counter(_ScalarMetric[CounterValue]):
+    type = "counter"
+
+    def _new_child(self) -> CounterValue:
+        return CounterValue()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_ScalarMetric[GaugeValue]):
+    type = "gauge"
+
+    def _new_child(self) -> GaugeValue:
+        return GaugeValue()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class CallbackGauge(_Metric):
+    """Gauge computed at scrape time.
+
+    *fn* returns a single value (no labels) or a mapping of label values to values.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        fn: Callable[[], float | dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.fn = fn
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        result = self.fn()
+        items = result.items() if isinstance(result, dict) else [((), result)]
+        for values, value in items:
+            yield self.name, _format_labels(self.labelnames, values), value
+
+
+class CallbackCounter(CallbackGauge):
+    """Counter read at scrape time from a count kept elsewhere."""
+
+    type = "counter"
+
+
+class Histogram(_LabeledMetric[HistogramValue]):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Iterable[float] = SECONDS_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _new_child(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), list(child.counts), strict=True):
+                cumulative += count
+                labels = _format_labels((*self.labelnames, "le"), (*values, _format_value(bound)))
+                yield f"{self.name}_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, child.count
+
+
+class MetricsRegistry:
+    """Named collection of metrics, rendered in the Prometheus text format."""
+
+    def __init__(self, prefix: str = "momontum_"):
+        self.prefix = prefix
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        if not metric.labelnames and isinstance(metric, _LabeledMetric):
+            metric._child(())  # unlabeled series are exported from the start, as zero
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(self.prefix + name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(self.prefix + name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def callback_gauge(
+        self,
+        name: str,
+        documentation: str,
+        fn: Callable[[], float | dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+    ) -> CallbackGauge:
+        metric = CallbackGauge(self.prefix + name, documentation, fn, labelnames)
+        self.register(metric)
+        return metric
+
+    def callback_counter(
+        self,
+        name: str,
+        documentation: str,
+        fn: Callable[[], float | dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+    ) -> CallbackCounter:
+        metric = CallbackCounter(self.prefix + name, documentation, fn, labelnames)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Iterable[float] = SECONDS_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(self.prefix + name, documentation, labelnames, buckets=buckets)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            try:
+                for name, labels, value in metric.samples():
+                    lines.append(f"{name}{labels} {_format_value(value)}")
+            except Exception as e:  # a failing callback must not break the scrape
+                logger.error(f"📈 metric {metric.name} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+class ClockOffsetEstimator:
+    """Sliding-window minimum of `local - exchange` time, in milliseconds."""
+
+    def __init__(self, window_seconds: float = 60.0):
+        self.window_seconds = window_seconds
+        self.last_delay_ms = math.nan
+        # (local seconds, delay ms), delays strictly increasing front to back
+        self._window: deque[tuple[float, float]] = deque()
+
+    def update(self, exchange_ms: float, local_seconds: float) -> float:
+        """Add one sample; returns its delay (`local - exchange`, ms)."""
+
+        delay = local_seconds * 1000.0 - exchange_ms
+        window = self._window
+        while window and window[-1][1] >= delay:
+            window.pop()
+        window.append((local_seconds, delay))
+        horizon = local_seconds - self.window_seconds
+        while window[0][0] < horizon:
+            window.popleft()
+        self.last_delay_ms = delay
+        return delay
+
+    @property
+    def offset_ms(self) -> float:
+        """Smallest delay in the window (clock offset + minimum network delay)."""
+
+        return self._window[0][1] if self._window else math.nan
+
+
+async def measure_loop_lag(
+    histogram: Histogram | HistogramValue,
+    *,
+    interval: float = 0.5,
+    is_running: Callable[[], bool] = lambda: True,
+) -> None:
+    """Observe how late each `asyncio.sleep(interval)` wakes up (event loop lag)."""
+
+    loop = asyncio.get_running_loop()
+    while is_running():
+        started = loop.time()
+        await asyncio.sleep(interval)
+        histogram.observe(max(0.0, loop.time() - started - interval))
+
+
+class MetricsServer:
+    """Minimal asyncio HTTP server exposing `GET /metrics`."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: asyncio.base_events.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"📈 Metrics on http://{self.host}:{self.port}/metrics")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            while (await asyncio.wait_for(reader.readline(), timeout=5.0)) not in (
+                b"\r\n",
+                b"\n",
+                b"",
+            ):
+                pass
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.registry.render().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status, body, content_type = "404 Not Found", b"not found\n", "text/plain"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except (TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
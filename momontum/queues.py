@@ -0,0 +1,75 @@
+"""Per-symbol hand-off between ingestion and processing.
+
+The harvester records every order book update, then hands it to a separate
+processing task (features, model, strategy, orders) through one
+`ConflatingQueue` per symbol, so a slow model update or order call never holds
+up the next `watch_order_book`.
+
+- policy `"none"`: every update is processed, in order. The queue is bounded;
+  when processing falls `maxsize` updates behind, `put` waits, which slows
+  ingestion instead of growing memory without limit.
+- policy `"latest"`: at most one update is pending. A newer update replaces a
+  pending one (the stale book is never processed) and `skipped` counts the
+  replaced updates. `put` never waits.
+
+Only processing is conflated; recording happens before `put` and stays lossless.
+
+Queues can share a `ready` event, set on every `put`, so one consumer can
+serve a whole basket: wait for the event, then `get_nowait` from the non-empty
+queues.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Generic, TypeVar
+
+CONFLATE_NONE = "none"
+CONFLATE_LATEST = "latest"
+CONFLATION_POLICIES = (CONFLATE_NONE, CONFLATE_LATEST)
+
+T = TypeVar("T")
+
+
+class ConflatingQueue(Generic[T]):
+    """Single-consumer asyncio queue with an optional latest-wins policy."""
+
+    def __init__(
+        self,
+        policy: str = CONFLATE_NONE,
+        maxsize: int = 10_000,
+        ready: asyncio.Event | None = None,
+    ):
+        if policy not in CONFLATION_POLICIES:
+            raise ValueError(
+                f"unknown conflation policy {policy!r}, expected one of {CONFLATION_POLICIES}"
+            )
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+
+        self.policy = policy
+        self.conflate = policy == CONFLATE_LATEST
+        self._queue: asyncio.Queue[T] = asyncio.Queue(maxsize=1 if self.conflate else maxsize)
+        self.skipped = 0
+        self.ready = ready
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    async def put(self, item: T) -> None:
+        if self.conflate:
+            if self._queue.full():
+                self._queue.get_nowait()  # superseded before it was processed
+                self.skipped += 1
+            self._queue.put_nowait(item)
+        else:
+            await self._queue.put(item)
+        if self.ready is not None:
+            self.ready.set()
+
+    async def get(self) -> T:
+        return await self._queue.get()
+
+    def get_nowait(self) -> T:
+        """Oldest pending item; raises `asyncio.QueueEmpty` if there is none."""
+        return self._queue.get_nowait()
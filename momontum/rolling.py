@@ -0,0 +1,217 @@
+"""O(1) rolling statistics over a fixed window.
+
+`RollingMoments` keeps the last *window* values in a ring buffer (a
+preallocated list, no per-tick allocation) together with the sum and sum of
+squares of their deviations from an anchor:
+
+- Each update adds the new value and removes the one it overwrites: O(1)
+  however large the window.
+- Sums of squares cancel badly when the values are far from zero (prices)
+  or drift. Deviations are taken from an anchor near the window mean, and the
+  anchor and sums are recomputed exactly (`math.fsum`) once every *window*
+  updates, so rounding error never accumulates over more than two windows.
+  The recompute is O(window) once per window: O(1) amortized.
+- A variance below the rounding noise of the sums is reported as 0, so a
+  constant window has exactly zero deviation.
+- A NaN makes the statistics NaN while it is in the window, like `np.mean`
+  over the window would.
+
+`update_many` runs the same recursion over an array: the same floating point
+operations in the same order, so its statistics and final state are identical
+(bit for bit) to calling `update` value by value, however the values are
+split across calls. Between two re-anchors the sums are running sums, computed
+with one `np.cumsum` per re-anchor period (a row of a 2-D array).
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+_EPS = 4 * 2.0**-52  # relative rounding noise of sum of squares - sum**2 / n
+
+
+class RollingMoments:
+    """Mean, variance and standard deviation of the last *window* values."""
+
+    __slots__ = ("window", "count", "_values", "_next", "_anchor", "_sum", "_sumsq", "_age")
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.count = 0
+        self._values = [0.0] * window
+        self._next = 0  # ring buffer slot of the next value (the oldest once full)
+        self._anchor = 0.0
+        self._sum = 0.0  # sum of (x - anchor)
+        self._sumsq = 0.0  # sum of (x - anchor) ** 2
+        self._age = 0  # updates since the last re-anchor
+
+    def update(self, x: float) -> None:
+        slot = self._next
+        if self.count == self.window:
+            old = self._values[slot] - self._anchor
+            if old != old:
+                self._age = self.window  # a NaN leaves: the sums are NaN until recomputed
+            self._sum -= old
+            self._sumsq -= old * old
+        else:
+            if not self.count and x == x:
+                self._anchor = x
+            self.count += 1
+        self._values[slot] = x
+        d = x - self._anchor
+        self._sum += d
+        self._sumsq += d * d
+        self._next = slot + 1 if slot + 1 < self.window else 0
+
+        self._age += 1
+        if self._age >= self.window:
+            self._reanchor()
+
+    def _reanchor(self) -> None:
+        values = self._values if self.count == self.window else self._values[: self.count]
+        self._anchor, self._sum, self._sumsq = _anchored_sums(values)
+        self._age = 0
+
+    def update_many(self, values) -> tuple[np.ndarray, np.ndarray]:
+        """`update` with each of *values* in turn.
+
+        Returns `mean` and `variance()` after each update. While a non-finite
+        value is in the window, values are updated one at a time.
+        """
+
+        xs = np.asarray(values, dtype=np.float64)
+        n = len(xs)
+        means, variances = np.empty(n), np.empty(n)
+        bad = np.flatnonzero(~np.isfinite(xs))
+        i = 0
+        retry = 0  # next position worth checking the window again
+        while i < n:
+            if i >= retry and self._finite():
+                # Vectorized up to the next non-finite value
+                stop = n
+                k = np.searchsorted(bad, i)
+                if k < len(bad):
+                    stop = int(bad[k])
+                if stop > i:
+                    means[i:stop], variances[i:stop] = self._update_finite(xs[i:stop])
+                    i = stop
+                    continue
+            # NaN leaving the window re-anchors early: one value at a time until it left
+            if i >= retry:
+                retry = i + self.window + 1
+            self.update(float(xs[i]))
+            means[i], variances[i] = self.mean, self.variance()
+            i += 1
+        return means, variances
+
+    def _window(self) -> list[float]:
+        """Values in the window, oldest first."""
+
+        values = self._values
+        return values[self._next :] + values[: self._next] if self.full else values[: self.count]
+
+    def _finite(self) -> bool:
+        return self._age <= self.count and all(math.isfinite(v) for v in self._window())
+
+    def _update_finite(self, xs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # `update_many` of finite values with a finite window
+        n, w = len(xs), self.window
+        if not self.count:
+            self._anchor = float(xs[0])
+        c0, age0 = self.count, self._age
+        history = np.concatenate([self._window(), xs])  # current window, then xs
+
+        # Update i is at position age0 + i of the re-anchor periods: row `period`,
+        # column `pos % w` of a (periods, w) grid. It re-anchors at the last column.
+        rows = np.arange(n)
+        count = np.minimum(c0 + rows + 1, w)  # after each update
+        periods = (age0 + n - 1) // w + 1
+        reanchors = np.arange(w - age0 - 1, n, w)
+        period = (rows + age0) // w
+
+        # `_anchored_sums` of every re-anchored window (all full and finite)
+        windows = np.empty((0, w))
+        if len(reanchors):
+            starts = c0 + reanchors + 1 - w
+            windows = np.lib.stride_tricks.sliding_window_view(history, w)[starts]
+        window_anchors = _fsum_rows(windows) / w
+        deviations = windows - window_anchors[:, None]
+        anchors = np.r_[self._anchor, window_anchors]
+        sums = np.r_[self._sum, _fsum_rows(deviations)]
+        sumsqs = np.r_[self._sumsq, _fsum_rows(deviations * deviations)]
+
+        anchor_of = anchors[period]
+        added = xs - anchor_of
+        leaving = np.zeros(n)  # window value each update removes (0 until full)
+        first = min(max(w - c0, 0), n)
+        leaving[first:] = history[c0 + first - w : c0 + n - w] - anchor_of[first:]
+
+        def running(start: np.ndarray, removed: np.ndarray, add: np.ndarray) -> np.ndarray:
+            # Per period: start value, then (-removed, +added) per update as `update` applies them
+            pairs = np.zeros((periods * w, 2))
+            pairs[age0 : age0 + n, 0] = -removed
+            pairs[age0 : age0 + n, 1] = add
+            steps = np.hstack([start[:periods, None], pairs.reshape(periods, 2 * w)])
+            return np.cumsum(steps, axis=1)[:, 2::2].reshape(-1)[age0 : age0 + n]
+
+        total = running(sums, leaving, added)
+        total_sq = running(sumsqs, leaving * leaving, added * added)
+        # A re-anchoring update reports the recomputed sums
+        anchor_of[reanchors] = anchors[1:]
+        total[reanchors] = sums[1:]
+        total_sq[reanchors] = sumsqs[1:]
+        means = anchor_of + total / count
+        m2 = total_sq - total * total / count
+        variances = np.where(m2 <= _EPS * total_sq, 0.0, m2 / count)
+
+        self.count = int(count[-1])
+        self._anchor = float(anchor_of[-1])
+        self._sum, self._sumsq = float(total[-1]), float(total_sq[-1])
+        self._age = (age0 + n) % w
+        tail = history[len(history) - self.count :].tolist()
+        self._values = tail + [0.0] * (w - self.count)
+        self._next = self.count % w
+        return means, variances
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.window
+
+    @property
+    def mean(self) -> float:
+        return self._anchor + self._sum / self.count if self.count else math.nan
+
+    def variance(self, ddof: int = 0) -> float:
+        """Population variance by default (like `np.var`); NaN below `ddof + 1` values."""
+
+        n = self.count
+        if n <= ddof:
+            return math.nan
+        m2 = self._sumsq - self._sum * self._sum / n
+        if m2 <= _EPS * self._sumsq:
+            return 0.0
+        return m2 / (n - ddof)
+
+    def std(self, ddof: int = 0) -> float:
+        return math.sqrt(self.variance(ddof))
+
+
+def _fsum_rows(matrix: np.ndarray) -> np.ndarray:
+    """`math.fsum` of each row (up to two columns, one correctly rounded addition is the same)."""
+
+    if matrix.shape[1] <= 2:
+        return matrix.sum(axis=1)
+    return np.array([math.fsum(row) for row in matrix.tolist()], dtype=np.float64)
+
+
+def _anchored_sums(values: list[float]) -> tuple[float, float, float]:
+    """Anchor (mean of the finite values) and exact sums of deviations and squared deviations."""
+
+    finite = [v for v in values if v == v]
+    anchor = math.fsum(finite) / len(finite) if finite else 0.0
+    deviations = [v - anchor for v in values]
+    return anchor, math.fsum(deviations), math.fsum(d * d for d in deviations)
@@ -28,6 +28,21 @@ TICKS_SCHEMA_V1 = pa.schema(
 )
 
 
+TRADES_SCHEMA_V1 = pa.schema(
+    [
+        ("symbol", pa.string()),
+        ("timestamp", pa.int64()),  # exchange ts (ms)
+        ("datetime", pa.string()),  # exchange ISO8601 (string, as provided)
+        ("id", pa.string()),  # exchange trade id
+        ("side", pa.string()),  # taker side: buy | sell
+        ("price", pa.float64()),
+        ("amount", pa.float64()),  # base currency
+        ("cost", pa.float64()),  # quote currency (price * amount)
+        ("local_timestamp", pa.float64()),  # local time seconds (float)
+    ]
+)
+
+
 CANDLES_SCHEMA_V1 = pa.schema(
     [
         ("symbol", pa.string()),
@@ -41,3 +56,57 @@ CANDLES_SCHEMA_V1 = pa.schema(
         ("n_ticks", pa.int64()),
     ]
 )
+
+
+def depth_schema(levels: int) -> pa.Schema:
+    """L2 snapshots: the top *levels* of each side as fixed-size float arrays.
+
+    Level 0 is the best price; missing levels are NaN.
+    """
+
+    level_array = pa.list_(pa.float64(), levels)
+    return pa.schema(
+        [
+            ("symbol", pa.string()),
+            ("timestamp", pa.int64()),  # exchange ts (ms)
+            ("local_timestamp", pa.float64()),  # local time seconds (float)
+            ("bid_px", level_array),
+            ("bid_qty", level_array),
+            ("ask_px", level_array),
+            ("ask_qty", level_array),
+        ]
+    )
+
+
+# Diff-encoded L2: each row holds only the levels that changed since the
+# previous row of the same symbol; `keyframe` rows hold every level and reset
+# the decoder state (see momontum.data.depth.decode_depth_diffs).
+DEPTH_DIFF_SCHEMA_V1 = pa.schema(
+    [
+        ("symbol", pa.string()),
+        ("timestamp", pa.int64()),
+        ("local_timestamp", pa.float64()),
+        ("keyframe", pa.bool_()),
+        ("bid_level", pa.list_(pa.int16())),
+        ("bid_px", pa.list_(pa.float64())),
+        ("bid_qty", pa.list_(pa.float64())),
+        ("ask_level", pa.list_(pa.int16())),
+        ("ask_px", pa.list_(pa.float64())),
+        ("ask_qty", pa.list_(pa.float64())),
+    ]
+)
+
+
+def features_schema(names: list[str]) -> pa.Schema:
+    """Per-tick features: one float column per feature, null until it is defined.
+
+    Column names are feature specs such as `ema_20` (see momontum.features).
+    """
+
+    return pa.schema(
+        [
+            ("symbol", pa.string()),
+            ("timestamp", pa.int64()),  # exchange ts (ms) of the tick
+            *((name, pa.float64()) for name in names),
+        ]
+    )
@@ -1,9 +1,36 @@
 import logging
+from typing import Any
 
+import numpy as np
+import pyarrow as pa
 from river import compose, linear_model, metrics, optim, preprocessing
 
+import config
+from momontum.data.depth import depth_imbalance
+from momontum.features import FeatureSet
+from momontum.online import BasketLinearRegression, OnlineLinearRegression
+
 logger = logging.getLogger(__name__)
 
+# Model engines: River's dict pipeline, or the same model on float vectors
+ENGINE_RIVER = "river"
+ENGINE_NUMPY = "numpy"
+ENGINES = (ENGINE_RIVER, ENGINE_NUMPY)
+
+LEARNING_RATE = 0.01
+
+
+def _column(columns, name):
+    values = columns[name]
+    if isinstance(values, pa.ChunkedArray):
+        values = values.to_numpy()  # nulls become NaN
+    return np.asarray(values, dtype=np.float64)
+
+
+def _feature_names(depth_levels, feature_set):
+    names = ["spread", "imbalance"] + (["depth_imbalance"] if depth_levels else [])
+    return names + feature_set.names
+
 
 class DataProcessor:
     """
@@ -11,20 +38,36 @@ class DataProcessor:
     Uses Online ML to process market data features and predict future price movement.
     """
 
-    def __init__(self):
+    def __init__(self, depth_levels: int = 0, engine: str | None = None, features=None):
+        # Levels used for the depth imbalance feature (0 = L1 features only)
+        self.depth_levels = depth_levels
+        self.engine = config.PROCESSOR_ENGINE if engine is None else engine
+        if self.engine not in ENGINES:
+            raise ValueError(f"unknown processor engine {self.engine!r}, expected one of {ENGINES}")
+        # Extra registry features (momontum.features specs such as "ema_20")
+        self.feature_set = FeatureSet(config.MODEL_FEATURES if features is None else features)
+        self.feature_stream = self.feature_set.stream()
+        # Feature order of the numpy engine's vectors
+        self.feature_names = _feature_names(depth_levels, self.feature_set)
+
         # 1. Price Smoother (Kalman Filter would be here, but using simple EMA for now or River's stats)
         # using river.stats.Mean or similar for simple smoothing if needed.
 
         # 2. Prediction Model: Predict next log-return based on features
         # Pipeline: Scaler -> Linear Regression
-        self.model = compose.Pipeline(
-            preprocessing.StandardScaler(),
-            linear_model.LinearRegression(optimizer=optim.SGD(lr=0.01)),
-        )
+        self.model: Any
+        if self.engine == ENGINE_RIVER:
+            self.model = compose.Pipeline(
+                preprocessing.StandardScaler(),
+                linear_model.LinearRegression(optimizer=optim.SGD(lr=LEARNING_RATE)),
+            )
+        else:
+            self.model = OnlineLinearRegression(len(self.feature_names), lr=LEARNING_RATE)
 
         self.prev_record = None
-        self.prev_features = None
-        self.prev_mid_price = None
+        self.prev_features: dict[str, Any] | None = None
+        self.prev_x: Any = None  # model input of the previous tick
+        self.prev_mid_price: float | None = None
 
         # Metrics
         self.mae = metrics.MAE()
@@ -45,10 +88,23 @@ class DataProcessor:
         volume_total = bid_vol + ask_vol
         imbalance = (bid_vol - ask_vol) / volume_total if volume_total > 0 else 0
 
-        return {
+        features = {
             "spread": spread,
             "imbalance": imbalance,
-        }, mid_price
+        }
+
+        # Feature 2 (optional): Depth Imbalance over the top N levels,
+        # nearer levels weighted more. Needs the full book sides in the record.
+        if self.depth_levels and record.get("bids") is not None:
+            features["depth_imbalance"] = depth_imbalance(
+                record["bids"], record["asks"], self.depth_levels
+            )
+
+        # Registry features, once warmed up
+        if self.feature_set:
+            features.update(self.feature_stream.values(record))
+
+        return features, mid_price
 
     def process(self, record):
         """
@@ -58,6 +114,8 @@ class DataProcessor:
         3. Predict Y_{t+1} using X_t
         """
         features, mid_price = self.calculate_features(record)
+        # Model input: the dict itself for River, a fixed-order vector for numpy
+        x = features if self.engine == ENGINE_RIVER else self._vector(features)
 
         prediction = None
 
@@ -69,14 +127,14 @@ class DataProcessor:
 
             # LEARN: Update model with (X_{t-1}, true_Y)
             # We predicted change for this moment using previous features
-            self.model.learn_one(self.prev_features, price_change_actual)
+            self.model.learn_one(self.prev_x, price_change_actual)
 
             # Monitor performance
             # We would need to store the prediction made at T-1 to update MAE
             # But here we just update model.
 
             # PREDICT: Predict NEXT price change using CURRENT features
-            predicted_change = self.model.predict_one(features)
+            predicted_change = self.model.predict_one(x)
             predicted_price = mid_price + predicted_change
 
             prediction = {
@@ -89,6 +147,256 @@ class DataProcessor:
 
         # Store for next tick
         self.prev_features = features
+        self.prev_x = x
         self.prev_mid_price = mid_price
 
         return prediction
+
+    def _vector(self, features):
+        return [features.get(name) for name in self.feature_names]
+
+    def get_state(self):
+        """Everything learned so far (model, previous tick, feature streams), for checkpoints."""
+        return {
+            "engine": self.engine,
+            "feature_names": self.feature_names,
+            "model": self.model,
+            "prev_features": self.prev_features,
+            "prev_x": self.prev_x,
+            "prev_mid_price": self.prev_mid_price,
+            "feature_stream": self.feature_stream,
+            "mae": self.mae,
+        }
+
+    def set_state(self, state):
+        """Continue from a `get_state` snapshot of a processor with the same engine and features."""
+        if state["engine"] != self.engine or state["feature_names"] != self.feature_names:
+            raise ValueError(
+                f"state of a {state['engine']} processor with features {state['feature_names']} "
+                f"does not fit {self.engine} with {self.feature_names}"
+            )
+        self.model = state["model"]
+        self.prev_features = state["prev_features"]
+        self.prev_x = state["prev_x"]
+        self.prev_mid_price = state["prev_mid_price"]
+        self.feature_stream = state["feature_stream"]
+        self.mae = state["mae"]
+
+    def process_batch(self, columns):
+        """
+        Runs `process` over whole columns (a Polars DataFrame, Arrow table or dict of
+        arrays with bid, ask, bidVolume, askVolume and spread), continuing from the
+        current state.
+        Registry features already present as columns (e.g. from
+        `momontum.features.load_features`) are used as they are and do not advance
+        the streaming feature state; otherwise they are computed from the rows.
+        Returns a dict of arrays: mid_price, predicted_change and predicted_price
+        (NaN where `process` returns None) plus one array per feature.
+        Only L1 features: depth imbalance needs the book sides of each record.
+        """
+        if self.depth_levels:
+            raise ValueError("process_batch computes L1 features only; use depth_levels=0")
+
+        bid, ask, bid_vol, ask_vol, spread = (
+            _column(columns, name) for name in ("bid", "ask", "bidVolume", "askVolume", "spread")
+        )
+        mid_price = (bid + ask) / 2
+        volume_total = bid_vol + ask_vol
+        with np.errstate(divide="ignore", invalid="ignore"):
+            imbalance = np.where(volume_total > 0, (bid_vol - ask_vol) / volume_total, 0.0)
+        extra = {}
+        if self.feature_set:
+            present = columns.column_names if isinstance(columns, pa.Table) else columns
+            if all(name in present for name in self.feature_set.names):
+                extra = {name: _column(columns, name) for name in self.feature_set.names}
+            else:
+                update = self.feature_stream.update
+                rows = [
+                    update(*quote)
+                    for quote in zip(
+                        bid.tolist(), ask.tolist(), bid_vol.tolist(), ask_vol.tolist(), strict=True
+                    )
+                ]
+                values = np.array(rows, dtype=np.float64).reshape(len(bid), -1)
+                extra = dict(zip(self.feature_set.names, values.T, strict=True))
+        features = np.column_stack([spread, imbalance, *extra.values()])
+
+        n = len(mid_price)
+        predicted_change = np.full(n, np.nan)
+        if n:
+            if self.engine == ENGINE_NUMPY:
+                self._learn_predict_many(features, mid_price, predicted_change)
+            else:
+                for i, (row, price) in enumerate(
+                    zip(features.tolist(), mid_price.tolist(), strict=True)
+                ):
+                    # NaN: registry feature still warming up, left out like in `process`
+                    x = {k: v for k, v in zip(self.feature_names, row, strict=True) if v == v}
+                    if self.prev_x is not None and self.prev_mid_price is not None:
+                        self.model.learn_one(self.prev_x, price - self.prev_mid_price)
+                        predicted_change[i] = self.model.predict_one(x)
+                    self.prev_features = self.prev_x = x
+                    self.prev_mid_price = price
+
+        return {
+            "mid_price": mid_price,
+            "predicted_change": predicted_change,
+            "predicted_price": mid_price + predicted_change,
+            "spread": spread,
+            "imbalance": imbalance,
+            **extra,
+        }
+
+    def _learn_predict_many(self, features, mid_price, out):
+        # Row i learns (X_{i-1}, mid_i - mid_{i-1}) and predicts from X_i, as in `process`
+        if self.prev_x is not None and self.prev_mid_price is not None:
+            prev = np.array([self.prev_x], dtype=np.float64)
+            x_learn = np.concatenate([prev, features[:-1]])
+            targets = np.diff(mid_price, prepend=self.prev_mid_price)
+            out[:] = self.model.learn_predict_many(x_learn, targets, features)
+        elif len(mid_price) > 1:
+            out[1:] = self.model.learn_predict_many(features[:-1], np.diff(mid_price), features[1:])
+        self.prev_x = features[-1].tolist()
+        self.prev_features = dict(zip(self.feature_names, self.prev_x, strict=True))
+        self.prev_mid_price = float(mid_price[-1])
+
+
+class BasketProcessor:
+    """
+    DataProcessor for a whole basket, with every symbol's state as rows of shared arrays
+    (scaler statistics, weights, previous features and mid price).
+    `process_many` handles the updates of all symbols that ticked in one vectorized
+    step, so the cost per update falls as the basket grows.
+    Predictions match one numpy-engine DataProcessor per symbol.
+    """
+
+    def __init__(self, symbols, depth_levels: int = 0, features=None):
+        self.symbols = list(symbols)
+        self.rows = {s: i for i, s in enumerate(self.symbols)}
+        self.depth_levels = depth_levels
+        self.feature_set = FeatureSet(config.MODEL_FEATURES if features is None else features)
+        self.feature_streams = [self.feature_set.stream() for _ in self.symbols]
+        self.feature_names = _feature_names(depth_levels, self.feature_set)
+
+        n, k = len(self.symbols), len(self.feature_names)
+        self.model = BasketLinearRegression(n, k, lr=LEARNING_RATE)
+        self.prev_x = np.full((n, k), np.nan)
+        self.prev_mid_price = np.full(n, np.nan)  # NaN: no update seen yet
+
+    def process(self, symbol, record):
+        return self.process_many([(symbol, record)])[0]
+
+    def get_state(self, symbol):
+        """Everything learned so far for *symbol* (its model row, previous update and
+        feature streams), for checkpoints."""
+        row = self.rows[symbol]
+        return {
+            "feature_names": self.feature_names,
+            "model_state": self.model.state[row].copy(),
+            "intercept": float(self.model.intercepts[row]),
+            "prev_x": self.prev_x[row].copy(),
+            "prev_mid_price": float(self.prev_mid_price[row]),
+            "feature_stream": self.feature_streams[row],
+        }
+
+    def set_state(self, symbol, state):
+        """Continue *symbol* from a `get_state` snapshot taken with the same features."""
+        if state["feature_names"] != self.feature_names:
+            raise ValueError(
+                f"state with features {state['feature_names']} does not fit {self.feature_names}"
+            )
+        row = self.rows[symbol]
+        self.model.state[row] = state["model_state"]
+        self.model.intercepts[row] = state["intercept"]
+        self.prev_x[row] = state["prev_x"]
+        self.prev_mid_price[row] = state["prev_mid_price"]
+        self.feature_streams[row] = state["feature_stream"]
+
+    def process_many(self, updates):
+        """
+        Processes (symbol, record) pairs as `DataProcessor.process` would, in order.
+        Returns one prediction (or None) per pair.
+        """
+        predictions = [None] * len(updates)
+        if len({symbol for symbol, _ in updates}) == len(updates):
+            self._step(updates, range(len(updates)), predictions)
+            return predictions
+        pending = list(range(len(updates)))
+        while pending:
+            # One vectorized step takes each symbol once; repeats wait for the next one
+            step: list[int] = []
+            rest: list[int] = []
+            seen = set()
+            for i in pending:
+                symbol = updates[i][0]
+                (rest if symbol in seen else step).append(i)
+                seen.add(symbol)
+            self._step(updates, step, predictions)
+            pending = rest
+        return predictions
+
+    def _step(self, updates, indices, predictions):
+        rows = np.array([self.rows[updates[i][0]] for i in indices])
+        records = [updates[i][1] for i in indices]
+        bid, ask, bid_vol, ask_vol, spread = np.array(
+            [(r["bid"], r["ask"], r["bidVolume"], r["askVolume"], r["spread"]) for r in records],
+            dtype=np.float64,
+        ).T
+        mid_price = (bid + ask) / 2
+        volume_total = bid_vol + ask_vol
+        imbalance = np.divide(
+            bid_vol - ask_vol, volume_total, out=np.zeros_like(bid), where=volume_total > 0
+        )
+        columns = [spread, imbalance]
+        if self.depth_levels:
+            columns.append(
+                np.array(
+                    [
+                        np.nan
+                        if r.get("bids") is None
+                        else depth_imbalance(r["bids"], r["asks"], self.depth_levels)
+                        for r in records
+                    ]
+                )
+            )
+        if self.feature_set:
+            streams = self.feature_streams
+            values = [
+                streams[row].update(r["bid"], r["ask"], r["bidVolume"], r["askVolume"])
+                for row, r in zip(rows.tolist(), records, strict=True)
+            ]
+            columns.extend(np.array(values, dtype=np.float64).reshape(len(records), -1).T)
+        x = np.column_stack(columns)
+
+        prev_mid_price = self.prev_mid_price[rows]
+        ready = prev_mid_price == prev_mid_price  # NaN: first update of the symbol
+        positions = np.flatnonzero(ready)
+        if len(positions):
+            if len(positions) < len(rows):
+                learn_rows, prev_mid_price = rows[positions], prev_mid_price[positions]
+                x_ready, mid_ready = x[positions], mid_price[positions]
+            else:
+                learn_rows, x_ready, mid_ready = rows, x, mid_price
+            changes = mid_ready - prev_mid_price
+            predicted = self.model.learn_predict(
+                learn_rows, self.prev_x[learn_rows], changes, x_ready
+            )
+            for j, change, price, row in zip(
+                positions.tolist(),
+                predicted.tolist(),
+                (mid_ready + predicted).tolist(),
+                x_ready.tolist(),
+                strict=True,
+            ):
+                predictions[indices[j]] = {
+                    "predicted_price": price,
+                    "predicted_change": change,
+                    "features": {
+                        name: value
+                        for name, value in zip(self.feature_names, row, strict=True)
+                        if value == value
+                    },
+                }
+
+        self.prev_x[rows] = x
+        self.prev_mid_price[rows] = mid_price
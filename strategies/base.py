@@ -1,8 +1,13 @@
+import copy
 import logging
 from abc import ABC, abstractmethod
 from collections.abc import Mapping
 from typing import Any
 
+import numpy as np
+import polars as pl
+import pyarrow as pa
+
 
 class Signal:
     BUY = "BUY"
@@ -10,6 +15,65 @@ class Signal:
     HOLD = "HOLD"
 
 
+# Compact signal codes of `generate_signals` (one int8 per row)
+SIGNAL_HOLD = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+SIGNAL_CODES = {Signal.HOLD: SIGNAL_HOLD, Signal.BUY: SIGNAL_BUY, Signal.SELL: SIGNAL_SELL}
+
+
+def to_frame(ticks: pl.DataFrame | pa.Table) -> pl.DataFrame:
+    """Polars view of a tick frame (Arrow tables are converted without copying)."""
+    if isinstance(ticks, pa.Table):
+        converted = pl.from_arrow(ticks)
+        assert isinstance(converted, pl.DataFrame)
+        return converted
+    return ticks
+
+
+def float_column(frame: pl.DataFrame, name: str) -> np.ndarray:
+    """*name* as a float64 array, nulls as NaN."""
+    return frame[name].cast(pl.Float64).fill_null(np.nan).to_numpy()
+
+
+class SignalStream:
+    """
+    `generate_signals` over consecutive batches of one symbol's ticks.
+
+    State at the end of a batch carries into the next, so any split of the ticks
+    into batches gives the same signals as one call over all of them. This
+    default runs `on_tick` row by row on a private copy of the strategy.
+    """
+
+    def __init__(self, strategy: "BaseStrategy"):
+        self.strategy = copy.deepcopy(strategy)
+
+    def update(self, ticks: pl.DataFrame | pa.Table) -> np.ndarray:
+        frame = to_frame(ticks)
+        has_predictions = "predicted_change" in frame.columns
+        signals = np.zeros(frame.height, dtype=np.int8)
+        for i, record in enumerate(frame.iter_rows(named=True)):
+            prediction = None
+            change = record.get("predicted_change") if has_predictions else None
+            if change is not None and change == change:
+                prediction = {
+                    "predicted_price": record["predicted_price"],
+                    "predicted_change": change,
+                }
+            signals[i] = SIGNAL_CODES[self.strategy.on_tick(record, prediction)]
+        return signals
+
+
+class RowSignalStream(SignalStream):
+    """For strategies whose vectorized signals only depend on each row: nothing to carry."""
+
+    def __init__(self, strategy: "BaseStrategy"):
+        self.strategy = strategy
+
+    def update(self, ticks: pl.DataFrame | pa.Table) -> np.ndarray:
+        return self.strategy.generate_signals(ticks)
+
+
 class BaseStrategy(ABC):
     """
     Abstract Base Class for all trading strategies.
@@ -35,3 +99,28 @@ class BaseStrategy(ABC):
             str: Signal.BUY, Signal.SELL, or Signal.HOLD
         """
         pass
+
+    def generate_signals(self, ticks: pl.DataFrame | pa.Table) -> np.ndarray:
+        """
+        Signals for every row of a tick frame, as an int8 array of SIGNAL_CODES values.
+
+        Args:
+            ticks: Polars DataFrame or Arrow table of one symbol's ticks in time order,
+                plus the processor's `predicted_price` / `predicted_change` columns
+                (null or NaN where there is no prediction) for strategies that use them.
+
+        Returns the same signals as `on_tick` over the rows on a fresh copy of this
+        strategy; the strategy's own state is left alone. Strategies override this
+        (or `signal_stream`) with a vectorized version; this default runs the
+        strategy's `signal_stream` over the whole frame.
+        """
+        return self.signal_stream().update(ticks)
+
+    def signal_stream(self) -> SignalStream:
+        """
+        A fresh stream of this strategy's signals, for ticks arriving in batches
+        (e.g. a backtest over more data than fits in memory).
+        Strategies with state across rows override this with a vectorized stream
+        carrying that state; row-wise ones return a `RowSignalStream`.
+        """
+        return SignalStream(self)
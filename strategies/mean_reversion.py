@@ -2,8 +2,12 @@ from collections.abc import Mapping
 from typing import Any
 
 import numpy as np
+import polars as pl
+import pyarrow as pa
 
-from .base import BaseStrategy, Signal
+from momontum.rolling import RollingMoments
+
+from .base import SIGNAL_BUY, SIGNAL_SELL, BaseStrategy, Signal, SignalStream, to_frame
 
 
 class MeanReversionStrategy(BaseStrategy):
@@ -23,7 +27,8 @@ class MeanReversionStrategy(BaseStrategy):
         super().__init__("MeanReversion")
         self.window = window
         self.mult = std_dev_mult
-        self.prices: list[float] = []
+        # Mean/std of the last `window` prices in O(1) per tick
+        self.stats = RollingMoments(window)
 
     def on_tick(
         self,
@@ -35,16 +40,13 @@ class MeanReversionStrategy(BaseStrategy):
         if not price:
             return Signal.HOLD
 
-        self.prices.append(price)
-        if len(self.prices) > self.window:
-            self.prices.pop(0)
-
-        if len(self.prices) < self.window:
+        self.stats.update(price)
+        if not self.stats.full:
             return Signal.HOLD
 
-        # Calculate Bollinger Bands
-        ma = np.mean(self.prices)
-        std = np.std(self.prices)
+        # Calculate Bollinger Bands (population std, like np.std)
+        ma = self.stats.mean
+        std = self.stats.std()
         upper = ma + (std * self.mult)
         lower = ma - (std * self.mult)
 
@@ -57,3 +59,48 @@ class MeanReversionStrategy(BaseStrategy):
             return Signal.BUY
 
         return Signal.HOLD
+
+    def signal_stream(self) -> "MeanReversionSignals":
+        return MeanReversionSignals(self)
+
+
+class MeanReversionSignals(SignalStream):
+    """
+    `on_tick`'s Bollinger bands over whole batches: `RollingMoments.update_many`
+    runs the same arithmetic as `on_tick`'s per-tick updates, so the signals
+    match it exactly, and the window carries across batches.
+    """
+
+    def __init__(self, strategy: MeanReversionStrategy):
+        self.window = strategy.window
+        self.mult = strategy.mult
+        self.stats = RollingMoments(strategy.window)
+
+    def update(self, ticks: pl.DataFrame | pa.Table) -> np.ndarray:
+        frame = to_frame(ticks)
+        last = pl.col("last")
+        # Same price as on_tick: last trade, or the mid when there is none
+        price = (
+            frame.select(
+                pl.when(last.is_null() | (last == 0))
+                .then((pl.col("bid") + pl.col("ask")) / 2)
+                .otherwise(last)
+                .cast(pl.Float64)
+            )
+            .to_series()
+            .fill_null(0.0)
+            .to_numpy()
+        )
+        # Ticks without a price hold and do not enter the window
+        used = np.flatnonzero(price != 0)
+        window_prices = price[used]
+        full = self.stats.count + np.arange(1, len(used) + 1) >= self.window
+        ma, variance = self.stats.update_many(window_prices)
+        std = np.sqrt(variance)
+        upper = ma + (std * self.mult)
+        lower = ma - (std * self.mult)
+
+        signals = np.zeros(frame.height, dtype=np.int8)
+        signals[used[full & (window_prices > upper)]] = SIGNAL_SELL
+        signals[used[full & (window_prices < lower)]] = SIGNAL_BUY
+        return signals
@@ -1,7 +1,19 @@
 from collections.abc import Mapping
 from typing import Any
 
-from .base import BaseStrategy, Signal
+import numpy as np
+import polars as pl
+import pyarrow as pa
+
+from .base import (
+    SIGNAL_BUY,
+    SIGNAL_SELL,
+    BaseStrategy,
+    RowSignalStream,
+    Signal,
+    float_column,
+    to_frame,
+)
 
 
 class MomentumStrategy(BaseStrategy):
@@ -42,3 +54,20 @@ class MomentumStrategy(BaseStrategy):
             return Signal.SELL
 
         return Signal.HOLD
+
+    def generate_signals(self, ticks: pl.DataFrame | pa.Table) -> np.ndarray:
+        frame = to_frame(ticks)
+        signals = np.zeros(frame.height, dtype=np.int8)
+        if "predicted_price" not in frame.columns:
+            return signals
+        pred_price = float_column(frame, "predicted_price")  # NaN: no prediction -> HOLD
+        ask = float_column(frame, "ask")
+        bid = float_column(frame, "bid")
+
+        quoted = (ask != 0) & (bid != 0)
+        signals[quoted & (pred_price < bid - self.threshold)] = SIGNAL_SELL
+        signals[quoted & (pred_price > ask + self.threshold)] = SIGNAL_BUY  # checked first
+        return signals
+
+    def signal_stream(self) -> RowSignalStream:
+        return RowSignalStream(self)
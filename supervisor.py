@@ -0,0 +1,433 @@
+"""
+Momontum Harvest Supervisor
+===========================
+Multi-process harvester for baskets that are too large for one event loop.
+
+- Shards the basket across N worker processes (round-robin, so the most liquid
+  symbols at the top of a basket land on different workers)
+- Each worker runs a DataHarvester with its own event loop, exchange client,
+  processors and strategies, so feature computation and River learning scale
+  across cores
+- Workers send flushed batches (Arrow IPC) to the supervisor, which owns one
+  RollingParquetWriter per dataset (ticks, depth); the bounded queue applies
+  backpressure
+- Durability acks go back to the owning worker so it can truncate its journals
+- Workers report heartbeats; dead or stalled workers are restarted with
+  exponential backoff, and resend their journaled ticks on start
+- On startup the supervisor recovers in-progress files and replays journals
+  before any worker starts
+
+Usage:
+    python supervisor.py                          # config.TARGET_BASKET, config.HARVEST_WORKERS
+    python supervisor.py --basket TOP_10 --workers 4
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+import pyarrow as pa
+
+import config
+from data_lake.asset_manager import AssetManager
+from harvester import DataHarvester, make_rolling_writer
+from momontum.data.ipc import BatchMessage, QueueTickSink, ShardDrained
+from momontum.data.journal import replay_journals
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET
+from momontum.data.rotation import RollingParquetWriter
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("Supervisor")
+
+HEALTH_LOG_SECONDS = 60.0
+POLL_SECONDS = 0.5
+
+
+def shard_symbols(symbols: list[str], n_workers: int) -> list[list[str]]:
+    """Split *symbols* round-robin into at most *n_workers* non-empty shards."""
+    n = max(1, min(n_workers, len(symbols)))
+    return [symbols[i::n] for i in range(n)]
+
+
+@dataclass(frozen=True)
+class WorkerSpec:
+    shard_id: int
+    symbols: tuple[str, ...]
+    basket_name: str
+    exchange_id: str
+
+
+@dataclass(frozen=True)
+class WorkerStatus:
+    """Heartbeat sent by a worker every WORKER_HEARTBEAT_SECONDS."""
+
+    shard_id: int
+    pid: int
+    ticks: dict[str, int]
+    buffered_bytes: int
+    batches_sent: int
+    backpressure_waits: int
+
+
+@dataclass
+class WorkerHandle:
+    spec: WorkerSpec
+    acks: Any  # multiprocessing.Queue of (symbol, watermark) / None
+    process: BaseProcess | None = None
+    status: WorkerStatus | None = None
+    started_at: float = 0.0
+    last_heartbeat: float = 0.0
+    restarts: int = 0
+    failures: int = 0  # consecutive short-lived runs, drives the backoff
+    next_start: float = 0.0
+    exit_codes: list[int] = field(default_factory=list)
+
+
+WorkerTarget = Callable[[WorkerSpec, Any, Any, Any, Any], None]
+
+
+def run_worker(spec: WorkerSpec, batches: Any, statuses: Any, acks: Any, stop: Any) -> None:
+    """Worker process entry point (spawned by HarvestSupervisor)."""
+    # Ctrl-C reaches the whole process group; shutdown is driven by the supervisor.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_worker_main(spec, batches, statuses, acks, stop))
+
+
+async def _worker_main(spec: WorkerSpec, batches: Any, statuses: Any, acks: Any, stop: Any) -> None:
+    sink = QueueTickSink(batches, spec.shard_id, acks)
+    # Each worker serves its own /metrics on METRICS_PORT + 1 + shard id
+    metrics_port = None if config.METRICS_PORT is None else config.METRICS_PORT + 1 + spec.shard_id
+    harvester = DataHarvester(
+        spec.basket_name,
+        spec.exchange_id,
+        symbols=list(spec.symbols),
+        sink=sink,
+        metrics_port=metrics_port,
+    )
+    task = asyncio.create_task(harvester.harvest())
+
+    next_heartbeat = 0.0
+    while not task.done():
+        now = time.monotonic()
+        if now >= next_heartbeat:
+            statuses.put(
+                WorkerStatus(
+                    spec.shard_id,
+                    os.getpid(),
+                    dict(harvester.tick_counts),
+                    harvester.buffer_memory(),
+                    sink.sent,
+                    sink.backpressure_waits,
+                )
+            )
+            next_heartbeat = now + config.WORKER_HEARTBEAT_SECONDS
+        if stop.is_set():
+            harvester.stop()
+            task.cancel()  # harvest()'s finally flushes buffers and waits for final acks
+            break
+        await asyncio.wait({task}, timeout=POLL_SECONDS)
+
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+class HarvestSupervisor:
+    """Runs sharded DataHarvester workers and the shared tick writer."""
+
+    def __init__(
+        self,
+        symbols: list[str],
+        n_workers: int = config.HARVEST_WORKERS,
+        *,
+        basket_name: str = config.TARGET_BASKET,
+        exchange_id: str = config.EXCHANGE_ID,
+        tick_writer: RollingParquetWriter | None = None,
+        target: WorkerTarget = run_worker,
+    ):
+        # spawn, not fork: Polars/Arrow thread pools are not fork-safe.
+        self.ctx = multiprocessing.get_context("spawn")
+        self.batches = self.ctx.Queue(maxsize=config.WRITER_QUEUE_SIZE)
+        self.statuses = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+        self.target = target
+
+        self.workers = [
+            WorkerHandle(WorkerSpec(i, tuple(shard), basket_name, exchange_id), self.ctx.Queue())
+            for i, shard in enumerate(shard_symbols(symbols, n_workers))
+        ]
+        self.owner = {s: w.spec.shard_id for w in self.workers for s in w.spec.symbols}
+
+        self.tick_writer = tick_writer if tick_writer is not None else make_rolling_writer()
+        self.tick_writer.on_durable = self._on_durable
+        # Other datasets (depth) get a writer when their first batch arrives
+        self.writers: dict[tuple[str, str], RollingParquetWriter] = {
+            (TICKS_DATASET, TICK_TIMEFRAME): self.tick_writer
+        }
+        self._received: dict[str, int] = {}  # highest watermark received per symbol
+        self._writer_thread: threading.Thread | None = None
+        self.rows_written = 0
+        self.rows_skipped = 0
+        self.write_errors = 0
+
+    # --- Writer side (supervisor thread) ---
+
+    def start(self) -> None:
+        """Recover leftovers, start the writer thread and spawn all workers."""
+        os.makedirs(config.DATA_DIR, exist_ok=True)
+        self.tick_writer.recover()
+        if config.JOURNAL_ENABLED:
+            replay_journals(config.JOURNAL_DIR, self.tick_writer)
+
+        self._writer_thread = threading.Thread(
+            target=self._write_loop, name="supervisor-writer", daemon=True
+        )
+        self._writer_thread.start()
+        for worker in self.workers:
+            self._spawn(worker)
+
+    def _write_loop(self) -> None:
+        while True:
+            try:
+                message = self.batches.get(timeout=1.0)
+            except queue.Empty:
+                # Age-based rotation also has to happen while the market is quiet
+                for writer in self.writers.values():
+                    writer.rotate_expired()
+                continue
+            if message is None:
+                return
+            try:
+                self.handle(message)
+            except Exception as e:
+                self.write_errors += 1
+                logger.error(f"❌ Writer error: {e}")
+
+    def handle(self, message: BatchMessage | ShardDrained) -> None:
+        """Write one worker message (runs on the writer thread)."""
+        if isinstance(message, ShardDrained):
+            # The worker sent its last batch: close its symbols' files so its ticks become
+            # durable, leaving the other shards' parts open
+            symbols = self.workers[message.shard_id].spec.symbols
+            for writer in self.writers.values():
+                writer.close_symbols(symbols)
+            self.workers[message.shard_id].acks.put(None)
+            return
+
+        writer = self._writer_for(message.dataset, message.timeframe)
+        batch = message.batch
+        if writer is self.tick_writer and message.watermark is not None and batch.num_rows:
+            batch = self._drop_seen(batch, message.watermark)
+        if batch.num_rows:
+            writer.write_batch(batch, watermark=message.watermark)
+            self.rows_written += batch.num_rows
+
+    def _writer_for(self, dataset: str, timeframe: str) -> RollingParquetWriter:
+        writer = self.writers.get((dataset, timeframe))
+        if writer is None:
+            writer = make_rolling_writer(dataset, timeframe)
+            writer.recover()
+            self.writers[(dataset, timeframe)] = writer
+        return writer
+
+    def _drop_seen(self, batch: pa.RecordBatch, watermark: int) -> pa.RecordBatch:
+        """Slice off rows already received (a restarted worker resends its journal).
+
+        A batch with watermark W and n rows holds journal sequence numbers
+        W-n+1..W for a single symbol.
+        """
+        symbol = batch.column("symbol")[0].as_py()
+        seen = self._received.get(symbol)
+        self._received[symbol] = watermark if seen is None else max(seen, watermark)
+        if seen is None:
+            return batch
+
+        first = watermark - batch.num_rows + 1
+        skip = min(batch.num_rows, max(0, seen - first + 1))
+        self.rows_skipped += skip
+        return batch.slice(skip)
+
+    def _on_durable(self, symbol: str, watermark: int) -> None:
+        shard = self.owner.get(symbol)
+        if shard is not None:
+            self.workers[shard].acks.put((symbol, watermark))
+
+    # --- Worker lifecycle ---
+
+    def _spawn(self, worker: WorkerHandle) -> None:
+        process = self.ctx.Process(
+            target=self.target,
+            args=(worker.spec, self.batches, self.statuses, worker.acks, self.stop_event),
+            name=f"harvest-worker-{worker.spec.shard_id}",
+            daemon=False,
+        )
+        process.start()
+        worker.process = process
+        worker.started_at = worker.last_heartbeat = time.monotonic()
+        logger.info(
+            f"🚀 Worker {worker.spec.shard_id} (pid {process.pid}): "
+            f"{len(worker.spec.symbols)} symbols {list(worker.spec.symbols)}"
+        )
+
+    def poll(self) -> None:
+        """Collect heartbeats, restart dead workers and kill stalled ones."""
+        while True:
+            try:
+                status: WorkerStatus = self.statuses.get_nowait()
+            except queue.Empty:
+                break
+            worker = self.workers[status.shard_id]
+            worker.status = status
+            worker.last_heartbeat = time.monotonic()
+
+        if self.stop_event.is_set():
+            return
+
+        now = time.monotonic()
+        for worker in self.workers:
+            process = worker.process
+            if process is None:
+                if now >= worker.next_start:
+                    worker.restarts += 1
+                    self._spawn(worker)
+                continue
+
+            if process.exitcode is None:
+                if now - worker.last_heartbeat > config.WORKER_STALL_SECONDS:
+                    logger.error(f"🧟 Worker {worker.spec.shard_id} stalled, killing it")
+                    process.kill()
+                continue
+
+            # Worker died: restart with backoff (reset after a long healthy run)
+            process.join()
+            worker.exit_codes.append(process.exitcode)
+            if now - worker.started_at > config.WORKER_RESTART_MAX_DELAY:
+                worker.failures = 0
+            delay = min(
+                config.WORKER_RESTART_MIN_DELAY * 2**worker.failures,
+                config.WORKER_RESTART_MAX_DELAY,
+            )
+            worker.failures += 1
+            worker.process = None
+            worker.next_start = now + delay
+            logger.error(
+                f"💀 Worker {worker.spec.shard_id} exited with code {process.exitcode}, "
+                f"restarting in {delay:.1f}s"
+            )
+
+    def health(self) -> dict[str, Any]:
+        """Aggregated status of all workers and the writer."""
+        now = time.monotonic()
+        workers = []
+        for worker in self.workers:
+            status = worker.status
+            alive = worker.process is not None and worker.process.exitcode is None
+            workers.append(
+                {
+                    "shard": worker.spec.shard_id,
+                    "symbols": len(worker.spec.symbols),
+                    "pid": worker.process.pid if worker.process is not None else None,
+                    "alive": alive,
+                    "restarts": worker.restarts,
+                    "heartbeat_age": round(now - worker.last_heartbeat, 1),
+                    "ticks": sum(status.ticks.values()) if status else 0,
+                    "buffered_bytes": status.buffered_bytes if status else 0,
+                    "backpressure_waits": status.backpressure_waits if status else 0,
+                }
+            )
+        try:
+            queue_depth: int | None = self.batches.qsize()
+        except NotImplementedError:  # macOS
+            queue_depth = None
+        return {
+            "workers": workers,
+            "alive": sum(w["alive"] for w in workers),
+            "ticks": sum(w["ticks"] for w in workers),
+            "rows_written": self.rows_written,
+            "rows_skipped": self.rows_skipped,
+            "write_errors": self.write_errors,
+            "queue_depth": queue_depth,
+        }
+
+    def log_health(self) -> None:
+        health = self.health()
+        logger.info(
+            f"🩺 {health['alive']}/{len(self.workers)} workers alive, {health['ticks']} ticks, "
+            f"{health['rows_written']} rows written, queue {health['queue_depth']}"
+        )
+        for w in health["workers"]:
+            if not w["alive"] or w["heartbeat_age"] > 3 * config.WORKER_HEARTBEAT_SECONDS:
+                logger.warning(f"⚠️ Worker {w['shard']} unhealthy: {w}")
+
+    # --- Main loop ---
+
+    def request_stop(self, *_: Any) -> None:
+        self.stop_event.set()
+
+    def run(self) -> None:
+        """Run until request_stop() (SIGINT/SIGTERM), then shut down cleanly."""
+        self.start()
+        last_log = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                self.poll()
+                if time.monotonic() - last_log >= HEALTH_LOG_SECONDS:
+                    self.log_health()
+                    last_log = time.monotonic()
+                time.sleep(POLL_SECONDS)
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop workers (they flush and drain), then close the writer."""
+        self.stop_event.set()
+        deadline = time.monotonic() + config.WORKER_SHUTDOWN_SECONDS + 5.0
+        for worker in self.workers:
+            process = worker.process
+            if process is None:
+                continue
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.exitcode is None:
+                logger.warning(f"⏳ Worker {worker.spec.shard_id} did not stop, terminating")
+                process.terminate()
+                process.join()
+
+        if self._writer_thread is not None:
+            self.batches.put(None)
+            self._writer_thread.join()
+        for writer in self.writers.values():
+            writer.close()
+        for worker in self.workers:
+            worker.acks.cancel_join_thread()  # nobody reads acks of exited workers
+        self.log_health()
+        logger.info("🛑 Supervisor stopped. All data saved.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the sharded multi-process harvester.")
+    parser.add_argument("--basket", default=config.TARGET_BASKET)
+    parser.add_argument("--exchange", default=config.EXCHANGE_ID)
+    parser.add_argument("--workers", type=int, default=config.HARVEST_WORKERS)
+    args = parser.parse_args()
+
+    symbols = AssetManager.get_basket(args.basket)
+    supervisor = HarvestSupervisor(
+        symbols, args.workers, basket_name=args.basket, exchange_id=args.exchange
+    )
+    signal.signal(signal.SIGTERM, supervisor.request_stop)
+    signal.signal(signal.SIGINT, supervisor.request_stop)
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from momontum.data.access import (
+    BACKTEST_COLUMNS,
+    iter_symbol_ticks,
+    iter_ticks,
+    list_symbols,
+    load_ticks,
+    scan_ticks,
+)
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, PartitionedDatasetWriter
+from momontum.exchange.replay import synthetic_ticks
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT"]
+START = 1_700_006_400_000  # 2023-11-15 00:00 UTC
+DAY = 86_400_000
+
+
+def _lake(root: Path) -> pl.DataFrame:
+    # Three days per symbol, ~1 tick per 10 minutes
+    ticks = synthetic_ticks(SYMBOLS, 432, interval_ms=600_000, start_ms=START)
+    PartitionedDatasetWriter(root, TICKS_DATASET, TICK_TIMEFRAME).write_table(ticks)
+    frame = pl.from_arrow(ticks)
+    assert isinstance(frame, pl.DataFrame)
+    return frame
+
+
+def test_scan_prunes_partitions(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    ticks = _lake(tmp_path)
+    scanned: list[list[Path]] = []
+    scan_parquet = pl.scan_parquet
+
+    def recording(source, **kwargs):
+        scanned.append(list(source))
+        return scan_parquet(source, **kwargs)
+
+    monkeypatch.setattr(pl, "scan_parquet", recording)
+    start, end = START + DAY + 3_600_000, START + 2 * DAY  # within the second day
+    scan = scan_ticks(tmp_path, symbols=["ETH/USDT"], start=start, end=end, columns=["bid"])
+    assert scan is not None
+    (files,) = scanned
+    assert [f.relative_to(tmp_path).parts[3:6] for f in files] == [("2023", "11", "16")]
+    assert all("ETH-USDT" in f.parts for f in files)
+
+    expected = ticks.filter(
+        (pl.col("symbol") == "ETH/USDT") & pl.col("timestamp").is_between(start, end - 1)
+    )
+    got = scan.collect()
+    assert got.columns == ["bid"] and got.height > 0
+    assert got["bid"].to_list() == expected["bid"].to_list()
+
+    # Datetimes work as bounds (naive = UTC)
+    naive = scan_ticks(tmp_path, start=datetime(2023, 11, 16, 1), end=datetime(2023, 11, 17))
+    aware = scan_ticks(tmp_path, start=start, end=datetime(2023, 11, 17, tzinfo=UTC))
+    assert naive is not None and aware is not None
+    assert naive.collect().equals(aware.collect())
+
+
+def test_load_and_iterate(tmp_path: Path) -> None:
+    ticks = _lake(tmp_path)
+    loaded = load_ticks(tmp_path, symbols=SYMBOLS[:2], columns=BACKTEST_COLUMNS)
+    assert loaded is not None
+    assert loaded.columns == list(BACKTEST_COLUMNS)
+    expected = ticks.filter(pl.col("symbol").is_in(SYMBOLS[:2])).sort("timestamp")
+    assert loaded.equals(expected.select(BACKTEST_COLUMNS))
+
+    batches = list(iter_ticks(tmp_path, batch_size=100, symbols=["SOL/USDT"]))
+    assert [b.height for b in batches] == [100, 100, 100, 100, 32]
+    streamed = pl.concat(batches)
+    assert streamed.sort("timestamp").equals(ticks.filter(pl.col("symbol") == "SOL/USDT"))
+    with pytest.raises(ValueError):
+        list(iter_ticks(tmp_path, batch_size=0))
+
+
+def test_iter_symbol_ticks_in_timestamp_order(tmp_path: Path) -> None:
+    assert list_symbols(tmp_path) == []
+    _lake(tmp_path)
+    # A later part of the second day with earlier ticks: that day is out of order
+    writer = PartitionedDatasetWriter(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    writer.write_table(synthetic_ticks(["ETH/USDT"], 30, interval_ms=60_000, start_ms=START + DAY))
+    assert list_symbols(tmp_path) == SYMBOLS
+
+    start, end, columns = START + 3_600_000, START + 3 * DAY - 1, ["timestamp", "bid"]
+    for symbol in ("BTC/USDT", "ETH/USDT"):
+        expected = load_ticks(
+            tmp_path, symbols=[symbol], legacy=False, start=start, end=end, columns=columns
+        )
+        assert expected is not None
+        batches = list(
+            iter_symbol_ticks(
+                symbol, tmp_path, start=start, end=end, columns=columns, batch_size=50
+            )
+        )
+        assert all(0 < b.height <= 50 for b in batches)
+        assert pl.concat(batches).equals(expected)
+    assert list(iter_symbol_ticks("DOGE/USDT", tmp_path)) == []
+    with pytest.raises(ValueError):
+        list(iter_symbol_ticks("BTC/USDT", tmp_path, batch_size=0))
+
+
+def test_empty_queries_and_legacy(tmp_path: Path) -> None:
+    assert scan_ticks(tmp_path) is None
+    assert list(iter_ticks(tmp_path)) == []
+    ticks = _lake(tmp_path)
+    empty = scan_ticks(tmp_path, symbols=["DOGE/USDT"], columns=["symbol", "bid"])
+    assert empty is not None and empty.collect().shape == (0, 2)
+    with pytest.raises(ValueError):
+        scan_ticks(tmp_path, start=START, end=START)
+
+    # Flat files from before the partitioned layout, without a symbol column
+    ticks.head(10).drop("symbol").write_parquet(tmp_path / "binance_BTCUSDT_1.parquet")
+    everything = load_ticks(tmp_path, columns=["symbol", "timestamp"])
+    assert everything is not None
+    assert everything.height == ticks.height + 10
+    assert everything["symbol"].null_count() == 10
+    by_symbol = load_ticks(tmp_path, symbols=["BTC/USDT"])
+    assert by_symbol is not None and by_symbol.height == 432
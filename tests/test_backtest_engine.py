@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import numpy as np
+import polars as pl
+import pytest
+
+from backtesting.bulk_runner import run_strategy
+from backtesting.engine import (
+    LONG,
+    SHORT,
+    BacktestResult,
+    Simulation,
+    simulate,
+    simulate_loop,
+)
+from momontum.exchange.replay import synthetic_ticks
+from strategies.base import Signal
+from strategies.mean_reversion import MeanReversionStrategy
+
+FIELDS = ("entry_index", "exit_index", "side", "entry_price", "exit_price", "pnl")
+
+
+def _assert_same(got: BacktestResult, expected: BacktestResult) -> None:
+    for field in FIELDS:
+        assert np.array_equal(getattr(got, field), getattr(expected, field), equal_nan=True), field
+    assert got.total_pnl == expected.total_pnl
+
+
+def test_state_machine_rules() -> None:
+    bid = np.arange(10, 20, dtype=float)
+    ask = bid + 0.5
+    # BUY opens long, BUY ignored, SELL closes, SELL opens short, BUY closes, BUY opens long
+    signals = [1, 0, 1, -1, -1, 0, 1, 1, 0, 0]
+    result = simulate(signals, bid, ask)
+    assert result.entry_index.tolist() == [0, 4, 7]
+    assert result.exit_index.tolist() == [3, 6, -1]
+    assert result.side.tolist() == [LONG, SHORT, LONG]
+    assert result.pnl[:2].tolist() == [13.0 - 10.5, 14.0 - 16.5]
+    assert np.isnan(result.pnl[2]) and result.closed == 2 and result.trades == 3
+    assert result.total_pnl == (13.0 - 10.5) + (14.0 - 16.5)
+
+    empty = simulate(np.zeros(5), bid[:5], ask[:5])
+    assert empty.trades == 0 and empty.total_pnl == 0.0
+    with pytest.raises(ValueError):
+        simulate([1, 0], bid, ask)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_loop_on_random_signals(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 5_000))
+    p = rng.dirichlet([1, 1, 1])  # from mostly HOLD to long same-sign runs
+    signals = rng.choice(np.array([0, 1, -1], dtype=np.int8), n, p=p)
+    bid = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    ask = bid + rng.uniform(0.01, 0.05, n)
+    _assert_same(simulate(signals, bid, ask), simulate_loop(signals, bid, ask))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_simulation_matches_one_call(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 3_000))
+    signals = rng.choice(np.array([0, 1, -1], dtype=np.int8), n, p=rng.dirichlet([1, 1, 1]))
+    bid = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    ask = bid + rng.uniform(0.01, 0.05, n)
+    simulation = Simulation()
+    bounds = np.sort(rng.integers(0, n + 1, int(rng.integers(0, 30))))  # empty batches too
+    for chunk in zip(*(np.split(a, bounds) for a in (signals, bid, ask)), strict=True):
+        simulation.update(*chunk)
+    assert simulation.rows == n
+    _assert_same(simulation.result(), simulate(signals, bid, ask))
+
+
+def _reference_run(strategy, records: list[dict]) -> tuple[str, int]:
+    # The dict loop run_strategy used before the engine
+    position, entry_price, pnl, trades = None, 0.0, 0, 0
+    for record in records:
+        signal = strategy.on_tick(record, None)
+        bid, ask = record["bid"], record["ask"]
+        mid_price = (bid + ask) / 2 if bid and ask else record["last"]
+        if not mid_price:
+            continue
+        if position is None:
+            if signal == Signal.BUY:
+                position, entry_price, trades = "LONG", ask, trades + 1
+            elif signal == Signal.SELL:
+                position, entry_price, trades = "SHORT", bid, trades + 1
+        elif position == "LONG" and signal == Signal.SELL:
+            pnl, position = pnl + bid - entry_price, None
+        elif position == "SHORT" and signal == Signal.BUY:
+            pnl, position = pnl + entry_price - ask, None
+    return f"{pnl:.2f}", trades
+
+
+def test_run_strategy_matches_dict_loop() -> None:
+    frame = pl.from_arrow(synthetic_ticks(["BTC/USDT"], 5_000, interval_ms=50))
+    assert isinstance(frame, pl.DataFrame)
+    rows = pl.int_range(pl.len())
+    mid = (pl.col("bid") + pl.col("ask")) / 2
+    frame = frame.with_columns(
+        pl.when(rows % 9 == 0)
+        .then(None)
+        .otherwise(mid + pl.col("spread") * (rows % 3 - 1))
+        .alias("last"),
+        # Unpriced ticks (no quote, no last) are skipped by the runner
+        pl.when(rows % 97 == 0).then(0.0).otherwise(pl.col("bid")).alias("bid"),
+    )
+    strategy = MeanReversionStrategy(window=30, std_dev_mult=1.5)
+    metrics = run_strategy(strategy, frame)
+    pnl, trades = _reference_run(
+        MeanReversionStrategy(window=30, std_dev_mult=1.5), frame.to_dicts()
+    )
+    assert (metrics["Total PnL"], metrics["Trades"]) == (pnl, trades)
+    assert trades > 10
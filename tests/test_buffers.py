@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import pyarrow as pa
+import pytest
+
+from momontum.data.buffers import (
+    BufferFullError,
+    ColumnarBuffer,
+    TickBuffer,
+    TradeBuffer,
+    capacity_for_budget,
+    row_nbytes,
+)
+from momontum.schemas import TICKS_SCHEMA_V1, TRADES_SCHEMA_V1
+
+
+def _append_tick(buffer: TickBuffer, i: int, last: float | None = None) -> None:
+    bid = 100.0 + i
+    ask = bid + 1.0
+    buffer.append(
+        1700000000000 + i,
+        f"2023-11-14T22:13:20.{i:03d}Z",
+        bid,
+        ask,
+        1.0,
+        2.0,
+        last,
+        ask - bid,
+        (ask - bid) / bid * 100,
+        1700000000.0 + i / 1000,
+    )
+
+
+def test_tick_buffer_flushes_record_batch_with_ticks_schema() -> None:
+    buffer = TickBuffer("BTC/USDT", capacity=4)
+    _append_tick(buffer, 0)
+    _append_tick(buffer, 1, last=101.5)
+
+    batch = buffer.to_record_batch()
+
+    assert batch.schema == TICKS_SCHEMA_V1
+    assert batch.num_rows == 2
+    assert batch.column("symbol").to_pylist() == ["BTC/USDT", "BTC/USDT"]
+    assert batch.column("timestamp").to_pylist() == [1700000000000, 1700000000001]
+    # NaN-backed floats surface as Arrow nulls.
+    assert batch.column("last").to_pylist() == [None, 101.5]
+
+
+def test_record_batch_survives_buffer_reuse() -> None:
+    buffer = TickBuffer("ETH/USDT", capacity=2)
+    _append_tick(buffer, 0)
+    batch = buffer.to_record_batch()
+
+    buffer.clear()
+    _append_tick(buffer, 9)
+
+    assert len(buffer) == 1
+    assert batch.column("bid").to_pylist() == [100.0]
+
+
+def test_buffer_capacity_is_enforced() -> None:
+    buffer = TickBuffer("BTC/USDT", capacity=1)
+    _append_tick(buffer, 0)
+
+    assert buffer.is_full
+    with pytest.raises(BufferFullError):
+        _append_tick(buffer, 1)
+
+
+def test_null_integers_use_validity_mask() -> None:
+    schema = pa.schema([("timestamp", pa.int64()), ("price", pa.float64())])
+    buffer = ColumnarBuffer(schema, capacity=3)
+    buffer.append(None, 1.0)
+    buffer.append(5, None)
+
+    batch = buffer.to_record_batch()
+    assert batch.column("timestamp").to_pylist() == [None, 5]
+    assert batch.column("price").to_pylist() == [1.0, None]
+
+    buffer.clear()
+    buffer.append(7, 2.0)
+    assert buffer.to_record_batch().column("timestamp").to_pylist() == [7]
+
+
+def test_memory_reporting_and_budget() -> None:
+    buffer = TickBuffer("BTC/USDT", capacity=100)
+    empty = buffer.nbytes
+    _append_tick(buffer, 0)
+    assert buffer.nbytes > empty
+
+    per_row = row_nbytes(TICKS_SCHEMA_V1, constants={"symbol": ""})
+    capacity = capacity_for_budget(
+        TICKS_SCHEMA_V1,
+        n_buffers=10,
+        budget_bytes=10 * 50 * per_row,
+        max_capacity=1000,
+        constants={"symbol": ""},
+    )
+    assert capacity == 50
+
+    full = TickBuffer("X", capacity)
+    for i in range(capacity):
+        _append_tick(full, i)
+    assert full.nbytes == per_row * capacity
+
+
+def test_trade_buffer_matches_trades_schema() -> None:
+    buffer = TradeBuffer("ETH/USDT", capacity=2)
+    buffer.append(1, "2023-11-14T22:13:20.001Z", "42", "buy", 2000.0, 0.5, 1000.0, 1.5)
+
+    batch = buffer.to_record_batch()
+
+    assert batch.schema == TRADES_SCHEMA_V1
+    assert batch.to_pylist()[0] == {
+        "symbol": "ETH/USDT",
+        "timestamp": 1,
+        "datetime": "2023-11-14T22:13:20.001Z",
+        "id": "42",
+        "side": "buy",
+        "price": 2000.0,
+        "amount": 0.5,
+        "cost": 1000.0,
+        "local_timestamp": 1.5,
+    }
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from backtesting.bulk_runner import (
+    _with_predictions,
+    evaluate,
+    export_symbols,
+    map_ticks,
+    plan_jobs,
+    run_parallel,
+    run_strategy,
+    run_streaming,
+    summarize,
+    uses_predictions,
+)
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, PartitionedDatasetWriter
+from momontum.exchange.replay import synthetic_ticks
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.momentum import MomentumStrategy
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT"]
+
+
+def _ticks() -> pl.DataFrame:
+    frames = []
+    for n, symbol in zip((600, 300, 150), SYMBOLS, strict=True):
+        frame = pl.from_arrow(synthetic_ticks([symbol], n, interval_ms=50))
+        assert isinstance(frame, pl.DataFrame)
+        mid = (pl.col("bid") + pl.col("ask")) / 2
+        offset = pl.col("spread") * (pl.int_range(pl.len()) % 3 - 1)
+        frames.append(frame.with_columns((mid + offset).alias("last")))
+    return pl.concat(frames).sort("timestamp")
+
+
+STRATEGIES = [
+    MomentumStrategy(threshold=0.0),
+    MomentumStrategy(threshold=0.01),
+    MeanReversionStrategy(window=20, std_dev_mult=1.5),
+]
+
+
+def test_export_and_plan(tmp_path: Path) -> None:
+    df = _ticks()
+    exported = export_symbols(df, tmp_path)
+    assert sorted((symbol, rows) for symbol, _, rows in exported) == [
+        ("BTC/USDT", 600),
+        ("ETH/USDT", 300),
+        ("SOL/USDT", 150),
+    ]
+    for symbol, path, _ in exported:
+        assert map_ticks(path).equals(df.filter(pl.col("symbol") == symbol))
+
+    # Both momentum strategies share one job (and prediction stream) per symbol
+    jobs = plan_jobs(exported, STRATEGIES)
+    assert sorted(indices for symbol, _, indices in jobs if symbol == "ETH/USDT") == [(0, 1), (2,)]
+    assert len(jobs) == len(SYMBOLS) * 2
+    rows = {path: n for _, path, n in exported}
+    costs = [
+        rows[path] * (8 + len(indices) if len(indices) > 1 else 1) for _, path, indices in jobs
+    ]
+    assert costs == sorted(costs, reverse=True)
+    assert jobs[0][0] == "BTC/USDT" and jobs[0][2] == (0, 1)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_matches_sequential(workers: int) -> None:
+    df = _ticks()
+    expected = {
+        (symbol, i): run_strategy(
+            strategy, df.filter(pl.col("symbol") == symbol), processor=uses_predictions(strategy)
+        )
+        for symbol in SYMBOLS
+        for i, strategy in enumerate(STRATEGIES)
+    }
+    got = {}
+    for i, symbol, result in run_parallel(df, STRATEGIES, workers=workers):
+        got[(symbol, i)] = summarize(STRATEGIES[i], result)
+    assert got == expected
+    assert any(metrics["Trades"] for metrics in got.values())
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1_000])
+def test_streaming_matches_in_memory(tmp_path: Path, batch_size: int) -> None:
+    df = _ticks()
+    PartitionedDatasetWriter(tmp_path, TICKS_DATASET, TICK_TIMEFRAME).write_table(df.to_arrow())
+    got = {
+        (symbol, i): result
+        for i, symbol, result in run_streaming(
+            SYMBOLS, STRATEGIES, batch_size, workers=1, root=tmp_path
+        )
+    }
+    assert len(got) == len(SYMBOLS) * len(STRATEGIES)
+    for symbol in SYMBOLS:
+        frame = _with_predictions(df.filter(pl.col("symbol") == symbol))
+        for i, strategy in enumerate(STRATEGIES):
+            assert got[(symbol, i)].to_frame().equals(evaluate(strategy, frame).to_frame())
+    assert any(result.trades for result in got.values())
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+import config
+from harvester import DataHarvester, make_rolling_writer
+from momontum.data.candles import (
+    CandleAggregator,
+    backfill_candles,
+    candles_from_ticks,
+    interval_ms,
+)
+from momontum.data.layout import CANDLES_DATASET, list_partition_files
+from momontum.data.schema import read_parquet
+from momontum.exchange.replay import ReplayExchange, synthetic_ticks
+from momontum.schemas import CANDLES_SCHEMA_V1
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT"]
+
+
+def _read(root: Path, interval: str) -> pa.Table:
+    files = list_partition_files(root, CANDLES_DATASET, interval)
+    table = pa.concat_tables([read_parquet(f).replace_schema_metadata(None) for f in files])
+    return table.sort_by([("symbol", "ascending"), ("start_ts", "ascending")])
+
+
+def test_interval_labels() -> None:
+    assert interval_ms("1s") == 1_000
+    assert interval_ms("5min") == 300_000
+    assert interval_ms("1h") == 3_600_000
+    for bad in ("1m", "0s", "7min", "abc"):
+        with pytest.raises(ValueError):
+            interval_ms(bad)
+
+
+def test_aggregator_closes_buckets_on_boundaries() -> None:
+    candles = CandleAggregator("BTC/USDT", ["1s", "1min"])
+    for ts, price in [(1_000, 10.0), (1_400, 12.0), (1_900, 9.0), (2_100, 11.0)]:
+        candles.update(ts, price)
+
+    candles.update(1_950, 50.0)  # older than the open 1s bucket: late
+    assert candles.late == 1
+
+    assert candles.close_expired(3_000) == 1  # quiet market: 1s bucket [2000, 3000) ends
+    batches = dict(candles.drain())
+    assert set(batches) == {"1s"}
+    rows = batches["1s"].to_pylist()
+    assert [
+        (r["start_ts"], r["open"], r["high"], r["low"], r["close"], r["n_ticks"]) for r in rows
+    ] == [
+        (1_000, 10.0, 12.0, 9.0, 9.0, 3),
+        (2_000, 11.0, 11.0, 11.0, 11.0, 1),
+    ]
+    assert rows[0]["end_ts"] == 2_000 and rows[0]["interval"] == "1s"
+
+    candles.close_expired(float("inf"))
+    ((interval, batch),) = candles.drain()
+    assert interval == "1min"
+    # Lateness is per interval: the 1min bucket was still open for the late tick
+    assert batch.to_pylist()[0]["n_ticks"] == 5 and batch.to_pylist()[0]["high"] == 50.0
+
+
+def test_streaming_matches_polars() -> None:
+    ticks = synthetic_ticks(SYMBOLS, 2_000, interval_ms=50).sort_by("timestamp")
+    aggregators = {s: CandleAggregator(s, ["1s", "5min"]) for s in SYMBOLS}
+    for row in ticks.select(["symbol", "timestamp", "bid", "ask"]).to_pylist():
+        aggregators[row["symbol"]].update(row["timestamp"], (row["bid"] + row["ask"]) / 2)
+
+    streamed: dict[str, list[pa.RecordBatch]] = {"1s": [], "5min": []}
+    for candles in aggregators.values():
+        candles.close_expired(float("inf"))
+        for interval, batch in candles.drain():
+            streamed[interval].append(batch)
+
+    for interval, batches in streamed.items():
+        table = pa.Table.from_batches(batches, schema=CANDLES_SCHEMA_V1)
+        table = table.sort_by([("symbol", "ascending"), ("start_ts", "ascending")])
+        assert table.equals(candles_from_ticks(ticks, interval))
+
+
+def test_backfill_skips_existing_unless_overwrite(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    ticks = synthetic_ticks(SYMBOLS, 500)  # Nov 2023: closed days
+    writer = make_rolling_writer()
+    writer.write_table(ticks)
+    writer.close()
+
+    assert backfill_candles(tmp_path, ["1s", "1min"]) > 0
+    assert _read(tmp_path, "1min").equals(candles_from_ticks(ticks, "1min"))
+
+    assert backfill_candles(tmp_path, ["1s", "1min"]) == 0
+    rows = backfill_candles(tmp_path, ["1min"], overwrite=True)
+    assert rows == _read(tmp_path, "1min").num_rows  # old parts replaced, not duplicated
+
+
+def test_harvester_writes_candles(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_DIR", str(tmp_path / "_journal"))
+    monkeypatch.setattr(config, "CANDLE_INTERVALS", ("1s", "1min"))
+    ticks = synthetic_ticks(SYMBOLS, 300, interval_ms=100)
+    exchange = ReplayExchange(ticks, speed=None, rebase=False)
+    harvester = DataHarvester(symbols=SYMBOLS, exchange=exchange, metrics_port=0)
+
+    async def run() -> None:
+        task = asyncio.create_task(harvester.harvest())
+        await asyncio.wait_for(exchange.finished.wait(), timeout=30)
+        while sum(harvester.tick_counts.values()) < len(exchange):
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    expected = candles_from_ticks(ticks, "1s")
+    written = _read(tmp_path, "1s")
+    # Every bucket but the last (still open at shutdown) per symbol
+    assert written.num_rows == expected.num_rows - len(SYMBOLS)
+    rows = expected.to_pylist()
+    last = {s: max(r["start_ts"] for r in rows if r["symbol"] == s) for s in SYMBOLS}
+    keep = [r for r in rows if r["start_ts"] != last[r["symbol"]]]
+    assert written.to_pylist() == keep
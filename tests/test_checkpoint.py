@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pyarrow.compute as pc
+import pytest
+
+import config
+from harvester import DataHarvester, make_rolling_writer
+from momontum.checkpoint import (
+    CHECKPOINT_VERSION,
+    checkpoint_path,
+    dump_checkpoint,
+    load_checkpoint,
+    recent_ticks,
+    write_checkpoint,
+)
+from momontum.exchange.replay import ReplayExchange, synthetic_ticks
+from processor import ENGINE_NUMPY, ENGINE_RIVER, BasketProcessor, DataProcessor
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT"]
+
+
+def _changes(predictions: list[dict | None]) -> list[float | None]:
+    return [None if p is None else p["predicted_change"] for p in predictions]
+
+
+class _Removed:
+    pass
+
+
+def test_write_and_load(tmp_path: Path) -> None:
+    path = checkpoint_path(tmp_path / "ckpt", "BTC/USDT")
+    assert path.name == "BTC-USDT.ckpt"
+    assert load_checkpoint(path, "DataProcessor") is None
+
+    write_checkpoint(path, dump_checkpoint("DataProcessor", {"a": 1}))
+    write_checkpoint(path, dump_checkpoint("DataProcessor", {"a": 2}))  # replaces
+    assert load_checkpoint(path, "DataProcessor") == {"a": 2}
+    assert [p.name for p in path.parent.iterdir()] == [path.name]  # no temp files left
+    assert load_checkpoint(path, "BasketProcessor") is None
+
+    stale = {"version": CHECKPOINT_VERSION + 1, "kind": "DataProcessor"}
+    path.write_bytes(pickle.dumps(stale) + pickle.dumps({}))
+    assert load_checkpoint(path, "DataProcessor") is None
+    # Version 1: header and state in one pickle, with a class that has since been removed
+    v1 = pickle.dumps({"version": 1, "kind": "DataProcessor", "state": _Removed()})
+    path.write_bytes(v1.replace(b"_Removed", b"_Renamed"))
+    assert load_checkpoint(path, "DataProcessor") is None
+    path.write_bytes(b"\x80\x05truncated")
+    assert load_checkpoint(path, "DataProcessor") is None
+
+
+@pytest.mark.parametrize("engine", [ENGINE_RIVER, ENGINE_NUMPY])
+def test_restored_processor_continues(tmp_path: Path, engine: str) -> None:
+    records = synthetic_ticks(["BTC/USDT"], 1_000, interval_ms=50).to_pylist()
+    specs = ["ema_20", "zscore_50"]
+    uninterrupted = DataProcessor(engine=engine, features=specs)
+    expected = [uninterrupted.process(r) for r in records]
+
+    before = DataProcessor(engine=engine, features=specs)
+    for record in records[:600]:
+        before.process(record)
+    path = tmp_path / "BTC-USDT.ckpt"
+    write_checkpoint(path, dump_checkpoint("DataProcessor", before.get_state()))
+    state = load_checkpoint(path, "DataProcessor")
+    assert state is not None
+    after = DataProcessor(engine=engine, features=specs)
+    after.set_state(state)
+    got = [after.process(r) for r in records[600:]]
+    assert _changes(got) == _changes(expected[600:])
+
+    with pytest.raises(ValueError):
+        DataProcessor(engine=engine).set_state(state)  # different features
+
+
+def test_restored_basket_continues() -> None:
+    records = synthetic_ticks(SYMBOLS, 300).sort_by("timestamp").to_pylist()
+    updates = [(r["symbol"], r) for r in records]
+    expected = BasketProcessor(SYMBOLS).process_many(updates)
+
+    before = BasketProcessor(SYMBOLS)
+    before.process_many(updates[:400])
+    # Restored by symbol: the new basket has a different symbol order
+    after = BasketProcessor(["SOL/USDT", *reversed(SYMBOLS)])
+    for symbol in SYMBOLS:
+        after.set_state(symbol, pickle.loads(pickle.dumps(before.get_state(symbol))))
+    got = after.process_many(updates[400:])
+    np.testing.assert_allclose(
+        np.array(_changes(got), dtype=float), np.array(_changes(expected[400:]), dtype=float)
+    )
+
+
+def test_recent_ticks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "ROTATE_MAX_ROWS", 100)  # several part files
+    ticks = synthetic_ticks(SYMBOLS, 500)
+    writer = make_rolling_writer()
+    writer.write_table(ticks)
+    writer.close()
+
+    btc = ticks.filter(pc.equal(ticks["symbol"], "BTC/USDT")).sort_by("timestamp")
+    recent = recent_ticks(tmp_path, "BTC/USDT", 150)
+    assert recent is not None
+    assert recent["timestamp"].to_pylist() == btc["timestamp"].to_pylist()[-150:]
+    assert recent_ticks(tmp_path, "SOL/USDT", 150) is None
+
+
+def _run(harvester: DataHarvester, exchange: ReplayExchange) -> None:
+    async def run() -> None:
+        task = asyncio.create_task(harvester.harvest())
+        await asyncio.wait_for(exchange.finished.wait(), timeout=30)
+        while sum(harvester.tick_counts.values()) < len(exchange):
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)  # let processing catch up
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("basket", [False, True])
+def test_harvester_warm_restart(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, basket: bool
+) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_DIR", str(tmp_path / "_journal"))
+    monkeypatch.setattr(config, "CHECKPOINT_FAST_FORWARD_TICKS", 0)
+
+    exchange = ReplayExchange.synthetic(SYMBOLS, 100, speed=None)
+    harvester = DataHarvester(
+        symbols=SYMBOLS, exchange=exchange, metrics_port=0, basket_processing=basket
+    )
+    _run(harvester, exchange)  # checkpoints are saved at shutdown
+    states = {s: harvester.get_processor_state(s) for s in SYMBOLS}
+    assert all(
+        (tmp_path / "_checkpoints" / f"{s.replace('/', '-')}.ckpt").exists() for s in SYMBOLS
+    )
+
+    restarted = DataHarvester(
+        symbols=SYMBOLS,
+        exchange=ReplayExchange.synthetic(SYMBOLS, 1, speed=None),
+        metrics_port=0,
+        basket_processing=basket,
+    )
+    for symbol in SYMBOLS:
+        state = restarted.get_processor_state(symbol)
+        assert state["prev_mid_price"] == states[symbol]["prev_mid_price"]
+        assert not np.isnan(state["prev_mid_price"])
+
+
+@pytest.mark.parametrize("basket", [False, True])
+def test_harvester_fast_forward_without_checkpoint(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, basket: bool
+) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_DIR", str(tmp_path / "_journal"))
+    ticks = synthetic_ticks(SYMBOLS, 300)
+    writer = make_rolling_writer()
+    writer.write_table(ticks)
+    writer.close()
+
+    harvester = DataHarvester(
+        symbols=[*SYMBOLS, "SOL/USDT"],  # no ticks recorded: stays cold
+        exchange=ReplayExchange.synthetic(SYMBOLS, 1, speed=None),
+        metrics_port=0,
+        basket_processing=basket,
+    )
+    for symbol in SYMBOLS:
+        last = ticks.filter(pc.equal(ticks["symbol"], symbol)).sort_by("timestamp").to_pylist()[-1]
+        state = harvester.get_processor_state(symbol)
+        assert state["prev_mid_price"] == (last["bid"] + last["ask"]) / 2
+    cold = harvester.get_processor_state("SOL/USDT")["prev_mid_price"]
+    assert cold is None or np.isnan(cold)
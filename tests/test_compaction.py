@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from momontum.data.compaction import (
+    compact,
+    is_compacted,
+    legacy_symbol,
+    migrate_legacy,
+    plan_compaction,
+)
+from momontum.data.layout import (
+    TICK_TIMEFRAME,
+    TICKS_DATASET,
+    PartitionedDatasetWriter,
+    list_partition_files,
+)
+from momontum.data.schema import SchemaVersion, read_parquet
+from momontum.schemas import TICKS_SCHEMA_V1
+
+DAY_MS = 1704153600000  # 2024-01-02T00:00:00Z
+
+
+def _ticks(symbol: str, timestamps: list[int]) -> pa.Table:
+    n = len(timestamps)
+    return pa.Table.from_pydict(
+        {
+            "symbol": [symbol] * n,
+            "timestamp": timestamps,
+            "datetime": [""] * n,
+            "bid": [float(t % 1000) for t in timestamps],
+            "ask": [float(t % 1000) + 1 for t in timestamps],
+            "bidVolume": [1.0] * n,
+            "askVolume": [1.0] * n,
+            "last": [None] * n,
+            "spread": [1.0] * n,
+            "spread_pct": [1.0] * n,
+            "local_timestamp": [t / 1000 for t in timestamps],
+        },
+        schema=TICKS_SCHEMA_V1,
+    )
+
+
+def _seed(root: Path) -> None:
+    writer = PartitionedDatasetWriter(root, TICKS_DATASET, TICK_TIMEFRAME)
+    writer.write_table(_ticks("BTC/USDT", [DAY_MS + 30, DAY_MS + 10]))
+    writer.write_table(_ticks("BTC/USDT", [DAY_MS + 20, DAY_MS + 10]))  # one duplicate row
+    writer.write_table(_ticks("ETH/USDT", [DAY_MS + 5]))
+    writer.write_table(_ticks("ETH/USDT", [DAY_MS + 1]))
+
+
+def test_compaction_merges_sorts_and_dedupes(tmp_path: Path) -> None:
+    _seed(tmp_path)
+
+    results = compact(tmp_path)
+
+    assert sorted((r.inputs, r.rows_in, r.rows_out) for r in results) == [(2, 2, 2), (2, 4, 3)]
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME, symbols=["BTC/USDT"])
+    assert [f.name for f in files] == ["part-0000.parquet"]
+
+    out = read_parquet(files[0], expected_version=SchemaVersion.V1)
+    assert out["timestamp"].to_pylist() == [DAY_MS + 10, DAY_MS + 20, DAY_MS + 30]
+    assert out.schema.field("datetime").type == pa.string()
+
+    md = pq.ParquetFile(files[0]).metadata
+    assert md.row_group(0).column(0).compression == "ZSTD"
+    assert md.row_group(0).column(1).statistics.has_min_max
+    assert is_compacted(files[0])
+
+
+def test_compaction_is_incremental(tmp_path: Path) -> None:
+    _seed(tmp_path)
+    compact(tmp_path)
+
+    assert plan_compaction(tmp_path) == []
+
+    # Late data lands in a compacted partition: only that partition is redone.
+    PartitionedDatasetWriter(tmp_path, TICKS_DATASET, TICK_TIMEFRAME).write_table(
+        _ticks("ETH/USDT", [DAY_MS + 3])
+    )
+    planned = plan_compaction(tmp_path)
+    assert len(planned) == 1 and "ETH-USDT" in planned[0].parts
+
+    compact(tmp_path, workers=2)
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME, symbols=["ETH/USDT"])
+    assert read_parquet(files[0])["timestamp"].to_pylist() == [DAY_MS + 1, DAY_MS + 3, DAY_MS + 5]
+
+
+def test_open_partitions_are_skipped(tmp_path: Path) -> None:
+    _seed(tmp_path)
+    day_dir = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)[0].parent
+    (day_dir / ".part-abc.inprogress").write_bytes(b"")
+
+    assert day_dir not in plan_compaction(tmp_path)
+
+
+def test_migrates_legacy_files_without_symbol(tmp_path: Path) -> None:
+    legacy = tmp_path / "binanceusdm_BTCUSDT_20240102_000000.parquet"
+    pd.DataFrame(
+        {
+            "timestamp": [DAY_MS + 1, DAY_MS + 2],
+            "datetime": ["a", "b"],
+            "bid": [1.0, 2.0],
+            "ask": [2.0, 3.0],
+            "bidVolume": [1.0, 1.0],
+            "askVolume": [1.0, 1.0],
+            "last": [None, None],
+            "spread": [1.0, 1.0],
+            "spread_pct": [1.0, 1.0],
+            "local_timestamp": [1.0, 2.0],
+        }
+    ).to_parquet(legacy)
+
+    migrated = migrate_legacy(tmp_path)
+
+    assert migrated == [legacy] and not legacy.exists()
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME, symbols=["BTC/USDT"])
+    out = read_parquet(files[0], expected_version=SchemaVersion.V1)
+    assert out.schema.remove_metadata() == TICKS_SCHEMA_V1
+    assert out["symbol"].to_pylist() == ["BTC/USDT", "BTC/USDT"]
+
+
+def test_legacy_symbol_from_filename() -> None:
+    assert legacy_symbol(Path("binanceusdm_ETHUSDT_20240101_000000.parquet")) == "ETH/USDT"
+    assert (
+        legacy_symbol(
+            Path("binanceusdm_1000PEPEUSDT_20240101_000000.parquet"), {"1000PEPEUSDT": "X"}
+        )
+        == "X"
+    )
+    assert legacy_symbol(Path("random.parquet")) == "LEGACY"
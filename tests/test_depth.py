@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import math
+import random
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+import config
+from harvester import DataHarvester
+from momontum.data.depth import (
+    DepthBuffer,
+    DepthDiffBuffer,
+    decode_depth_diffs,
+    depth_imbalance,
+    depth_timeframe,
+)
+from momontum.data.layout import DEPTH_DATASET, list_partition_files
+from momontum.data.schema import read_parquet
+from momontum.exchange.fake import FakeExchange
+from momontum.schemas import DEPTH_DIFF_SCHEMA_V1, depth_schema
+from processor import DataProcessor
+
+LEVELS = 5
+
+
+def _books(n: int, seed: int = 1) -> list[tuple[list[list[float]], list[list[float]]]]:
+    """Random books where only a few levels change per update (and some not at all)."""
+    rng = random.Random(seed)
+    bids = [[100.0 - i, 1.0] for i in range(LEVELS)]
+    asks = [[101.0 + i, 1.0] for i in range(LEVELS)]
+    books = []
+    for _ in range(n):
+        if rng.random() < 0.7:
+            side = bids if rng.random() < 0.5 else asks
+            side[rng.randrange(LEVELS)][1] = round(rng.uniform(0.1, 5), 2)
+        depth = rng.choice([LEVELS, LEVELS, 3])  # thin book now and then
+        books.append(([b[:] for b in bids[:depth]], [a[:] for a in asks]))
+    return books
+
+
+def test_snapshot_buffer_uses_fixed_size_lists() -> None:
+    buffer = DepthBuffer("BTC/USDT", LEVELS, capacity=4)
+    buffer.append(1, 1.0, [[100.0, 2.0], [99.0, 1.0]], [[101.0, 3.0]])
+
+    batch = buffer.to_record_batch()
+    buffer.clear()
+
+    assert batch.schema == depth_schema(LEVELS)
+    assert batch.schema.field("bid_px").type == pa.list_(pa.float64(), LEVELS)
+    bid_px = batch.column("bid_px")[0].as_py()
+    assert bid_px[:2] == [100.0, 99.0] and all(math.isnan(x) for x in bid_px[2:])
+    assert batch.column("ask_qty")[0].as_py()[0] == 3.0
+
+
+def test_diff_buffer_roundtrips_to_snapshots() -> None:
+    books = _books(200)
+    snapshots = DepthBuffer("BTC/USDT", LEVELS, capacity=len(books))
+    diffs = DepthDiffBuffer("BTC/USDT", LEVELS, capacity=len(books), keyframe_interval=50)
+    batches = []
+    stored = []
+    for i, (bids, asks) in enumerate(books):
+        snapshots.append(i, float(i), bids, asks)
+        if diffs.append(i, float(i), bids, asks):
+            stored.append(i)
+        if i == 120:  # a flush in the middle starts the next batch with a keyframe
+            batches.append(diffs.to_record_batch())
+            diffs.clear()
+    batches.append(diffs.to_record_batch())
+
+    table = pa.Table.from_batches(batches)
+    assert table.schema == DEPTH_DIFF_SCHEMA_V1
+    assert diffs.skipped > 0 and len(stored) == table.num_rows
+    changed = sum(len(x) for x in table["bid_level"].to_pylist())
+    assert changed < table.num_rows * LEVELS  # only changed levels are stored
+    assert table["keyframe"].to_pylist().count(True) >= 4
+
+    decoded = decode_depth_diffs(table, LEVELS)
+    expected = pa.Table.from_batches([snapshots.to_record_batch()]).take(stored)
+    assert decoded.schema == depth_schema(LEVELS)
+    for column in ("timestamp", "bid_px", "bid_qty", "ask_px", "ask_qty"):
+        assert str(decoded[column].to_pylist()) == str(expected[column].to_pylist())
+
+
+def test_depth_imbalance_feature() -> None:
+    bids = [[100.0, 3.0], [99.0, 2.0]]
+    asks = [[101.0, 1.0], [102.0, 2.0]]
+    # (3 + 2/2 - 1 - 2/2) / (3 + 1 + 1 + 1)
+    assert depth_imbalance(bids, asks, 2) == pytest.approx(2 / 6)
+    assert depth_imbalance([], [], 5) == 0.0
+
+    record = {
+        "bid": 100.0,
+        "ask": 101.0,
+        "bidVolume": 3.0,
+        "askVolume": 1.0,
+        "spread": 1.0,
+        "bids": bids,
+        "asks": asks,
+    }
+    features, _ = DataProcessor(depth_levels=2).calculate_features(record)
+    assert features["depth_imbalance"] == pytest.approx(2 / 6)
+    assert "depth_imbalance" not in DataProcessor().calculate_features(record)[0]
+
+
+def test_harvester_writes_diff_encoded_depth(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_ENABLED", False)
+    monkeypatch.setattr(config, "DEPTH_LEVELS", 10)
+    monkeypatch.setattr(config, "DEPTH_MODE", "diff")
+    exchange = FakeExchange(["BTC/USDT"])
+    harvester = DataHarvester(symbols=["BTC/USDT"], exchange=exchange)
+
+    async def run() -> None:
+        task = asyncio.create_task(harvester.harvest())
+        while harvester.tick_counts["BTC/USDT"] < 120:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    files = list_partition_files(tmp_path, DEPTH_DATASET, depth_timeframe(10, "diff"))
+    table = pa.concat_tables(read_parquet(f) for f in files)
+    decoded = decode_depth_diffs(table, 10)
+    assert decoded.num_rows == harvester.tick_counts["BTC/USDT"]
+    assert not any(math.isnan(x) for x in decoded["ask_px"][0].as_py())
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+
+import config
+from harvester import make_rolling_writer
+from momontum.exchange.replay import synthetic_ticks
+from momontum.features import FeatureSet, backfill_features, load_features, parse_feature
+from processor import ENGINE_NUMPY, ENGINE_RIVER, BasketProcessor, DataProcessor
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT"]
+SPECS = ["ema_20", "vol_50", "ofi_10", "microprice", "zscore_30"]
+
+
+def test_parse_feature() -> None:
+    assert parse_feature("ema_20").name == "ema_20"
+    assert parse_feature("microprice").window is None
+    for bad in ("ema", "ema_0", "vol_1", "microprice_5", "nope_3", "ema_x"):
+        with pytest.raises(ValueError):
+            parse_feature(bad)
+    with pytest.raises(ValueError):
+        FeatureSet(["ema_20", "ema_20"])
+
+
+def test_streaming_matches_polars() -> None:
+    ticks = synthetic_ticks(SYMBOLS, 2_000, interval_ms=50).sort_by("timestamp")
+    feature_set = FeatureSet(SPECS)
+    streams = {s: feature_set.stream() for s in SYMBOLS}
+    streamed = np.array(
+        [
+            streams[r["symbol"]].update(r["bid"], r["ask"], r["bidVolume"], r["askVolume"])
+            for r in ticks.to_pylist()
+        ]
+    )
+
+    frame = feature_set.frame(ticks)
+    assert frame.columns == ["symbol", "timestamp", *SPECS]
+    assert frame["timestamp"].to_list() == ticks["timestamp"].to_pylist()  # input row order
+    for i, name in enumerate(SPECS):
+        batch = frame[name].to_numpy()  # nulls -> NaN
+        assert (np.isnan(batch) == np.isnan(streamed[:, i])).all(), name
+        assert not np.isnan(batch).all(), name
+        np.testing.assert_allclose(batch, streamed[:, i], rtol=1e-8, atol=1e-12, err_msg=name)
+
+
+def test_backfill_and_load(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    ticks = synthetic_ticks(SYMBOLS, 500)  # Nov 2023: closed days
+    writer = make_rolling_writer()
+    writer.write_table(ticks)
+    writer.close()
+
+    rows = backfill_features(tmp_path, SPECS)
+    assert rows == ticks.num_rows
+    loaded = load_features(tmp_path)
+    assert loaded is not None
+    expected = FeatureSet(SPECS).frame(ticks).sort("symbol", "timestamp", maintain_order=True)
+    assert loaded.equals(expected)
+
+    assert backfill_features(tmp_path, SPECS) == 0
+    assert backfill_features(tmp_path, SPECS, overwrite=True) == rows
+    reloaded = load_features(tmp_path, symbols=["ETH/USDT"])
+    assert reloaded is not None  # old parts replaced, not duplicated
+    assert reloaded.height == ticks.num_rows // 2
+    assert load_features(tmp_path / "empty") is None
+
+
+@pytest.mark.parametrize("engine", [ENGINE_RIVER, ENGINE_NUMPY])
+def test_processor_with_registry_features(engine: str) -> None:
+    ticks = synthetic_ticks(["BTC/USDT"], 1_500, interval_ms=50)
+    specs = ["ema_20", "vol_50"]
+    records = ticks.to_pylist()
+
+    per_tick = DataProcessor(engine=engine, features=specs)
+    expected = [per_tick.process(record) for record in records]
+    changes = np.array([np.nan if p is None else p["predicted_change"] for p in expected])
+    assert "vol_50" not in expected[10]["features"]  # still warming up
+    assert "vol_50" in expected[-1]["features"]
+
+    batch = DataProcessor(engine=engine, features=specs).process_batch(ticks)
+    np.testing.assert_allclose(batch["predicted_change"], changes, rtol=1e-9, atol=1e-12)
+
+    # Precomputed columns (e.g. from the features dataset) give the same predictions
+    frame = pl.from_arrow(ticks)
+    assert isinstance(frame, pl.DataFrame)
+    with_columns = frame.hstack(FeatureSet(specs).frame(ticks).select(specs))
+    precomputed = DataProcessor(engine=engine, features=specs).process_batch(with_columns)
+    np.testing.assert_allclose(precomputed["predicted_change"], changes, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(precomputed["ema_20"], batch["ema_20"], rtol=1e-12)
+
+
+def test_basket_with_registry_features() -> None:
+    records = synthetic_ticks(SYMBOLS, 300).sort_by("timestamp").to_pylist()
+    specs = ["ema_10", "zscore_20"]
+    processors = {s: DataProcessor(engine=ENGINE_NUMPY, features=specs) for s in SYMBOLS}
+    expected = [processors[r["symbol"]].process(r) for r in records]
+
+    basket = BasketProcessor(SYMBOLS, features=specs)
+    got = basket.process_many([(r["symbol"], r) for r in records])
+    pairs = [(g, e) for g, e in zip(got, expected, strict=True) if e is not None]
+    assert all(g is not None for g, _ in pairs)
+    np.testing.assert_allclose(
+        [g["predicted_change"] for g, _ in pairs],
+        [e["predicted_change"] for _, e in pairs],
+        rtol=1e-9,
+        atol=1e-12,
+    )
+    assert all(g["features"] == pytest.approx(e["features"]) for g, e in pairs)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pyarrow as pa
+
+from momontum.data.journal import TickJournal, journal_path, replay_journals
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, list_partition_files
+from momontum.data.rotation import RollingParquetWriter, RotationPolicy, part_watermarks
+from momontum.data.schema import read_parquet
+from momontum.schemas import TICKS_SCHEMA_V1
+
+TS = 1704153600123  # 2024-01-02T00:00:00.123Z
+
+
+def _append(journal: TickJournal, i: int) -> int:
+    return journal.append(TS + i, 100.0 + i, 101.0 + i, 1.0, 2.0, None, 1.0, 0.99, 1704153600.5)
+
+
+def _writer(root: Path, **kwargs) -> RollingParquetWriter:
+    policy = RotationPolicy(max_rows=None, max_bytes=None, max_age_seconds=None)
+    return RollingParquetWriter(root, TICKS_DATASET, TICK_TIMEFRAME, policy=policy, **kwargs)
+
+
+def test_records_survive_reopen_without_close(tmp_path: Path) -> None:
+    path = journal_path(tmp_path, "BTC/USDT")
+    journal = TickJournal(path, "BTC/USDT", capacity=2)
+    seqs = [_append(journal, i) for i in range(5)]  # forces two growths
+
+    # A second handle sees the data without any explicit sync/close (simulated crash).
+    reopened = TickJournal(path)
+    batch = reopened.read()
+
+    assert seqs == [0, 1, 2, 3, 4]
+    assert reopened.symbol == "BTC/USDT"
+    assert batch.schema == TICKS_SCHEMA_V1
+    assert batch.column("bid").to_pylist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert batch.column("last").to_pylist() == [None] * 5
+    assert batch.column("datetime")[0].as_py() == "2024-01-02T00:00:00.123Z"
+
+
+def test_truncate_through_keeps_newer_records(tmp_path: Path) -> None:
+    journal = TickJournal(journal_path(tmp_path, "ETH/USDT"), "ETH/USDT")
+    for i in range(4):
+        _append(journal, i)
+
+    journal.truncate_through(1)
+    assert journal.read().column("timestamp").to_pylist() == [TS + 2, TS + 3]
+    assert _append(journal, 4) == 4  # sequence numbers keep increasing
+
+    journal.reset()
+    assert len(TickJournal(journal.path)) == 0
+
+
+def test_replay_writes_published_files_and_empties_journals(tmp_path: Path) -> None:
+    journal_dir = tmp_path / "_journal"
+    for symbol in ("BTC/USDT", "ETH/USDT"):
+        journal = TickJournal(journal_path(journal_dir, symbol), symbol)
+        for i in range(3):
+            _append(journal, i)
+        journal.close()
+
+    replayed = replay_journals(journal_dir, _writer(tmp_path))
+
+    assert replayed == 6
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    table = pa.concat_tables([read_parquet(f) for f in files])
+    assert sorted(set(table["symbol"].to_pylist())) == ["BTC/USDT", "ETH/USDT"]
+    assert all(len(TickJournal(p)) == 0 for p in journal_dir.glob("*.wal"))
+
+
+def test_writer_reports_durable_watermarks_when_parts_close(tmp_path: Path) -> None:
+    durable: list[tuple[str, int]] = []
+    writer = _writer(tmp_path, on_durable=lambda s, wm: durable.append((s, wm)))
+    journal = TickJournal(journal_path(tmp_path / "_journal", "BTC/USDT"), "BTC/USDT")
+    for i in range(3):
+        _append(journal, i)
+
+    batch = journal.read()
+    writer.write_batch(batch, watermark=journal.last_seq)
+    assert durable == []  # still in an open file
+
+    writer.close()
+    assert durable == [("BTC/USDT", 2)]
+
+    journal.truncate_through(durable[-1][1])
+    assert len(journal) == 0
+
+
+def test_replay_skips_rows_of_recovered_files(tmp_path: Path) -> None:
+    journal_dir = tmp_path / "_journal"
+    journal = TickJournal(journal_path(journal_dir, "BTC/USDT"), "BTC/USDT")
+    crashed = _writer(tmp_path)
+    for day in range(2):  # one open part per UTC day
+        for i in range(3):
+            journal.append(
+                TS + day * 86_400_000 + i, 100.0 + i, 101.0, 1.0, 2.0, None, 1.0, 1.0, 0.0
+            )
+        crashed.write_batch(journal.read().slice(3 * day), watermark=journal.last_seq)
+    journal.close()
+
+    # Crash: the second day's footer is written but not published, the first day's is torn
+    first, second = (crashed._open[key] for key in crashed.open_partitions)
+    crashed._finish("BTC/USDT", second)
+    first.sink.flush()
+
+    writer = _writer(tmp_path)
+    published, quarantined = writer.recover()
+    assert len(published) == len(quarantined) == 1
+    assert part_watermarks(published[0]) == ("BTC/USDT", 2, 5)
+
+    assert replay_journals(journal_dir, writer, published) == 3
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    table = pa.concat_tables([read_parquet(f) for f in files])
+    assert sorted(table["timestamp"].to_pylist()) == [
+        TS + day * 86_400_000 + i for day in range(2) for i in range(3)
+    ]
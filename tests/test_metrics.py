@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import math
+from pathlib import Path
+
+import pytest
+
+import config
+from harvester import DataHarvester
+from momontum.exchange.fake import FakeExchange
+from momontum.metrics import ClockOffsetEstimator, MetricsRegistry, MetricsServer
+
+
+async def _get(port: int, path: str) -> tuple[str, str]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = (await reader.read()).decode()
+    writer.close()
+    head, _, body = response.partition("\r\n\r\n")
+    return head.splitlines()[0], body
+
+
+def test_render_prometheus_text() -> None:
+    registry = MetricsRegistry(prefix="t_")
+    ticks = registry.counter("ticks_total", "Ticks", ["symbol"])
+    ticks.labels("BTC/USDT").inc()
+    ticks.labels("BTC/USDT").inc(2)
+    registry.gauge("depth", "Depth").set(1.5)
+    registry.callback_gauge("fill", "Fill", lambda: {("a",): 0.25}, ["name"])
+    latency = registry.histogram("latency_ms", "Latency", buckets=(1, 10))
+    for value in (0.5, 1, 5, 50):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE t_ticks_total counter" in lines
+    assert 't_ticks_total{symbol="BTC/USDT"} 3' in lines
+    assert "t_depth 1.5" in lines
+    assert 't_fill{name="a"} 0.25' in lines
+    # Buckets are cumulative; `le` is inclusive
+    assert 't_latency_ms_bucket{le="1.0"} 2' in lines
+    assert 't_latency_ms_bucket{le="10.0"} 3' in lines
+    assert 't_latency_ms_bucket{le="+Inf"} 4' in lines
+    assert "t_latency_ms_sum 56.5" in lines
+    assert "t_latency_ms_count 4" in lines
+
+
+def test_duplicate_metric_and_wrong_labels_rejected() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("x_total", "X", ["symbol"])
+    with pytest.raises(ValueError):
+        registry.counter("x_total", "X")
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+
+def test_clock_offset_is_sliding_window_minimum() -> None:
+    clock = ClockOffsetEstimator(window_seconds=10.0)
+    assert math.isnan(clock.offset_ms)
+
+    assert clock.update(exchange_ms=0, local_seconds=1.0) == 1000.0
+    clock.update(exchange_ms=1_950, local_seconds=2.0)  # 50 ms: fastest packet
+    clock.update(exchange_ms=2_800, local_seconds=3.0)
+    assert clock.offset_ms == 50.0
+
+    # The 50 ms sample leaves the window; the minimum of the rest takes over
+    clock.update(exchange_ms=12_700, local_seconds=13.0)
+    assert clock.offset_ms == 200.0
+
+
+def test_server_serves_metrics_and_404() -> None:
+    registry = MetricsRegistry()
+    registry.counter("up_total", "Up").inc()
+
+    async def run() -> tuple[tuple[str, str], tuple[str, str]]:
+        server = MetricsServer(registry, port=0)
+        await server.start()
+        try:
+            return await _get(server.port, "/metrics"), await _get(server.port, "/")
+        finally:
+            await server.close()
+
+    (status, body), (missing, _) = asyncio.run(run())
+    assert status == "HTTP/1.1 200 OK"
+    assert "momontum_up_total 1" in body.splitlines()
+    assert missing == "HTTP/1.1 404 Not Found"
+
+
+def test_harvester_exposes_metrics(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_DIR", str(tmp_path / "_journal"))
+    monkeypatch.setattr(config, "METRICS_LOOP_LAG_INTERVAL", 0.01)
+    exchange = FakeExchange(["BTC/USDT"])
+    harvester = DataHarvester(symbols=["BTC/USDT"], exchange=exchange, metrics_port=0)
+
+    async def run() -> str:
+        task = asyncio.create_task(harvester.harvest())
+        while harvester.tick_counts["BTC/USDT"] < 120:
+            await asyncio.sleep(0.01)
+        _, body = await _get(harvester.metrics_port, "/metrics")
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        return body
+
+    body = asyncio.run(run())
+    lines = body.splitlines()
+    ticks = next(
+        line for line in lines if line.startswith('momontum_ticks_total{symbol="BTC/USDT"}')
+    )
+    assert int(ticks.split()[-1]) >= 120
+    assert any(line.startswith("momontum_exchange_latency_ms_count") for line in lines)
+    assert any(line.startswith("momontum_event_loop_lag_seconds_count") for line in lines)
+    assert any(line.startswith("momontum_flush_seconds_count") for line in lines)
+    assert 'momontum_buffer_fill_ratio{symbol="BTC/USDT"}' in body
+    assert not math.isnan(harvester.clock.offset_ms)
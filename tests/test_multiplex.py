@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from pathlib import Path
+
+import pytest
+from ccxt.base.errors import NetworkError
+
+import config
+from harvester import DataHarvester
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, list_partition_files
+from momontum.data.schema import read_parquet
+from momontum.exchange.fake import FakeExchange
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT"]
+
+
+def test_fake_exchange_drops_and_reconnects() -> None:
+    exchange = FakeExchange(SYMBOLS, fail_every=3)
+
+    async def run() -> list[str]:
+        seen = []
+        for _ in range(6):
+            try:
+                book = await exchange.watch_order_book_for_symbols(SYMBOLS, limit=5)
+            except NetworkError:
+                continue
+            assert len(book["bids"]) == 5 and book["bids"][0][0] < book["asks"][0][0]
+            seen.append(book["symbol"])
+        return seen
+
+    assert asyncio.run(run()) == ["BTC/USDT", "ETH/USDT", "SOL/USDT", "BTC/USDT"]
+    assert exchange.stats.failures == 2
+    assert exchange.stats.connects == 2  # the last drop was not followed by a reconnect
+
+
+def test_multiplexed_harvest_dispatches_per_symbol(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_DIR", str(tmp_path / "_journal"))
+    monkeypatch.setattr(config, "RECONNECT_MIN_DELAY", 0.0)
+    exchange = FakeExchange(SYMBOLS, fail_every=50)
+    harvester = DataHarvester(symbols=SYMBOLS, exchange=exchange, multiplex=True)
+
+    async def run() -> None:
+        task = asyncio.create_task(harvester.harvest())
+        while sum(harvester.tick_counts.values()) < 300:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert exchange.stats.connects > 1  # the basket stream was re-established
+    assert harvester.tick_counts == exchange.stats.updates_by_symbol
+    for symbol in SYMBOLS:
+        files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME, symbols=[symbol])
+        rows = sum(read_parquet(f).num_rows for f in files)
+        assert rows == harvester.tick_counts[symbol]
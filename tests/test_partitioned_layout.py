@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+from datetime import date
+from pathlib import Path
+
+import pyarrow as pa
+
+from momontum.data.layout import (
+    TICK_TIMEFRAME,
+    TICKS_DATASET,
+    PartitionedDatasetWriter,
+    list_partition_files,
+    symbol_to_path,
+)
+from momontum.data.schema import SchemaVersion, read_parquet
+from momontum.schemas import TICKS_SCHEMA_V1
+
+DAY1_MS = 1704153600000  # 2024-01-02T00:00:00Z
+
+
+def _ticks(symbol: str, timestamps: list[int]) -> pa.Table:
+    n = len(timestamps)
+    return pa.Table.from_pydict(
+        {
+            "symbol": [symbol] * n,
+            "timestamp": timestamps,
+            "datetime": [""] * n,
+            "bid": [100.0] * n,
+            "ask": [101.0] * n,
+            "bidVolume": [1.0] * n,
+            "askVolume": [1.0] * n,
+            "last": [None] * n,
+            "spread": [1.0] * n,
+            "spread_pct": [1.0] * n,
+            "local_timestamp": [t / 1000 for t in timestamps],
+        },
+        schema=TICKS_SCHEMA_V1,
+    )
+
+
+def test_rows_are_partitioned_by_symbol_and_utc_day(tmp_path: Path) -> None:
+    writer = PartitionedDatasetWriter(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    table = pa.concat_tables(
+        [
+            _ticks("BTC/USDT", [DAY1_MS - 1, DAY1_MS, DAY1_MS + 5]),
+            _ticks("ETH/USDT", [DAY1_MS + 10]),
+        ]
+    )
+
+    written = writer.write_table(table)
+
+    rel = sorted(str(p.relative_to(tmp_path)) for p in written)
+    assert rel == [
+        "ticks/tick/BTC-USDT/2024/01/01/part-0000.parquet",
+        "ticks/tick/BTC-USDT/2024/01/02/part-0000.parquet",
+        "ticks/tick/ETH-USDT/2024/01/02/part-0000.parquet",
+    ]
+    for path in written:
+        out = read_parquet(path, expected_version=SchemaVersion.V1)
+        assert out.schema.remove_metadata() == TICKS_SCHEMA_V1
+
+    # No temp files left behind.
+    assert not list(tmp_path.rglob(".part-*"))
+
+
+def test_part_numbers_are_unique_across_concurrent_writers(tmp_path: Path) -> None:
+    # Separate writer instances do not share their in-memory counters, so
+    # uniqueness must come from the filesystem.
+    writers = [PartitionedDatasetWriter(tmp_path, TICKS_DATASET, TICK_TIMEFRAME) for _ in range(4)]
+    table = _ticks("BTC/USDT", [DAY1_MS])
+
+    def work(writer: PartitionedDatasetWriter) -> None:
+        for _ in range(5):
+            writer.write_table(table)
+
+    threads = [threading.Thread(target=work, args=(w,)) for w in writers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    assert [p.name for p in files] == [f"part-{i:04d}.parquet" for i in range(20)]
+
+
+def test_listing_prunes_by_symbol_and_day(tmp_path: Path) -> None:
+    writer = PartitionedDatasetWriter(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    writer.write_table(_ticks("BTC/USDT", [DAY1_MS - 1, DAY1_MS]))
+    writer.write_table(_ticks("ETH/USDT", [DAY1_MS]))
+
+    files = list_partition_files(
+        tmp_path, TICKS_DATASET, TICK_TIMEFRAME, symbols=["BTC/USDT"], start=date(2024, 1, 2)
+    )
+
+    assert len(files) == 1
+    assert symbol_to_path("BTC/USDT") in files[0].parts
+    assert files[0].parent.name == "02"
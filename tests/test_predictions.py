@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+
+from backtesting.predictions import PredictionCache, predict
+from momontum.exchange.replay import synthetic_ticks
+from processor import ENGINE_NUMPY, ENGINE_RIVER, DataProcessor
+
+
+def _ticks(n: int = 400) -> pl.DataFrame:
+    frame = pl.from_arrow(synthetic_ticks(["BTC/USDT"], n, interval_ms=50))
+    assert isinstance(frame, pl.DataFrame)
+    return frame
+
+
+def test_cache_hit_skips_processor(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    ticks = _ticks()
+    cache = PredictionCache(tmp_path)
+    expected = DataProcessor(engine=ENGINE_NUMPY).process_batch(ticks)
+
+    first = predict(ticks, cache, engine=ENGINE_NUMPY)
+    np.testing.assert_array_equal(first["predicted_price"], expected["predicted_price"])
+    np.testing.assert_array_equal(first["predicted_change"], expected["predicted_change"])
+    assert len(list(tmp_path.glob("*.arrow"))) == 1
+
+    def fail(self, columns):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(DataProcessor, "process_batch", fail)
+    assert predict(ticks, cache, engine=ENGINE_NUMPY).equals(first)
+
+
+def test_cache_key(tmp_path: Path) -> None:
+    ticks = _ticks()
+    cache = PredictionCache(tmp_path)
+    key = cache.key(DataProcessor(engine=ENGINE_NUMPY), ticks)
+    assert cache.key(DataProcessor(engine=ENGINE_NUMPY), ticks.clone()) == key
+    # Another model config or other data: another stream
+    assert cache.key(DataProcessor(engine=ENGINE_RIVER), ticks) != key
+    assert cache.key(DataProcessor(engine=ENGINE_NUMPY, features=["ema_20"]), ticks) != key
+    moved = ticks.with_columns(pl.col("bid").shift(1, fill_value=1.0))
+    assert cache.key(DataProcessor(engine=ENGINE_NUMPY), moved) != key
+    assert cache.key(DataProcessor(engine=ENGINE_NUMPY), ticks.head(399)) != key
+    # Columns the processor does not read are not part of the key
+    assert cache.key(DataProcessor(engine=ENGINE_NUMPY), ticks.drop("timestamp")) == key
+
+
+def test_unreadable_cache_is_recomputed(tmp_path: Path) -> None:
+    ticks = _ticks()
+    cache = PredictionCache(tmp_path)
+    expected = predict(ticks, cache)
+    (path,) = tmp_path.glob("*.arrow")
+    path.write_bytes(b"not arrow")
+    assert predict(ticks, cache).equals(expected)
+    assert cache.load(path.stem) is not None  # rewritten
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+import config
+from harvester import DataHarvester
+from momontum.exchange.replay import ReplayExchange, synthetic_ticks
+from processor import ENGINE_NUMPY, ENGINE_RIVER, BasketProcessor, DataProcessor
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT"]
+
+
+def _ticks(n: int = 3_000) -> pa.Table:
+    return synthetic_ticks(["BTC/USDT"], n, interval_ms=50)
+
+
+def _changes(processor: DataProcessor, records: list[dict]) -> np.ndarray:
+    out = [processor.process(record) for record in records]
+    return np.array([np.nan if p is None else p["predicted_change"] for p in out])
+
+
+def test_numpy_engine_matches_river() -> None:
+    records = _ticks().to_pylist()
+    river = _changes(DataProcessor(engine=ENGINE_RIVER), records)
+    fast = _changes(DataProcessor(engine=ENGINE_NUMPY), records)
+
+    assert np.isnan(river[0]) and np.isnan(fast[0])
+    np.testing.assert_allclose(fast[1:], river[1:], rtol=1e-9, atol=1e-12)
+    assert np.abs(river[1:]).max() > 0  # the model actually learned something
+
+
+def test_numpy_engine_skips_missing_features_like_river() -> None:
+    records = _ticks(500).to_pylist()
+    for i, record in enumerate(records):
+        if i % 3:  # depth imbalance only on some updates
+            record["bids"] = [[record["bid"], 1.0 + i % 5], [record["bid"] - 1, 2.0]]
+            record["asks"] = [[record["ask"], 1.5], [record["ask"] + 1, 1.0 + i % 7]]
+
+    river = _changes(DataProcessor(depth_levels=2, engine=ENGINE_RIVER), records)
+    fast = _changes(DataProcessor(depth_levels=2, engine=ENGINE_NUMPY), records)
+    np.testing.assert_allclose(fast[1:], river[1:], rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("engine", [ENGINE_RIVER, ENGINE_NUMPY])
+def test_process_batch_continues_online_recursion(engine: str) -> None:
+    ticks = _ticks()
+    records = ticks.to_pylist()
+    expected = _changes(DataProcessor(engine=ENGINE_RIVER), records)
+
+    processor = DataProcessor(engine=engine)
+    head = _changes(processor, records[:100])  # per tick first, then in batches
+    middle = processor.process_batch(ticks.slice(100, 1_000))
+    tail = processor.process_batch(ticks.slice(1_100).to_pydict())
+
+    got = np.concatenate([head, middle["predicted_change"], tail["predicted_change"]])
+    np.testing.assert_allclose(got[1:], expected[1:], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(
+        middle["predicted_price"], middle["mid_price"] + middle["predicted_change"]
+    )
+    # ...and the next single tick still carries on from the batch state
+    assert processor.process(records[-1]) is not None
+
+
+def test_invalid_engine_and_batch_depth_rejected() -> None:
+    with pytest.raises(ValueError):
+        DataProcessor(engine="torch")
+    with pytest.raises(ValueError):
+        DataProcessor(depth_levels=5).process_batch(_ticks(10))
+
+
+def test_basket_matches_one_processor_per_symbol() -> None:
+    records = synthetic_ticks(SYMBOLS, 400).sort_by("timestamp").to_pylist()
+    for i, record in enumerate(records):
+        if i % 4:  # depth features missing now and then
+            record["bids"] = [[record["bid"], 1.0 + i % 5], [record["bid"] - 1, 2.0]]
+            record["asks"] = [[record["ask"], 1.5], [record["ask"] + 1, 1.0 + i % 7]]
+
+    processors = {s: DataProcessor(depth_levels=2, engine=ENGINE_NUMPY) for s in SYMBOLS}
+    expected = [processors[r["symbol"]].process(r) for r in records]
+
+    basket = BasketProcessor(SYMBOLS, depth_levels=2)
+    got: list[dict | None] = []
+    for start in range(0, len(records), 7):  # uneven rounds, symbols repeat within one
+        got += basket.process_many([(r["symbol"], r) for r in records[start : start + 7]])
+
+    assert [p is None for p in got] == [p is None for p in expected]
+    assert sum(p is None for p in got) == len(SYMBOLS)
+    pairs = []
+    for g, e in zip(got, expected, strict=True):
+        if e is not None:
+            assert g is not None
+            pairs.append((g, e))
+    np.testing.assert_allclose(
+        [g["predicted_change"] for g, _ in pairs],
+        [e["predicted_change"] for _, e in pairs],
+        rtol=1e-9,
+        atol=1e-12,
+    )
+    assert all(g["features"] == pytest.approx(e["features"]) for g, e in pairs)
+
+
+def test_harvester_basket_processing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_DIR", str(tmp_path / "_journal"))
+    exchange = ReplayExchange.synthetic(SYMBOLS, 200, speed=None)
+    harvester = DataHarvester(
+        symbols=SYMBOLS, exchange=exchange, metrics_port=0, basket_processing=True
+    )
+    assert harvester.basket is not None and not harvester.processors
+    acted: list[str] = []
+
+    async def act(symbol: str, record: dict, prediction: dict | None) -> None:
+        acted.append(symbol)
+
+    harvester.act = act  # type: ignore[method-assign]
+
+    async def run() -> None:
+        task = asyncio.create_task(harvester.harvest())
+        await asyncio.wait_for(exchange.finished.wait(), timeout=30)
+        while len(acted) < len(exchange):
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert sorted(acted) == sorted(s for s in SYMBOLS for _ in range(200))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from pathlib import Path
+
+import pytest
+
+import config
+from harvester import DataHarvester
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, list_partition_files
+from momontum.data.schema import read_parquet
+from momontum.exchange.replay import ReplayExchange
+from momontum.queues import CONFLATE_LATEST, CONFLATE_NONE, ConflatingQueue
+
+
+def test_latest_policy_keeps_only_newest() -> None:
+    async def run() -> tuple[int, int, int]:
+        queue: ConflatingQueue[int] = ConflatingQueue(CONFLATE_LATEST)
+        for i in range(5):
+            await queue.put(i)
+        assert len(queue) == 1
+        newest = await queue.get()
+        await queue.put(5)
+        return newest, await queue.get(), queue.skipped
+
+    assert asyncio.run(run()) == (4, 5, 4)
+
+
+def test_none_policy_is_fifo_with_backpressure() -> None:
+    async def run() -> list[int]:
+        queue: ConflatingQueue[int] = ConflatingQueue(CONFLATE_NONE, maxsize=2)
+        await queue.put(0)
+        await queue.put(1)
+        blocked = asyncio.create_task(queue.put(2))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()  # full: the producer waits
+        items = [await queue.get()]
+        await blocked
+        items += [await queue.get(), await queue.get()]
+        assert queue.skipped == 0
+        return items
+
+    assert asyncio.run(run()) == [0, 1, 2]
+
+
+def test_unknown_policy_rejected() -> None:
+    with pytest.raises(ValueError):
+        ConflatingQueue("oldest")
+
+
+def test_slow_processing_does_not_block_recording(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_DIR", str(tmp_path / "_journal"))
+    monkeypatch.setattr(config, "PROCESSING_CONFLATION", CONFLATE_LATEST)
+    exchange = ReplayExchange.synthetic(["BTC/USDT"], 300, speed=None)
+    harvester = DataHarvester(symbols=["BTC/USDT"], exchange=exchange, metrics_port=0)
+    processed = []
+
+    async def slow_process(symbol: str, record: dict) -> None:
+        processed.append(record["timestamp"])
+        await asyncio.sleep(0.01)  # e.g. a slow order call
+
+    harvester.process_record = slow_process  # type: ignore[method-assign]
+
+    async def run() -> float:
+        started = time.perf_counter()
+        task = asyncio.create_task(harvester.harvest())
+        await asyncio.wait_for(exchange.finished.wait(), timeout=30)
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    assert elapsed < 300 * 0.01  # inline processing would take at least 3s
+
+    skipped = harvester.skipped_counts["BTC/USDT"]
+    assert skipped > 0
+    assert len(processed) + skipped + len(harvester.queues["BTC/USDT"]) == 300
+    assert processed == sorted(processed)
+
+    # Recording stays lossless
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    assert sum(read_parquet(f).num_rows for f in files) == 300
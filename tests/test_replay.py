@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import config
+from harvester import DataHarvester, make_rolling_writer
+from loadtest import run_loadtest
+from momontum.exchange.replay import ReplayExchange, synthetic_ticks
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT"]
+
+
+class ManualClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_unpaced_replay_preserves_order_per_symbol() -> None:
+    exchange = ReplayExchange.synthetic(SYMBOLS, 50, speed=None)
+    assert len(exchange) == 100 and exchange.symbols
+
+    async def run() -> list[int]:
+        seen = []
+        for _ in range(50):
+            book = await exchange.watch_order_book("ETH/USDT")
+            assert book["symbol"] == "ETH/USDT"
+            assert book["bids"][0][0] < book["asks"][0][0]
+            seen.append(book["nonce"])
+        return seen
+
+    assert asyncio.run(run()) == list(range(1, 51))
+    assert not exchange.finished.is_set()  # BTC/USDT was never consumed
+    assert exchange.stats.updates_by_symbol == {"ETH/USDT": 50}
+
+
+def test_multiplexed_replay_is_time_ordered_and_finishes() -> None:
+    exchange = ReplayExchange.synthetic(SYMBOLS, 30, speed=None, rebase=False)
+
+    async def run() -> list[int]:
+        return [
+            (await exchange.watch_order_book_for_symbols(SYMBOLS))["timestamp"]
+            for _ in range(len(exchange))
+        ]
+
+    timestamps = asyncio.run(run())
+    assert timestamps == sorted(timestamps)
+    assert exchange.finished.is_set()
+    assert exchange.stats.updates_by_symbol == {"BTC/USDT": 30, "ETH/USDT": 30}
+
+
+def test_paced_replay_conflates_when_consumer_falls_behind() -> None:
+    clock = ManualClock()
+    exchange = ReplayExchange.synthetic(["BTC/USDT"], 100, interval_ms=100, speed=2.0, clock=clock)
+
+    async def run() -> tuple[dict, dict]:
+        first = await exchange.watch_order_book("BTC/USDT")  # due at start
+        clock.now += 2.5  # consumer stalls for ~50 rows of data at 2x speed
+        second = await exchange.watch_order_book("BTC/USDT")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert exchange.stats.dropped > 30
+    assert exchange.stats.updates == 2
+    # Rebased timestamps are the wall clock time each update was due
+    assert first["timestamp"] == 1_000_000
+    assert 1_000_000 < second["timestamp"] <= 1_002_500
+
+
+def test_replay_from_data_lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    writer = make_rolling_writer()
+    for batch in synthetic_ticks(SYMBOLS, 40).to_batches():
+        writer.write_batch(batch)
+    writer.close()
+
+    exchange = ReplayExchange.from_parquet(tmp_path, symbols=["ETH/USDT"], speed=None)
+    assert exchange.symbols == ["ETH/USDT"] and len(exchange) == 40
+
+
+def test_loadtest_reports_full_pipeline(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_DIR", str(tmp_path / "_journal"))
+    exchange = ReplayExchange.synthetic(SYMBOLS, 200, speed=None)
+    harvester = DataHarvester(symbols=SYMBOLS, exchange=exchange, metrics_port=0)
+
+    report = asyncio.run(run_loadtest(harvester, exchange, timeout=30))
+    assert report.delivered == report.processed == 400
+    assert report.dropped == 0
+    assert report.ticks_per_second > 0
+    assert report.stages["ingest"].count == 400
+    # Processing runs behind ingestion; with conflation off nothing is skipped
+    assert report.skipped == 0
+    assert report.stages["model"].count == report.stages["queued"].count == 400
+    assert report.delivery.count == 400
+    assert "ticks/s" in report.format()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from momontum.rolling import RollingMoments
+from strategies.base import Signal
+from strategies.mean_reversion import MeanReversionStrategy
+
+
+def test_matches_numpy_on_drifting_prices() -> None:
+    rng = np.random.default_rng(7)
+    # Far from zero and trending: the case where naive sum-of-squares loses digits
+    prices = 60_000 + np.cumsum(rng.normal(0, 5, 20_000)) + np.linspace(0, 5_000, 20_000)
+    for window in (1, 2, 50, 1_000):
+        stats = RollingMoments(window)
+        for i, price in enumerate(prices.tolist()):
+            stats.update(price)
+            if i % 97 == 0 or i == len(prices) - 1:
+                values = prices[max(0, i + 1 - window) : i + 1]
+                assert stats.full == (len(values) == window)
+                assert stats.mean == pytest.approx(values.mean(), rel=1e-13)
+                assert stats.std() == pytest.approx(values.std(), rel=1e-7, abs=1e-9)
+                if len(values) > 1:
+                    assert stats.variance(ddof=1) == pytest.approx(values.var(ddof=1), rel=1e-7)
+                else:
+                    assert np.isnan(stats.variance(ddof=1))
+
+
+def test_nan_only_while_in_window() -> None:
+    values = [1.0, 2.0, float("nan"), 4.0, 5.0, 6.0, 7.0, 8.0, 9.0]
+    stats = RollingMoments(3)
+    got = []
+    for x in values:
+        stats.update(x)
+        got.append(stats.mean)
+    assert np.isnan(got[2:5]).all()
+    assert got[5:] == [5.0, 6.0, 7.0, 8.0]
+
+
+def test_constant_window_has_zero_variance() -> None:
+    stats = RollingMoments(4)
+    for price in (1.0, 9.0, 3.0, 27_000.1, 27_000.1, 27_000.1, 27_000.1):
+        stats.update(price)
+    assert stats.variance() == 0.0
+    with pytest.raises(ValueError):
+        RollingMoments(0)
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 20])
+def test_update_many_matches_update(window: int) -> None:
+    rng = np.random.default_rng(window)
+    values = 50_000 + np.cumsum(rng.normal(0, 3, 2_000))
+    values[[300, 301, 1_200]] = np.nan
+    scalar = RollingMoments(window)
+    means, variances = [], []
+    for x in values.tolist():
+        scalar.update(x)
+        means.append(scalar.mean)
+        variances.append(scalar.variance())
+
+    # Same statistics bit for bit, however the values are split across calls
+    batched = RollingMoments(window)
+    got_means, got_variances = [], []
+    bounds = np.sort(rng.choice(np.arange(1, len(values)), 40, replace=False))
+    for chunk in np.split(values, bounds):
+        m, v = batched.update_many(chunk)
+        got_means.extend(m.tolist())
+        got_variances.extend(v.tolist())
+    assert np.array_equal(got_means, means, equal_nan=True)
+    assert np.array_equal(got_variances, variances, equal_nan=True)
+    batched.update(1.0)
+    scalar.update(1.0)
+    assert (batched.mean, batched.variance()) == (scalar.mean, scalar.variance())
+
+
+def _bollinger_reference(prices: list[float], window: int, mult: float) -> list[str]:
+    # The list + np.mean / np.std implementation the strategy used to have
+    window_prices: list[float] = []
+    signals = []
+    for price in prices:
+        window_prices.append(price)
+        if len(window_prices) > window:
+            window_prices.pop(0)
+        if len(window_prices) < window:
+            signals.append(Signal.HOLD)
+            continue
+        ma, std = np.mean(window_prices), np.std(window_prices)
+        if price > ma + std * mult:
+            signals.append(Signal.SELL)
+        elif price < ma - std * mult:
+            signals.append(Signal.BUY)
+        else:
+            signals.append(Signal.HOLD)
+    return signals
+
+
+@pytest.mark.parametrize("window", [20, 500])
+def test_mean_reversion_matches_bollinger_reference(window: int) -> None:
+    rng = np.random.default_rng(window)
+    prices = (30_000 + np.cumsum(rng.standard_t(3, 10_000))).round(1).tolist()
+    strategy = MeanReversionStrategy(window=window, std_dev_mult=2.0)
+    got = [strategy.on_tick({"last": p, "bid": p - 0.1, "ask": p + 0.1}) for p in prices]
+
+    assert got == _bollinger_reference(prices, window, 2.0)
+    assert {Signal.BUY, Signal.SELL} <= set(got)
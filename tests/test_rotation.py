@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, list_partition_files
+from momontum.data.rotation import RollingParquetWriter, RotationPolicy
+from momontum.data.schema import SchemaVersion, read_parquet
+
+DAY_MS = 1704153600000  # 2024-01-02T00:00:00Z
+
+
+def _batch(start: int, n: int, symbol: str = "BTC/USDT") -> pa.Table:
+    return pa.table(
+        {
+            "symbol": [symbol] * n,
+            "timestamp": pa.array([DAY_MS + start + i for i in range(n)], pa.int64()),
+            "bid": [100.0] * n,
+        }
+    )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _writer(root: Path, policy: RotationPolicy, clock: FakeClock | None = None):
+    return RollingParquetWriter(
+        root, TICKS_DATASET, TICK_TIMEFRAME, policy=policy, clock=clock or FakeClock()
+    )
+
+
+def test_appends_row_groups_to_one_file_until_close(tmp_path: Path) -> None:
+    writer = _writer(tmp_path, RotationPolicy(max_rows=None, max_bytes=None, max_age_seconds=None))
+    for i in range(5):
+        writer.write_table(_batch(i * 10, 10))
+
+    # Nothing is visible to readers while the file is still open.
+    assert list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME) == []
+
+    writer.close()
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    assert [f.name for f in files] == ["part-0000.parquet"]
+    assert pq.ParquetFile(files[0]).metadata.num_row_groups == 5
+    assert read_parquet(files[0], expected_version=SchemaVersion.V1).num_rows == 50
+    assert not list(tmp_path.rglob(".part-*"))
+
+
+def test_rotates_on_row_limit(tmp_path: Path) -> None:
+    writer = _writer(tmp_path, RotationPolicy(max_rows=20, max_bytes=None, max_age_seconds=None))
+    for i in range(5):
+        writer.write_table(_batch(i * 10, 10))
+    writer.close()
+
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    assert [pq.ParquetFile(f).metadata.num_rows for f in files] == [20, 20, 10]
+
+
+def test_rotates_on_byte_limit(tmp_path: Path) -> None:
+    writer = _writer(tmp_path, RotationPolicy(max_rows=None, max_bytes=1, max_age_seconds=None))
+    writer.write_table(_batch(0, 10))
+    writer.write_table(_batch(10, 10))
+
+    assert writer.open_partitions == []
+    assert len(list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)) == 2
+
+
+def test_rotates_on_wall_clock_limit(tmp_path: Path) -> None:
+    clock = FakeClock()
+    writer = _writer(
+        tmp_path, RotationPolicy(max_rows=None, max_bytes=None, max_age_seconds=60), clock
+    )
+    writer.write_table(_batch(0, 10))
+    writer.write_table(_batch(0, 10, symbol="ETH/USDT"))
+
+    clock.now = 61
+    closed = writer.rotate_expired()
+
+    assert len(closed) == 2
+    assert writer.open_partitions == []
+
+
+def test_recover_publishes_complete_files_and_quarantines_torn_ones(tmp_path: Path) -> None:
+    policy = RotationPolicy(max_rows=None, max_bytes=None, max_age_seconds=None)
+
+    # Simulate a crash: one file fully written but never published, one without footer.
+    crashed = _writer(tmp_path, policy)
+    crashed.write_table(_batch(0, 10))
+    crashed.write_table(_batch(0, 10, symbol="ETH/USDT"))
+    complete, torn = (crashed._open[k] for k in crashed.open_partitions)
+    complete.writer.close()
+    complete.sink.close()
+    torn.sink.flush()
+
+    published, quarantined = _writer(tmp_path, policy).recover()
+
+    assert [p.name for p in published] == ["part-0000.parquet"]
+    assert len(quarantined) == 1 and quarantined[0].name.endswith(".corrupt")
+    assert pq.ParquetFile(published[0]).metadata.num_rows == 10
+    assert list(tmp_path.rglob("*.inprogress")) == []
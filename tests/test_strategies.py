@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+import numpy as np
+import polars as pl
+import pytest
+
+from backtesting.bulk_runner import run_strategy
+from momontum.exchange.replay import synthetic_ticks
+from processor import DataProcessor
+from strategies.base import SIGNAL_CODES, BaseStrategy, Signal
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.momentum import MomentumStrategy
+
+
+def _ticks(n: int = 3_000) -> pl.DataFrame:
+    frame = pl.from_arrow(synthetic_ticks(["BTC/USDT"], n, interval_ms=50))
+    assert isinstance(frame, pl.DataFrame)
+    rows = pl.int_range(pl.len())
+    mid = (pl.col("bid") + pl.col("ask")) / 2
+    # Rough edges of recorded data: no last trade yet, zero or NaN last, a missing ask
+    last = (
+        pl.when(rows % 7 == 0)
+        .then(None)
+        .when(rows % 11 == 0)
+        .then(0.0)
+        .when(rows == 1_000)
+        .then(float("nan"))
+        .otherwise(mid + pl.col("spread") * ((rows % 3) - 1))
+    )
+    ask = pl.when(rows == 500).then(0.0).otherwise(pl.col("ask"))
+    return frame.with_columns(last.alias("last"), ask.alias("ask"))
+
+
+def _with_predictions(frame: pl.DataFrame) -> pl.DataFrame:
+    batch = DataProcessor().process_batch(frame)
+    return frame.with_columns(
+        pl.Series("predicted_price", batch["predicted_price"]),
+        pl.Series("predicted_change", batch["predicted_change"]),
+    )
+
+
+def _on_tick_signals(strategy: BaseStrategy, frame: pl.DataFrame) -> list[int]:
+    signals = []
+    for record in frame.iter_rows(named=True):
+        change = record.get("predicted_change")
+        prediction = None
+        if change is not None and change == change:
+            prediction = {"predicted_price": record["predicted_price"], "predicted_change": change}
+        signals.append(SIGNAL_CODES[strategy.on_tick(record, prediction)])
+    return signals
+
+
+class _EveryNth(BaseStrategy):
+    """No generate_signals: exercises the on_tick fallback."""
+
+    def __init__(self, n: int):
+        super().__init__("EveryNth")
+        self.n = n
+        self.seen = 0
+
+    def on_tick(
+        self, record: Mapping[str, Any], prediction: Mapping[str, Any] | None = None
+    ) -> str:
+        self.seen += 1
+        if prediction is None or self.seen % self.n:
+            return Signal.HOLD
+        return Signal.BUY if prediction["predicted_change"] > 0 else Signal.SELL
+
+
+STRATEGIES = [
+    lambda: MomentumStrategy(threshold=0.0),
+    lambda: MomentumStrategy(threshold=0.01),
+    lambda: MomentumStrategy(threshold=0.05),
+    lambda: MeanReversionStrategy(window=20, std_dev_mult=2.0),
+    lambda: MeanReversionStrategy(window=300, std_dev_mult=1.0),
+    lambda: _EveryNth(5),
+]
+
+
+@pytest.mark.parametrize("make", STRATEGIES)
+def test_generate_signals_matches_on_tick(make) -> None:
+    frame = _with_predictions(_ticks())
+    expected = _on_tick_signals(make(), frame)
+
+    strategy = make()
+    signals = strategy.generate_signals(frame)
+    assert signals.dtype == np.int8
+    assert signals.tolist() == expected
+    assert strategy.generate_signals(frame.to_arrow()).tolist() == expected
+    assert len(set(expected)) > 1  # something besides HOLD
+    if isinstance(strategy, _EveryNth):
+        assert strategy.seen == 0  # the fallback runs on a copy
+
+
+@pytest.mark.parametrize("window", [20, 100])
+def test_mean_reversion_flat_prices_match_on_tick(window: int) -> None:
+    # Recorded prices often sit still: a flat window has zero deviation, so it holds
+    frame = _ticks(5_000)
+    block = pl.int_range(pl.len()) // 150
+    held = ((pl.col("bid") + pl.col("ask")) / 2).round(2).first().over(block)
+    frame = frame.with_columns(
+        pl.when(block % 2 == 0).then(held).otherwise(pl.col("last")).alias("last")
+    )
+    expected = _on_tick_signals(MeanReversionStrategy(window=window), frame)
+    signals = MeanReversionStrategy(window=window).generate_signals(frame)
+    assert signals.tolist() == expected
+    assert len(set(expected)) > 1
+
+
+@pytest.mark.parametrize("make", STRATEGIES)
+def test_signal_stream_carries_state_across_batches(make) -> None:
+    frame = _with_predictions(_ticks())
+    expected = make().generate_signals(frame).tolist()
+    stream = make().signal_stream()
+    got: list[int] = []
+    for offset, length in ((0, 1), (1, 19), (20, 281), (301, 2_000), (2_301, 699)):
+        got.extend(stream.update(frame.slice(offset, length)).tolist())
+    assert got == expected
+
+
+def test_momentum_without_predictions_holds() -> None:
+    signals = MomentumStrategy(threshold=0.0).generate_signals(_ticks(100))
+    assert not signals.any()
+
+
+def test_run_strategy_accepts_records_and_frames() -> None:
+    frame = _ticks(1_000)
+    strategy = MeanReversionStrategy(window=20)
+    from_frame = run_strategy(strategy, frame)
+    assert from_frame == run_strategy(strategy, frame.to_dicts())
+    assert from_frame["Trades"] > 0
+    assert run_strategy(MomentumStrategy(threshold=0.0), frame, processor=True)["Trades"] > 0
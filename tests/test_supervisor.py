@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pytest
+
+import config
+from momontum.data.ipc import BatchMessage, ShardDrained, decode_batch, encode_batch
+from momontum.data.layout import TICK_TIMEFRAME, TICKS_DATASET, list_partition_files
+from momontum.data.rotation import RollingParquetWriter
+from momontum.data.schema import read_parquet
+from momontum.schemas import TICKS_SCHEMA_V1
+from supervisor import HarvestSupervisor, WorkerSpec, shard_symbols
+
+DAY_MS = 1704153600000  # 2024-01-02T00:00:00Z
+
+
+def _ticks(symbol: str, timestamps: list[int]) -> pa.RecordBatch:
+    n = len(timestamps)
+    return pa.RecordBatch.from_pydict(
+        {
+            "symbol": [symbol] * n,
+            "timestamp": timestamps,
+            "datetime": [None] * n,
+            "bid": [1.0] * n,
+            "ask": [2.0] * n,
+            "bidVolume": [1.0] * n,
+            "askVolume": [1.0] * n,
+            "last": [None] * n,
+            "spread": [1.0] * n,
+            "spread_pct": [1.0] * n,
+            "local_timestamp": [t / 1000 for t in timestamps],
+        },
+        schema=TICKS_SCHEMA_V1,
+    )
+
+
+def _exit_immediately(spec: WorkerSpec, *queues: Any) -> None:
+    raise SystemExit(3)
+
+
+def test_shard_symbols_round_robin() -> None:
+    symbols = ["A", "B", "C", "D", "E"]
+    assert shard_symbols(symbols, 2) == [["A", "C", "E"], ["B", "D"]]
+    assert shard_symbols(symbols, 8) == [[s] for s in symbols]
+    assert shard_symbols(symbols, 0) == [symbols]
+
+
+def test_ipc_roundtrip() -> None:
+    batch = _ticks("BTC/USDT", [DAY_MS, DAY_MS + 1])
+    assert decode_batch(encode_batch(batch)).equals(batch)
+
+
+def test_writer_drops_resent_rows_and_acks_owner(tmp_path: Path) -> None:
+    writer = RollingParquetWriter(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    supervisor = HarvestSupervisor(["BTC/USDT", "ETH/USDT"], 2, tick_writer=writer)
+    btc = [DAY_MS + i for i in range(7)]
+
+    supervisor.handle(BatchMessage(0, encode_batch(_ticks("BTC/USDT", btc[:5])), watermark=4))
+    # Restarted worker resends journal seqs 3..6; only 5 and 6 are new
+    supervisor.handle(BatchMessage(0, encode_batch(_ticks("BTC/USDT", btc[3:])), watermark=6))
+    supervisor.handle(ShardDrained(0))
+
+    assert supervisor.rows_written == 7 and supervisor.rows_skipped == 2
+    files = list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    assert read_parquet(files[0])["timestamp"].to_pylist() == btc
+
+    acks = supervisor.workers[0].acks
+    assert acks.get(timeout=5) == ("BTC/USDT", 6)
+    assert acks.get(timeout=5) is None
+    assert supervisor.workers[1].acks.empty()
+
+
+def test_drained_shard_closes_only_its_own_parts(tmp_path: Path) -> None:
+    writer = RollingParquetWriter(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    supervisor = HarvestSupervisor(["BTC/USDT", "ETH/USDT"], 2, tick_writer=writer)
+    supervisor.handle(BatchMessage(0, encode_batch(_ticks("BTC/USDT", [DAY_MS])), watermark=0))
+    supervisor.handle(BatchMessage(1, encode_batch(_ticks("ETH/USDT", [DAY_MS])), watermark=0))
+
+    supervisor.handle(ShardDrained(0))
+
+    assert [symbol for symbol, _ in writer.open_partitions] == ["ETH/USDT"]
+    assert supervisor.workers[0].acks.get(timeout=5) == ("BTC/USDT", 0)
+    assert supervisor.workers[1].acks.empty()
+
+
+def test_dead_workers_are_restarted_with_backoff(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config, "WORKER_RESTART_MIN_DELAY", 0.0)
+    writer = RollingParquetWriter(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    supervisor = HarvestSupervisor(["BTC/USDT"], 1, tick_writer=writer, target=_exit_immediately)
+    worker = supervisor.workers[0]
+
+    supervisor._spawn(worker)
+    deadline = time.monotonic() + 60
+    while worker.restarts < 1 or len(worker.exit_codes) < 2:
+        assert time.monotonic() < deadline
+        supervisor.poll()
+        time.sleep(0.05)
+
+    assert worker.exit_codes[:2] == [3, 3]
+    assert supervisor.health()["workers"][0]["restarts"] >= 1
+    supervisor.stop_event.set()
+    if worker.process is not None:
+        worker.process.join()
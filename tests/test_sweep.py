@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+import backtesting.predictions
+from backtesting.bulk_runner import run_strategy, uses_predictions
+from backtesting.sweep import build_strategies, expand_grid, run_sweep
+from momontum.exchange.replay import synthetic_ticks
+from processor import DataProcessor
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.momentum import MomentumStrategy
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT"]
+GRIDS = {
+    MomentumStrategy: {"threshold": [0.0, 0.01, 0.05]},
+    MeanReversionStrategy: {"window": [10, 20], "std_dev_mult": [1.0, 1.5]},
+}
+
+
+def _ticks() -> pl.DataFrame:
+    frame = pl.from_arrow(synthetic_ticks(SYMBOLS, 400, interval_ms=50))
+    assert isinstance(frame, pl.DataFrame)
+    mid = (pl.col("bid") + pl.col("ask")) / 2
+    offset = pl.col("spread") * (pl.int_range(pl.len()) % 3 - 1)
+    return frame.with_columns((mid + offset).alias("last")).sort("timestamp")
+
+
+def test_expand_grid() -> None:
+    assert expand_grid({"window": [10, 20], "std_dev_mult": [1.0, 1.5]}) == [
+        {"window": 10, "std_dev_mult": 1.0},
+        {"window": 10, "std_dev_mult": 1.5},
+        {"window": 20, "std_dev_mult": 1.0},
+        {"window": 20, "std_dev_mult": 1.5},
+    ]
+    strategies, params = build_strategies(GRIDS)
+    assert len(strategies) == len(params) == 7
+    assert strategies[1].threshold == 0.01
+
+
+def test_sweep_predicts_once_per_symbol(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    df = _ticks()
+    calls = []
+    process_batch = DataProcessor.process_batch
+
+    def counting(self, columns):
+        calls.append(len(columns))
+        return process_batch(self, columns)
+
+    monkeypatch.setattr(backtesting.predictions.DataProcessor, "process_batch", counting)
+    results = run_sweep(df, GRIDS, workers=1, cache_dir=str(tmp_path))
+    assert calls == [400, 400]  # one stream per symbol for the three thresholds
+    assert results.height == len(SYMBOLS) * 7
+    assert results["symbol"].to_list() == sorted(results["symbol"].to_list())
+    for _, group in results.group_by("symbol"):
+        pnl = group["total_pnl"].to_list()
+        assert pnl == sorted(pnl, reverse=True)
+
+    strategies, params = build_strategies(GRIDS)
+    for symbol in SYMBOLS:
+        ticks = df.filter(pl.col("symbol") == symbol)
+        for strategy, kwargs in zip(strategies, params, strict=True):
+            expected = run_strategy(strategy, ticks, processor=uses_predictions(strategy))
+            label = ", ".join(f"{k}={v}" for k, v in kwargs.items())
+            row = results.filter((pl.col("symbol") == symbol) & (pl.col("params") == label))
+            assert f"{row['total_pnl'].item():.2f}" == expected["Total PnL"]
+            assert row["trades"].item() == expected["Trades"]
+    assert results["trades"].sum() > 0
+
+    # Warm cache: no model pass at all
+    calls.clear()
+    assert run_sweep(df, GRIDS, workers=1, cache_dir=str(tmp_path)).equals(results)
+    assert calls == []
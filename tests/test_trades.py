@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+import config
+from harvester import DataHarvester
+from momontum.data.layout import (
+    TICK_TIMEFRAME,
+    TICKS_DATASET,
+    TRADE_TIMEFRAME,
+    TRADES_DATASET,
+    list_partition_files,
+)
+from momontum.data.schema import read_parquet
+from momontum.exchange.fake import FakeExchange
+from momontum.schemas import TRADES_SCHEMA_V1
+
+
+def test_trade_stream_is_written_and_fills_last(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "JOURNAL_ENABLED", False)
+    monkeypatch.setattr(config, "TRADE_BUFFER_SIZE", 16)
+    exchange = FakeExchange(["BTC/USDT"])
+    harvester = DataHarvester(symbols=["BTC/USDT"], exchange=exchange)
+
+    async def run() -> None:
+        task = asyncio.create_task(harvester.harvest())
+        while exchange.stats.trades < 100 or harvester.tick_counts["BTC/USDT"] < 50:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    trades = pa.concat_tables(
+        read_parquet(f) for f in list_partition_files(tmp_path, TRADES_DATASET, TRADE_TIMEFRAME)
+    )
+    assert trades.schema.remove_metadata() == TRADES_SCHEMA_V1
+    assert trades.num_rows == exchange.stats.trades
+    assert trades["id"].to_pylist() == [str(i) for i in range(1, trades.num_rows + 1)]
+
+    ticks = pa.concat_tables(
+        read_parquet(f) for f in list_partition_files(tmp_path, TICKS_DATASET, TICK_TIMEFRAME)
+    )
+    last = [x for x in ticks["last"].to_pylist() if x is not None]
+    assert last and set(last) <= set(trades["price"].to_pylist())
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pyarrow as pa
+
+from momontum.data.writer import BackgroundWriter
+
+
+def _batch(value: int) -> pa.RecordBatch:
+    return pa.RecordBatch.from_pydict({"x": [value]})
+
+
+def test_writer_runs_jobs_in_order_off_the_event_loop() -> None:
+    written: list[int] = []
+    threads: set[str] = set()
+
+    def write(batch: pa.RecordBatch) -> None:
+        threads.add(threading.current_thread().name)
+        written.append(batch.column("x")[0].as_py())
+
+    async def run() -> None:
+        writer = BackgroundWriter(max_queue=4)
+        writer.start()
+        for i in range(10):
+            await writer.submit(write, _batch(i))
+        await writer.close()
+
+        assert writer.stats.written == 10
+        assert writer.stats.rows_written == 10
+        assert writer.stats.queue_depth == 0
+
+    asyncio.run(run())
+
+    assert written == list(range(10))
+    assert threading.main_thread().name not in threads
+
+
+def test_writer_applies_backpressure_and_drains_on_close() -> None:
+    release = threading.Event()
+    written: list[int] = []
+
+    def slow_write(batch: pa.RecordBatch) -> None:
+        release.wait(timeout=5)
+        written.append(batch.column("x")[0].as_py())
+
+    async def run() -> BackgroundWriter:
+        writer = BackgroundWriter(max_queue=2)
+        writer.start()
+
+        producer = asyncio.create_task(_produce(writer, slow_write, 6))
+        await asyncio.sleep(0.05)
+        # One job is in flight, two are queued: the producer must be blocked.
+        assert not producer.done()
+        assert writer.stats.backpressure_waits >= 1
+
+        release.set()
+        await producer
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(run())
+
+    assert written == list(range(6))
+    assert writer.stats.max_queue_depth == 2
+    assert writer.stats.max_flush_seconds >= writer.stats.last_flush_seconds
+
+
+async def _produce(writer: BackgroundWriter, write, n: int) -> None:
+    for i in range(n):
+        await writer.submit(write, _batch(i))
+
+
+def test_writer_counts_errors_and_keeps_running() -> None:
+    written: list[int] = []
+
+    def flaky(batch: pa.RecordBatch) -> None:
+        value = batch.column("x")[0].as_py()
+        if value == 1:
+            raise OSError("disk full")
+        time.sleep(0.001)
+        written.append(value)
+
+    async def run() -> BackgroundWriter:
+        writer = BackgroundWriter(max_queue=8)
+        for i in range(3):
+            await writer.submit(flaky, _batch(i))
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(run())
+
+    assert written == [0, 2]
+    assert writer.stats.errors == 1
+    assert writer.stats.written == 2
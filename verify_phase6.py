@@ -29,7 +29,7 @@ async def run_verification():
     print("✅ Harvester Stopped.")
 
     # Check Data
-    files = glob.glob("data_lake/*.parquet")
+    files = glob.glob("data_lake/ticks/tick/**/*.parquet", recursive=True)
     print(f"📂 Found {len(files)} parquet files.")
 
     if not files: